@@ -0,0 +1,37 @@
+"""contact trigram search
+
+Revision ID: 3f9c2a7d41e0
+Revises: 9bcb01decbd2
+Create Date: 2026-10-17 10:12:31.418206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3f9c2a7d41e0'
+down_revision: Union[str, None] = '9bcb01decbd2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Вираз індексу має збігатися з src.contacts.search.SEARCH_DOCUMENT.
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_contact_search_trgm ON contact "
+            "USING gin (lower(first_name || ' ' || last_name || ' ' || email) gin_trgm_ops)"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_contact_search_trgm")
@@ -0,0 +1,37 @@
+"""owner scoped contacts
+
+Revision ID: 5d2a9e6b7c14
+Revises: b84e1c0f5a23
+Create Date: 2026-10-17 12:40:07.552391
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5d2a9e6b7c14'
+down_revision: Union[str, None] = 'b84e1c0f5a23'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('contacts_count', sa.Integer(), server_default='0', nullable=False))
+    op.execute(
+        "UPDATE users SET contacts_count = counts.total "
+        "FROM (SELECT owner_id, COUNT(*) AS total FROM contact GROUP BY owner_id) AS counts "
+        "WHERE users.id = counts.owner_id"
+    )
+    op.create_index('ix_contact_owner_last_name_id', 'contact', ['owner_id', 'last_name', 'id'], unique=False)
+    op.create_index('ix_contact_owner_email', 'contact', ['owner_id', 'email'], unique=False)
+    op.create_index('ix_contact_owner_birthday_key', 'contact', ['owner_id', 'birthday_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_contact_owner_birthday_key', table_name='contact')
+    op.drop_index('ix_contact_owner_email', table_name='contact')
+    op.drop_index('ix_contact_owner_last_name_id', table_name='contact')
+    op.drop_column('users', 'contacts_count')
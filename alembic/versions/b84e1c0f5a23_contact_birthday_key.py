@@ -0,0 +1,33 @@
+"""contact birthday key
+
+Revision ID: b84e1c0f5a23
+Revises: 3f9c2a7d41e0
+Create Date: 2026-10-17 11:03:52.907114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b84e1c0f5a23'
+down_revision: Union[str, None] = '3f9c2a7d41e0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('contact', sa.Column('birthday_key', sa.Integer(), nullable=True))
+    op.execute(
+        "UPDATE contact SET birthday_key = "
+        "CAST(EXTRACT(MONTH FROM birthday) * 100 + EXTRACT(DAY FROM birthday) AS INTEGER)"
+    )
+    op.alter_column('contact', 'birthday_key', nullable=False)
+    op.create_index(op.f('ix_contact_birthday_key'), 'contact', ['birthday_key'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_contact_birthday_key'), table_name='contact')
+    op.drop_column('contact', 'birthday_key')
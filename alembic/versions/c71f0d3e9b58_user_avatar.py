@@ -0,0 +1,26 @@
+"""user avatar
+
+Revision ID: c71f0d3e9b58
+Revises: 5d2a9e6b7c14
+Create Date: 2026-10-17 14:18:44.120937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c71f0d3e9b58'
+down_revision: Union[str, None] = '5d2a9e6b7c14'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('avatar', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'avatar')
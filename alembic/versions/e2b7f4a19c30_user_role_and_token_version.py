@@ -0,0 +1,30 @@
+"""user role and token version
+
+Revision ID: e2b7f4a19c30
+Revises: c71f0d3e9b58
+Create Date: 2026-10-17 16:02:37.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b7f4a19c30'
+down_revision: Union[str, None] = 'c71f0d3e9b58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('role_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('fk_users_role_id_roles', 'users', 'roles', ['role_id'], ['id'])
+    op.add_column('users', sa.Column('token_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'token_version')
+    op.drop_constraint('fk_users_role_id_roles', 'users', type_='foreignkey')
+    op.drop_column('users', 'role_id')
@@ -0,0 +1,237 @@
+"""Навантажувальний тест основних маршрутів API: вхід, CRUD контактів, пошук і дні народження.
+
+Ціль задається одним із способів:
+    --target inprocess      додаток у тому ж процесі через httpx.ASGITransport;
+    --target uvicorn        локальний uvicorn, запущений з `--workers` воркерами;
+    --target http://host    уже запущений сервер (з RATE_LIMIT_ENABLED=false
+                            і великим MAX_CONTACTS_PER_USER).
+
+Перед прогоном база заповнюється (`--contacts`, `--users`, див. benchmarks.seed),
+якщо не вказано `--no-seed`. Вимірювання виконуються від імені `bench-0`.
+Результати зберігаються в JSON (`--output`) і порівнюються командою `compare`.
+
+Запуск:
+    python -m benchmarks.bench_api run --target inprocess --contacts 10000 --output bench/base.json
+    python -m benchmarks.bench_api run --target uvicorn --workers 4 --contacts 1000000 --output bench/new.json
+    python -m benchmarks.bench_api compare bench/base.json bench/new.json --max-regression 0.1
+"""
+import os
+
+# Обмеження частоти запитів і кількості контактів зробили б вимірювання входу та
+# створення контактів неможливими; змінні задаються до імпорту налаштувань.
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+os.environ.setdefault("MAX_CONTACTS_PER_USER", str(10 ** 9))
+
+import argparse
+import asyncio
+import contextlib
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+from benchmarks.load import (
+    build_report, compare, format_comparison, format_results, load_report, run_scenario, save_report
+)
+from benchmarks.seed import BENCH_PASSWORD, LAST_NAMES, bench_username, create_schema, seed
+
+
+SCENARIOS = (
+    "login", "list_contacts", "get_contact", "create_contact", "update_contact", "search", "birthdays",
+)
+
+
+@contextlib.asynccontextmanager
+async def inprocess_client():
+    from main import app
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def uvicorn_client(port: int, workers: int):
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+            "--workers", str(workers), "--log-level", "warning", "--no-access-log",
+        ],
+        env=os.environ.copy(),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    if (await client.get("/ping")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if time.monotonic() > deadline or process.poll() is not None:
+                    raise RuntimeError("uvicorn did not start")
+                await asyncio.sleep(0.2)
+            yield client
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+
+@contextlib.asynccontextmanager
+async def http_client(base_url: str):
+    async with httpx.AsyncClient(base_url=base_url, timeout=30) as client:
+        yield client
+
+
+async def login(client: httpx.AsyncClient) -> dict:
+    response = await client.post("/auth/token", data={"username": bench_username(0), "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+async def sample_contacts(client: httpx.AsyncClient, headers: dict, count: int) -> list[dict]:
+    contacts, cursor = [], None
+    while len(contacts) < count:
+        params = {"limit": 100, **({"cursor": cursor} if cursor else {})}
+        page = (await client.get("/contacts/", params=params, headers=headers)).json()
+        contacts += page["items"]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    if not contacts:
+        raise RuntimeError(f"{bench_username(0)} has no contacts, seed the database first")
+    return contacts[:count]
+
+
+def build_scenarios(headers: dict, contacts: list[dict], created_ids: list[int]) -> dict:
+    run_id = uuid.uuid4().hex[:8]
+    form = {"username": bench_username(0), "password": BENCH_PASSWORD}
+
+    def contact(i: int) -> dict:
+        return contacts[i % len(contacts)]
+
+    def update_contact(client, i):
+        body = {key: value for key, value in contact(i).items() if key != "id"}
+        body["additional_info"] = f"bench {i}"
+        return client.put(f"/contacts/{contact(i)['id']}", json=body, headers=headers)
+
+    async def create_contact(client, i):
+        response = await client.post("/contacts/", headers=headers, json={
+            "first_name": "Bench", "last_name": f"Created{i}", "email": f"{run_id}-{i}@bench.example.com",
+            "phone_number": "+380000000000", "birthday": "1990-01-01", "age": 30,
+        })
+        if response.status_code == 200:
+            created_ids.append(response.json()["id"])
+        return response
+
+    return {
+        "login": lambda client, i: client.post("/auth/token", data=form),
+        "list_contacts": lambda client, i: client.get("/contacts/", params={"limit": 20}, headers=headers),
+        "get_contact": lambda client, i: client.get(f"/contacts/{contact(i)['id']}", headers=headers),
+        "create_contact": create_contact,
+        "update_contact": update_contact,
+        "search": lambda client, i: client.get(
+            "/contacts/search/", params={"query": LAST_NAMES[i % len(LAST_NAMES)][:5].lower()}, headers=headers
+        ),
+        "birthdays": lambda client, i: client.get("/contacts/birthdays/", params={"days": 30}, headers=headers),
+    }
+
+
+async def cleanup(client: httpx.AsyncClient, headers: dict, created_ids: list[int]):
+    for start in range(0, len(created_ids), 1000):
+        await client.post("/contacts/bulk/delete/", json={"ids": created_ids[start:start + 1000]}, headers=headers)
+
+
+async def run(args) -> dict:
+    if not args.no_seed:
+        if args.create_schema:
+            await create_schema()
+        await seed(args.users, args.contacts, args.batch_size)
+
+    if args.target == "inprocess":
+        client_context = inprocess_client()
+    elif args.target == "uvicorn":
+        client_context = uvicorn_client(args.port, args.workers)
+    else:
+        client_context = http_client(args.target)
+
+    scenarios = args.scenarios or list(SCENARIOS)
+    results = {}
+    async with client_context as client:
+        headers = await login(client)
+        contacts = await sample_contacts(client, headers, args.sample_contacts)
+        created_ids: list[int] = []
+        factories = build_scenarios(headers, contacts, created_ids)
+        try:
+            for name in scenarios:
+                requests = args.login_requests if name == "login" else args.requests
+                results[name] = await run_scenario(
+                    client, factories[name], requests, args.concurrency, warmup=min(args.warmup, requests)
+                )
+                print(f"{name}: done", file=sys.stderr)
+        finally:
+            await cleanup(client, headers, created_ids)
+
+    params = {
+        "users": args.users,
+        "contacts": args.contacts,
+        "requests": args.requests,
+        "login_requests": args.login_requests,
+        "concurrency": args.concurrency,
+        "warmup": args.warmup,
+        "workers": args.workers if args.target == "uvicorn" else None,
+        "seeded": not args.no_seed,
+    }
+    return build_report(args.target, params, results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run")
+    run_parser.add_argument("--target", default="inprocess", help="inprocess, uvicorn або базовий URL сервера")
+    run_parser.add_argument("--workers", type=int, default=1)
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument("--users", type=int, default=10)
+    run_parser.add_argument("--contacts", type=int, default=10000)
+    run_parser.add_argument("--batch-size", type=int, default=10000)
+    run_parser.add_argument("--no-seed", action="store_true")
+    run_parser.add_argument("--create-schema", action="store_true")
+    run_parser.add_argument("--requests", type=int, default=2000)
+    run_parser.add_argument("--login-requests", type=int, default=100)
+    run_parser.add_argument("--concurrency", type=int, default=16)
+    run_parser.add_argument("--warmup", type=int, default=20)
+    run_parser.add_argument("--sample-contacts", type=int, default=1000)
+    run_parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS)
+    run_parser.add_argument("--output")
+
+    compare_parser = subparsers.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--max-regression", type=float, default=0.1)
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        baseline, current = load_report(args.baseline), load_report(args.current)
+        if (baseline["target"], baseline["params"]) != (current["target"], current["params"]):
+            print("Warning: runs used different targets or parameters", file=sys.stderr)
+        rows, regressions = compare(baseline, current, args.max_regression)
+        print(format_comparison(rows))
+        if regressions:
+            print(f"Regressions over {args.max_regression:.0%}: {', '.join(regressions)}")
+            sys.exit(1)
+        return
+
+    report = asyncio.run(run(args))
+    print(format_results(report["results"]))
+    if args.output:
+        save_report(report, args.output)
+
+
+if __name__ == "__main__":
+    main()
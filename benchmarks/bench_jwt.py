@@ -0,0 +1,63 @@
+"""Швидкість підпису та перевірки токенів доступу для різних алгоритмів.
+
+Рядки "pem" передають ключ у jose як PEM, тобто розбирають його при кожній
+операції; рядки "cached" використовують готовий об'єкт ключа, як KeyRing.
+
+Запуск:
+    python -m benchmarks.bench_jwt --iterations 2000
+"""
+import argparse
+import time
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from jose import jwk, jwt
+
+from src.auth.keys import generate_private_key_pem
+
+
+def rsa_private_key_pem() -> str:
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+def rate(iterations: int, func) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return iterations / (time.perf_counter() - start)
+
+
+def bench(label: str, algorithm: str, signing_key, verification_key, claims: dict, iterations: int):
+    token = jwt.encode(claims, signing_key, algorithm=algorithm)
+    sign = rate(iterations, lambda: jwt.encode(claims, signing_key, algorithm=algorithm))
+    verify = rate(iterations, lambda: jwt.decode(token, verification_key, algorithms=[algorithm]))
+    print(f"{label:>14}: sign {sign:9.0f}/s  verify {verify:9.0f}/s  token {len(token)} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    claims = {
+        "sub": "bench", "uid": 1, "email": "bench@example.com", "roles": ["user"],
+        "act": True, "ver": 0, "jti": uuid.uuid4().hex, "exp": int(time.time()) + 3600,
+    }
+
+    secret = "x" * 32
+    bench("HS256 cached", "HS256", jwk.construct(secret, "HS256"), jwk.construct(secret, "HS256"), claims, args.iterations)
+
+    for algorithm, pem in (("ES256", generate_private_key_pem()), ("RS256", rsa_private_key_pem())):
+        private_key = jwk.construct(pem, algorithm)
+        public_key = private_key.public_key()
+        public_pem = public_key.to_pem().decode()
+        bench(f"{algorithm} pem", algorithm, pem, public_pem, claims, args.iterations)
+        bench(f"{algorithm} cached", algorithm, private_key, public_key, claims, args.iterations)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Пропускна здатність перевірки паролів (шлях логіну) залежно від кількості воркерів.
+
+Запуск:
+    python -m benchmarks.bench_password_hashing --logins 64 --max-workers 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+from src.auth.pass_utils import PasswordHasher, get_password_hash, verify_password
+
+
+async def run_inline(password: str, hashed: str, logins: int) -> float:
+    start = time.perf_counter()
+    for _ in range(logins):
+        verify_password(password, hashed)
+    return time.perf_counter() - start
+
+
+async def run_pooled(password: str, hashed: str, logins: int, workers: int, executor_type: str) -> float:
+    hasher = PasswordHasher(max_workers=workers, executor_type=executor_type)
+    await hasher.verify(password, hashed)
+    start = time.perf_counter()
+    await asyncio.gather(*(hasher.verify(password, hashed) for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    hasher.shutdown()
+    return elapsed
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=64)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    hashed = get_password_hash(password)
+
+    elapsed = await run_inline(password, hashed, args.logins)
+    print(f"{'inline (blocks loop)':>22}: {args.logins / elapsed:8.1f} logins/s")
+
+    workers = 1
+    while workers <= args.max_workers:
+        elapsed = await run_pooled(password, hashed, args.logins, workers, args.executor)
+        print(f"{f'{args.executor} x{workers}':>22}: {args.logins / elapsed:8.1f} logins/s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
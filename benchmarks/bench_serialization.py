@@ -0,0 +1,86 @@
+"""Час формування JSON-відповіді зі сторінкою контактів.
+
+Порівнює шлях FastAPI з `response_model` для ORM-об'єктів (валідація кожного
+поля, включно з EmailStr) зі стандартним JSONResponse і з ORJSONResponse, шлях
+для моделей, побудованих з рядків через `to_response` (як у репозиторії
+контактів), і відповідь, що формується напряму без `response_model`.
+База даних не використовується: рядки генеруються в пам'яті.
+
+Запуск:
+    python -m benchmarks.bench_serialization --rows 10000 --iterations 20
+"""
+import argparse
+import asyncio
+import time
+from datetime import date
+
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+
+from src.auth.models import User  # noqa: F401  (реєструє модель для відношення Contact.owner)
+from src.contacts.models import Contact
+from src.contacts.repos import RESPONSE_FIELDS, to_response
+from src.contacts.schema import ContactPage
+
+
+def make_rows(count: int) -> list[tuple]:
+    return [
+        (f"First{i}", f"Last{i}", f"contact-{i}@bench.example.com", "+380000000000",
+         date(1990, 1 + i % 12, 1 + i % 28), 30 + i % 50, None if i % 3 else "note", i)
+        for i in range(count)
+    ]
+
+
+async def timed(iterations: int, func) -> tuple[float, int]:
+    size = len(await func())
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await func()
+    return (time.perf_counter() - start) / iterations * 1000, size
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    rows = make_rows(args.rows)
+    orm_contacts = [Contact(**dict(zip(RESPONSE_FIELDS, row))) for row in rows]
+    response_field = create_model_field(name="Response", type_=ContactPage, mode="serialization")
+
+    async def through_response_model(items, response_class):
+        content = await serialize_response(field=response_field, response_content=ContactPage(items=items))
+        return response_class(content).body
+
+    async def orm_json():
+        return await through_response_model(orm_contacts, JSONResponse)
+
+    async def orm_orjson():
+        return await through_response_model(orm_contacts, ORJSONResponse)
+
+    def construct_page() -> ContactPage:
+        items = [to_response(row) for row in rows]
+        return ContactPage.model_construct(items=items, next_cursor=None)
+
+    async def construct_response_model():
+        return await through_response_model(construct_page().items, ORJSONResponse)
+
+    async def construct_direct():
+        return ORJSONResponse(construct_page().model_dump()).body
+
+    cases = (
+        ("ORM + response_model + json", orm_json),
+        ("ORM + response_model + orjson", orm_orjson),
+        ("construct + response_model + orjson", construct_response_model),
+        ("construct + direct orjson", construct_direct),
+    )
+    print(f"{args.rows} contacts per response")
+    for label, func in cases:
+        elapsed, size = await timed(args.iterations, func)
+        print(f"{label:>38}: {elapsed:8.1f} ms  ({size / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
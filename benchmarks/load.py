@@ -0,0 +1,200 @@
+"""Генератор навантаження та формат результатів для `benchmarks.bench_api`.
+
+Результат прогону — JSON з версією формату, метаданими (коміт, ціль, параметри)
+та для кожного сценарію кількістю запитів, помилок, RPS і перцентилями затримки
+в мілісекундах. Два таких файли порівнюються функцією `compare`.
+"""
+import asyncio
+import itertools
+import json
+import math
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Awaitable, Callable
+
+import httpx
+
+
+RESULT_FORMAT_VERSION = 1
+PERCENTILES = (50, 95, 99)
+
+RequestFactory = Callable[[httpx.AsyncClient, int], Awaitable[httpx.Response]]
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    """Перцентиль за методом найближчого рангу.
+
+    Args:
+        sorted_values (list[float]): Відсортовані значення.
+        p (float): Перцентиль від 0 до 100.
+
+    Returns:
+        float: Значення перцентиля або 0 для порожнього списку.
+    """
+    if not sorted_values:
+        return 0.0
+    rank = max(math.ceil(p / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Зводить затримки окремих запитів сценарію.
+
+    Args:
+        latencies (list[float]): Затримки успішних і неуспішних запитів, секунди.
+        errors (int): Кількість запитів з помилкою або статусом 4xx/5xx.
+        elapsed (float): Тривалість сценарію, секунди.
+
+    Returns:
+        dict: Кількість запитів, помилок, RPS і затримки в мілісекундах.
+    """
+    values = sorted(latency * 1000 for latency in latencies)
+    latency_ms = {f"p{p}": round(percentile(values, p), 3) for p in PERCENTILES}
+    latency_ms["mean"] = round(sum(values) / len(values), 3) if values else 0.0
+    latency_ms["max"] = round(values[-1], 3) if values else 0.0
+    return {
+        "requests": len(values),
+        "errors": errors,
+        "rps": round(len(values) / elapsed, 2) if elapsed > 0 else 0.0,
+        "latency_ms": latency_ms,
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient, make_request: RequestFactory, requests: int, concurrency: int, warmup: int = 0
+) -> dict:
+    """Виконує `requests` запитів сценарію з `concurrency` одночасними клієнтами.
+
+    Args:
+        client (httpx.AsyncClient): Клієнт, налаштований на ціль.
+        make_request (RequestFactory): Функція, що виконує i-й запит сценарію.
+        requests (int): Кількість вимірюваних запитів.
+        concurrency (int): Кількість одночасних запитів.
+        warmup (int): Кількість попередніх запитів, що не враховуються.
+
+    Returns:
+        dict: Зведення з `summarize`.
+    """
+    for i in range(warmup):
+        await make_request(client, -1 - i)
+
+    latencies: list[float] = []
+    errors = 0
+    numbers = itertools.count()
+
+    async def worker():
+        nonlocal errors
+        while (i := next(numbers)) < requests:
+            start = time.perf_counter()
+            try:
+                response = await make_request(client, i)
+                failed = response.status_code >= 400
+            except httpx.HTTPError:
+                failed = True
+            latencies.append(time.perf_counter() - start)
+            errors += failed
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def git_commit() -> str | None:
+    """Повертає хеш поточного коміту або None поза репозиторієм."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def build_report(target: str, params: dict, results: dict[str, dict]) -> dict:
+    """Формує документ результатів прогону.
+
+    Args:
+        target (str): Ціль: "inprocess" або базовий URL сервера.
+        params (dict): Параметри прогону й розмір даних.
+        results (dict[str, dict]): Зведення по сценаріях.
+
+    Returns:
+        dict: Документ результатів.
+    """
+    return {
+        "format_version": RESULT_FORMAT_VERSION,
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "target": target,
+        "params": params,
+        "results": results,
+    }
+
+
+def save_report(report: dict, path: str):
+    Path(path).parent.mkdir(parents=True, exist_ok=True)
+    Path(path).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n")
+
+
+def load_report(path: str) -> dict:
+    report = json.loads(Path(path).read_text())
+    if report.get("format_version") != RESULT_FORMAT_VERSION:
+        raise ValueError(f"{path}: непідтримувана версія формату {report.get('format_version')}")
+    return report
+
+
+def compare(baseline: dict, current: dict, max_regression: float) -> tuple[list[dict], list[str]]:
+    """Порівнює два прогони за RPS і p95.
+
+    Args:
+        baseline (dict): Документ попереднього прогону.
+        current (dict): Документ нового прогону.
+        max_regression (float): Допустиме погіршення, частка (0.1 — 10%).
+
+    Returns:
+        tuple[list[dict], list[str]]: Рядки порівняння для спільних сценаріїв
+        та назви сценаріїв, що погіршилися більше ніж на `max_regression`.
+    """
+    rows, regressions = [], []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if old is None:
+            continue
+        rps_change = (new["rps"] - old["rps"]) / old["rps"] if old["rps"] else 0.0
+        old_p95, new_p95 = old["latency_ms"]["p95"], new["latency_ms"]["p95"]
+        p95_change = (new_p95 - old_p95) / old_p95 if old_p95 else 0.0
+        rows.append({
+            "scenario": name,
+            "rps": (old["rps"], new["rps"], rps_change),
+            "p95": (old_p95, new_p95, p95_change),
+        })
+        if rps_change < -max_regression or p95_change > max_regression:
+            regressions.append(name)
+    return rows, regressions
+
+
+def format_results(results: dict[str, dict]) -> str:
+    lines = [f"{'scenario':<16}{'requests':>9}{'errors':>8}{'rps':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}"]
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        lines.append(
+            f"{name:<16}{result['requests']:>9}{result['errors']:>8}{result['rps']:>10.1f}"
+            f"{latency['p50']:>10.2f}{latency['p95']:>10.2f}{latency['p99']:>10.2f}"
+        )
+    return "\n".join(lines)
+
+
+def format_comparison(rows: list[dict]) -> str:
+    lines = [f"{'scenario':<16}{'rps old':>10}{'rps new':>10}{'change':>9}{'p95 old':>10}{'p95 new':>10}{'change':>9}"]
+    for row in rows:
+        old_rps, new_rps, rps_change = row["rps"]
+        old_p95, new_p95, p95_change = row["p95"]
+        lines.append(
+            f"{row['scenario']:<16}{old_rps:>10.1f}{new_rps:>10.1f}{rps_change:>+9.1%}"
+            f"{old_p95:>10.2f}{new_p95:>10.2f}{p95_change:>+9.1%}"
+        )
+    return "\n".join(lines)
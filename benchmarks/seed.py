@@ -0,0 +1,140 @@
+"""Заповнення бази даних для навантажувальних тестів API.
+
+Створює активних користувачів `bench-0`, `bench-1`, ... з паролем
+BENCH_PASSWORD і рівномірно розподіляє між ними контакти. Попередні дані
+користувачів `bench-*` видаляються. Дані детерміновані для однакового `--seed`,
+тому результати прогонів можна порівнювати.
+
+Потребує бази з актуальною схемою (`alembic upgrade head`), адресу бере з
+DATABASE_URL. Для швидкого локального прогону на SQLite схему можна створити
+прапорцем `--create-schema`.
+
+Запуск:
+    python -m benchmarks.seed --users 10 --contacts 10000
+    python -m benchmarks.seed --users 100 --contacts 1000000 --batch-size 20000
+"""
+import argparse
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import delete, insert, select
+
+from config.db import Base, SessionLocal, engine
+from src.auth.models import User
+from src.auth.pass_utils import get_password_hash
+from src.contacts.models import Contact, birthday_key
+
+
+BENCH_USER_PREFIX = "bench"
+BENCH_PASSWORD = "bench-password"
+
+FIRST_NAMES = (
+    "Olena", "Andrii", "Iryna", "Taras", "Oksana", "Dmytro", "Natalia", "Serhii", "Yulia", "Bohdan",
+    "Kateryna", "Maksym", "Sofiia", "Oleksii", "Mariia", "Yaroslav", "Anna", "Vasyl", "Daryna", "Ivan",
+)
+LAST_NAMES = (
+    "Shevchenko", "Kovalenko", "Bondarenko", "Tkachenko", "Kravchenko", "Oliinyk", "Shevchuk", "Polishchuk",
+    "Lysenko", "Bondar", "Marchenko", "Rudenko", "Savchenko", "Petrenko", "Moroz", "Pavlenko", "Kravets",
+    "Melnyk", "Boiko", "Koval", "Karpenko", "Tkachuk", "Ivanenko", "Zinchenko", "Levchenko", "Hrytsenko",
+)
+
+
+def bench_username(index: int) -> str:
+    return f"{BENCH_USER_PREFIX}-{index}"
+
+
+def make_contact(rng: random.Random, number: int, owner_id: int) -> dict:
+    """Повертає значення полів одного контакту для пакетного INSERT."""
+    birthday = date(1950, 1, 1) + timedelta(days=rng.randrange(365 * 55))
+    return {
+        "first_name": rng.choice(FIRST_NAMES),
+        "last_name": rng.choice(LAST_NAMES),
+        "email": f"contact-{number}@bench.example.com",
+        "phone_number": f"+380{rng.randrange(10 ** 9):09d}",
+        "birthday": birthday,
+        "birthday_key": birthday_key(birthday),
+        "age": date.today().year - birthday.year,
+        "additional_info": None,
+        "owner_id": owner_id,
+    }
+
+
+async def seed(users: int, contacts: int, batch_size: int = 10000, seed_value: int = 0) -> list[int]:
+    """Створює користувачів `bench-*` та їхні контакти.
+
+    Args:
+        users (int): Кількість користувачів.
+        contacts (int): Загальна кількість контактів.
+        batch_size (int): Кількість контактів в одному INSERT.
+        seed_value (int): Зерно генератора даних.
+
+    Returns:
+        list[int]: Ідентифікатори створених користувачів у порядку їх номерів.
+    """
+    rng = random.Random(seed_value)
+    hashed_password = get_password_hash(BENCH_PASSWORD)
+    shares = [contacts // users + (1 if i < contacts % users else 0) for i in range(users)]
+
+    async with SessionLocal() as session:
+        old_ids = select(User.id).where(User.username.like(f"{BENCH_USER_PREFIX}-%"))
+        await session.execute(delete(Contact).where(Contact.owner_id.in_(old_ids)))
+        await session.execute(delete(User).where(User.username.like(f"{BENCH_USER_PREFIX}-%")))
+        user_ids = list(await session.scalars(
+            insert(User).returning(User.id),
+            [
+                {
+                    "username": bench_username(i),
+                    "email": f"{bench_username(i)}@bench.example.com",
+                    "hashed_password": hashed_password,
+                    "is_active": True,
+                    "contacts_count": shares[i],
+                }
+                for i in range(users)
+            ],
+        ))
+        await session.commit()
+
+        number = 0
+        batch = []
+        for owner_id, share in zip(user_ids, shares):
+            for _ in range(share):
+                batch.append(make_contact(rng, number, owner_id))
+                number += 1
+                if len(batch) == batch_size:
+                    await session.execute(insert(Contact), batch)
+                    await session.commit()
+                    batch = []
+        if batch:
+            await session.execute(insert(Contact), batch)
+            await session.commit()
+    return user_ids
+
+
+async def create_schema():
+    """Створює таблиці за моделями без міграцій, для локальних прогонів на SQLite."""
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--contacts", type=int, default=10000)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--create-schema", action="store_true")
+    args = parser.parse_args()
+
+    if args.create_schema:
+        await create_schema()
+    start = time.perf_counter()
+    await seed(args.users, args.contacts, args.batch_size, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"Seeded {args.users} users and {args.contacts} contacts in {elapsed:.1f}s ({args.contacts / elapsed:.0f}/s)")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
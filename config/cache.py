@@ -1,5 +1,48 @@
 from typing import Callable, Optional, Any, Tuple, Dict
 from fastapi import Request, Response
+import redis.asyncio as aioredis
+from redis.commands.core import AsyncScript
+
+from config.general import settings
+
+
+_redis: aioredis.Redis | None = None
+
+
+def get_redis() -> aioredis.Redis:
+    """Повертає спільний для процесу клієнт Redis.
+
+    Клієнт створюється при першому зверненні; з'єднання відкриваються ліниво з пулу клієнта.
+    """
+    global _redis
+    if _redis is None:
+        _redis = aioredis.from_url(settings.redis_url, encoding="utf-8")
+    return _redis
+
+
+def lua_script(source: str) -> AsyncScript:
+    """Готує Lua-скрипт для виконання через EVALSHA.
+
+    SHA1 скрипту обчислюється один раз, а сам текст надсилається в Redis лише
+    після відповіді NOSCRIPT. Клієнт передається під час виклику:
+    `await script(keys=[...], args=[...], client=get_redis())`.
+
+    Args:
+        source (str): Текст скрипту.
+
+    Returns:
+        AsyncScript: Скрипт, не прив'язаний до клієнта.
+    """
+    return AsyncScript(None, source.encode())
+
+
+async def close_redis():
+    """Закриває спільний клієнт Redis."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
 
 
 def key_builder_repo(
@@ -12,4 +55,5 @@ def key_builder_repo(
         kwargs: Dict[str, Any],
 ) -> str:
     key_parts = [namespace, func.__name__] + [str(param) for param in args[1:]]
+    key_parts += [f"{name}={value}" for name, value in sorted(kwargs.items())]
     return ":".join(key_parts)
\ No newline at end of file
@@ -1,12 +1,105 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy import exc as sa_exc
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from config.general import settings
+from config.instrumentation import record_query
+from config.metrics import (
+    DB_POOL_SIZE,
+    DB_POOL_CHECKED_OUT,
+    DB_POOL_OVERFLOW,
+    DB_POOL_CHECKOUT_SECONDS,
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    counter_value,
+    histogram_snapshot,
+)
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Пул з'єднань, що вимірює час очікування з'єднання."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            return super().connect()
+        except sa_exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            DB_POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
+
 
-engine = create_async_engine(settings.database_url, echo=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=settings.database_echo,
+    poolclass=InstrumentedQueuePool,
+    pool_size=settings.database_pool_size,
+    max_overflow=settings.database_max_overflow,
+    pool_timeout=settings.database_pool_timeout,
+    pool_recycle=settings.database_pool_recycle,
+    pool_pre_ping=settings.database_pool_pre_ping,
+)
 SessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, class_=AsyncSession
 )
+DB_POOL_SIZE.set(engine.pool.size())
+
+
+@event.listens_for(engine.sync_engine.pool, "checkout")
+@event.listens_for(engine.sync_engine.pool, "checkin")
+def _update_pool_gauges(*args):
+    pool = engine.sync_engine.pool
+    DB_POOL_CHECKED_OUT.set(pool.checkedout())
+    DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+
+def instrument_queries(sync_engine):
+    """Підключає до рушія вимірювання кількості та тривалості SQL-запитів.
+
+    Args:
+        sync_engine (Engine): Синхронний рушій, `AsyncEngine.sync_engine` для асинхронного.
+    """
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _stop_query_timer(conn, cursor, statement, parameters, context, executemany):
+        record_query(time.perf_counter() - conn.info["query_start"].pop(), statement)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def _drop_query_timer(exception_context):
+        conn = exception_context.connection
+        if conn is not None and conn.info.get("query_start"):
+            record_query(time.perf_counter() - conn.info["query_start"].pop(), exception_context.statement)
+
+
+instrument_queries(engine.sync_engine)
+
+
+def pool_stats() -> dict:
+    """Повертає поточний стан пулу з'єднань основного рушія.
+
+    Returns:
+        dict: Розмір пулу, кількість вільних і виданих з'єднань, переповнення
+        та гістограма часу очікування з'єднання.
+    """
+    pool = engine.sync_engine.pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": settings.database_max_overflow,
+        "timeout": settings.database_pool_timeout,
+        "checkout_timeouts": counter_value(DB_POOL_CHECKOUT_TIMEOUTS),
+        "checkout_seconds": histogram_snapshot(DB_POOL_CHECKOUT_SECONDS),
+    }
 
 
 class Base(DeclarativeBase):
@@ -28,3 +121,12 @@ class DatabaseSessionManager:
 async def get_db():
     async with DatabaseSessionManager(SessionLocal) as session:
         yield session
+
+
+def get_session_factory():
+    """Повертає фабрику сесій для коду, що виконується після завершення залежностей.
+
+    Сесія з `get_db` закривається до початку передачі тіла `StreamingResponse`,
+    тому потокові відповіді відкривають власну сесію з цієї фабрики.
+    """
+    return SessionLocal
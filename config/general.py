@@ -1,3 +1,5 @@
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 
 
@@ -16,7 +18,56 @@ class Settings(BaseSettings):
         mail_from (str): Адреса електронної пошти відправника (за замовчуванням "admin@admin.com").
         mail_port (int): Порт для підключення до поштового сервера (за замовчуванням 1025).
         mail_server (str): Адреса поштового сервера (за замовчуванням "localhost").
+        mail_max_connections (int): Максимальна кількість одночасних SMTP-з'єднань у пулі процесу (за замовчуванням 4).
+        mail_health_check_interval (float): Час простою SMTP-з'єднання, після якого воно перевіряється командою NOOP, секунди (за замовчуванням 30).
+        mail_timeout (float): Тайм-аут операцій з поштовим сервером, секунди (за замовчуванням 10).
         redis_url (str): URL для підключення до Redis (за замовчуванням "redis://localhost:6379/0").
+        database_echo (bool): Логування всіх SQL-запитів (за замовчуванням вимкнене).
+        database_pool_size (int): Кількість постійних з'єднань у пулі одного процесу (за замовчуванням 5).
+        database_max_overflow (int): Кількість додаткових з'єднань понад розмір пулу (за замовчуванням 10).
+        database_pool_timeout (float): Час очікування вільного з'єднання в секундах (за замовчуванням 30).
+        database_pool_recycle (int): Вік з'єднання в секундах, після якого воно перевідкривається (за замовчуванням 1800).
+        database_pool_pre_ping (bool): Перевірка з'єднання перед видачею з пулу (за замовчуванням увімкнена).
+        password_hash_workers (int): Кількість воркерів для bcrypt, 0 означає кількість ядер (за замовчуванням 0).
+        password_hash_executor (str): Тип пулу для bcrypt: "thread" або "process" (за замовчуванням "thread").
+        user_cache_local_maxsize (int): Кількість користувачів у кеші процесу (за замовчуванням 1024).
+        user_cache_local_ttl (float): Час життя користувача в кеші процесу в секундах (за замовчуванням 10).
+        user_cache_ttl (int): Час життя користувача в кеші Redis в секундах (за замовчуванням 300).
+        contact_cache_ttl (int): Час життя контакту в кеші Redis в секундах (за замовчуванням 3600).
+        max_contacts_per_user (int): Максимальна кількість контактів одного користувача (за замовчуванням 100).
+        templates_auto_reload (bool): Перевіряти зміни шаблонів на диску при кожному рендері, лише для розробки (за замовчуванням вимкнено).
+        templates_bytecode_cache_dir (str | None): Каталог для збереження скомпільованих шаблонів між запусками (за замовчуванням не використовується).
+        avatar_storage (str): Сховище аватарів: "cloudinary" або "local" (за замовчуванням "cloudinary").
+        avatar_local_dir (str): Каталог для аватарів у локальному сховищі (за замовчуванням "media/avatars").
+        avatar_base_url (str): URL, за яким роздаються аватари з локального сховища (за замовчуванням "/media/avatars").
+        avatar_max_bytes (int): Максимальний розмір завантаженого файлу аватара в байтах (за замовчуванням 5 МБ).
+        avatar_max_pixels (int): Максимальна кількість пікселів зображення аватара до декодування (за замовчуванням 25 000 000).
+        avatar_size (int): Сторона квадратної мініатюри аватара в пікселях (за замовчуванням 256).
+        avatar_format (str): Формат мініатюри: "webp" або "jpeg" (за замовчуванням "webp").
+        avatar_quality (int): Якість стиснення мініатюри (за замовчуванням 85).
+        avatar_workers (int): Кількість процесів для обробки аватарів, 0 означає кількість ядер (за замовчуванням 1).
+        jwt_algorithm (str): Алгоритм підпису токенів: "HS256" з `secret_key` або "ES256" з ключами з `jwt_keys_dir` (за замовчуванням "HS256").
+        jwt_keys_dir (str | None): Каталог з приватними ключами `<kid>.pem` для ES256 (за замовчуванням не задано).
+        jwt_active_kid (str | None): Ключ, яким підписуються нові токени; за замовчуванням останній за іменем.
+        auth_session_prefix (str): Префікс ключів сесій токенів оновлення в Redis (за замовчуванням "auth:session").
+        auth_session_max_age (int): Найбільший час життя сесії токенів оновлення від входу, секунди; оновлення токенів його не продовжує (за замовчуванням 30 днів).
+        auth_revocation_prefix (str): Префікс ключів списку відкликаних токенів у Redis (за замовчуванням "auth:revoked").
+        auth_revocation_channel (str): Канал pub/sub для розсилки відкликань токенів (за замовчуванням "auth:revocations").
+        query_budget_mode (str): Перевірка кількості SQL-запитів маршрутів і запитів N+1: "off", "log" або "raise" для тестів (за замовчуванням "off").
+        query_repeat_threshold (int): Кількість виконань однакового SQL-запиту за один HTTP-запит, що вважається N+1 (за замовчуванням 3).
+        rate_limit_enabled (bool): Обмеження частоти запитів до маршрутів входу, реєстрації та відновлення пароля (за замовчуванням увімкнене).
+        rate_limit_prefix (str): Префікс ключів лічильників запитів у Redis (за замовчуванням "rate-limit").
+        rate_limit_login_per_ip (str): Ліміт спроб входу з однієї IP-адреси (за замовчуванням "20/minute").
+        rate_limit_login_per_username (str): Ліміт спроб входу під одним іменем користувача (за замовчуванням "5/minute").
+        rate_limit_forgot_password_per_ip (str): Ліміт запитів на відновлення пароля з однієї IP-адреси (за замовчуванням "5/minute").
+        rate_limit_forgot_password_per_email (str): Ліміт запитів на відновлення пароля для одного email (за замовчуванням "3/hour").
+        rate_limit_register_per_ip (str): Ліміт реєстрацій з однієї IP-адреси (за замовчуванням "10/hour").
+        email_queue_name (str): Префікс ключів черги листів у Redis (за замовчуванням "email-queue").
+        email_queue_batch_size (int): Кількість листів, що воркер відправляє за раз (за замовчуванням 50).
+        email_queue_max_attempts (int): Кількість спроб відправки листа до переносу в чергу невдалих (за замовчуванням 5).
+        email_queue_retry_base_delay (float): Затримка перед першою повторною спробою в секундах (за замовчуванням 2).
+        email_queue_retry_max_delay (float): Максимальна затримка між спробами в секундах (за замовчуванням 300).
+        email_queue_heartbeat_ttl (float): Час без пульсу воркера, після якого його завдання повертаються в чергу, секунди (за замовчуванням 60).
 
     Конфігурація:
         env_file (str): Шлях до файлу з налаштуваннями середовища (за замовчуванням ".env").
@@ -30,7 +81,56 @@ class Settings(BaseSettings):
     mail_from: str = "admin@admin.com"
     mail_port: int = 1025
     mail_server: str = "localhost"
+    mail_max_connections: int = 4
+    mail_health_check_interval: float = 30
+    mail_timeout: float = 10
     redis_url: str = "redis://localhost:6379/0"
+    database_echo: bool = False
+    database_pool_size: int = 5
+    database_max_overflow: int = 10
+    database_pool_timeout: float = 30
+    database_pool_recycle: int = 1800
+    database_pool_pre_ping: bool = True
+    password_hash_workers: int = 0
+    password_hash_executor: Literal["thread", "process"] = "thread"
+    user_cache_local_maxsize: int = 1024
+    user_cache_local_ttl: float = 10
+    user_cache_ttl: int = 300
+    contact_cache_ttl: int = 3600
+    max_contacts_per_user: int = 100
+    templates_auto_reload: bool = False
+    templates_bytecode_cache_dir: str | None = None
+    avatar_storage: Literal["cloudinary", "local"] = "cloudinary"
+    avatar_local_dir: str = "media/avatars"
+    avatar_base_url: str = "/media/avatars"
+    avatar_max_bytes: int = 5 * 1024 * 1024
+    avatar_max_pixels: int = 25_000_000
+    avatar_size: int = 256
+    avatar_format: Literal["webp", "jpeg"] = "webp"
+    avatar_quality: int = 85
+    avatar_workers: int = 1
+    jwt_algorithm: Literal["HS256", "ES256"] = "HS256"
+    jwt_keys_dir: str | None = None
+    jwt_active_kid: str | None = None
+    auth_session_prefix: str = "auth:session"
+    auth_session_max_age: int = 30 * 24 * 60 * 60
+    auth_revocation_prefix: str = "auth:revoked"
+    auth_revocation_channel: str = "auth:revocations"
+    query_budget_mode: Literal["off", "log", "raise"] = "off"
+    query_repeat_threshold: int = 3
+    rate_limit_enabled: bool = True
+    rate_limit_prefix: str = "rate-limit"
+    rate_limit_login_per_ip: str = "20/minute"
+    rate_limit_login_per_username: str = "5/minute"
+    rate_limit_forgot_password_per_ip: str = "5/minute"
+    rate_limit_forgot_password_per_email: str = "3/hour"
+    rate_limit_register_per_ip: str = "10/hour"
+    email_queue_name: str = "email-queue"
+    email_queue_batch_size: int = 50
+    email_queue_max_attempts: int = 5
+    email_queue_retry_base_delay: float = 2
+    email_queue_retry_max_delay: float = 300
+    email_queue_heartbeat_ttl: float = 60
     
     class Config:
         env_file = ".env"
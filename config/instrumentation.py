@@ -0,0 +1,292 @@
+"""Вимірювання запитів і експорт метрик Prometheus.
+
+У режимі `query_budget_mode` "log" або "raise" кожен запит також перевіряється
+на перевищення заявленої маршрутом кількості SQL-запитів (`query_budget`) і на
+повторення однакових запитів (N+1).
+
+Для кількох воркерів uvicorn змінна середовища `PROMETHEUS_MULTIPROC_DIR`
+має вказувати на порожній каталог, спільний для всіх воркерів, і бути
+заданою до запуску процесу. Тоді кожен воркер пише метрики у свої файли, а
+`/metrics` у будь-якому воркері віддає суму по всіх процесах.
+"""
+import logging
+import os
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from fastapi_cache.types import Backend
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, generate_latest, multiprocess
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config.general import settings
+from config.metrics import (
+    CACHE_REQUESTS,
+    DB_QUERIES_PER_REQUEST,
+    DB_QUERY_SECONDS,
+    DB_SECONDS_PER_REQUEST,
+    HTTP_REQUESTS,
+    HTTP_REQUEST_SECONDS,
+    HTTP_REQUESTS_IN_PROGRESS,
+    QUERY_BUDGET_VIOLATIONS,
+)
+
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+logger = logging.getLogger("config.instrumentation")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Маршрут виконав більше SQL-запитів, ніж заявив, або повторює однаковий запит (N+1)."""
+
+
+@dataclass
+class RequestStats:
+    """Статистика SQL-запитів одного HTTP-запиту.
+
+    Attributes:
+        route (str): Шаблон маршруту.
+        queries (int): Кількість виконаних SQL-запитів.
+        db_seconds (float): Сумарний час виконання SQL-запитів, секунди.
+        statements (Counter[str] | None): Кількість виконань кожного SQL-запиту;
+            None, якщо перевірку бюджету вимкнено.
+        budget (int | None): Заявлена маршрутом максимальна кількість SQL-запитів.
+        allow_repeated (bool): Чи дозволено маршруту повторювати однакові запити.
+    """
+
+    route: str
+    queries: int = 0
+    db_seconds: float = 0.0
+    statements: Counter[str] | None = None
+    budget: int | None = None
+    allow_repeated: bool = False
+
+
+_request_stats: ContextVar[RequestStats | None] = ContextVar("request_stats", default=None)
+
+
+def current_request_stats() -> RequestStats | None:
+    """Повертає статистику поточного HTTP-запиту або None поза запитом."""
+    return _request_stats.get()
+
+
+def record_query(duration: float, statement: str | None = None):
+    """Враховує виконаний SQL-запит у метриках і статистиці поточного HTTP-запиту.
+
+    Args:
+        duration (float): Час виконання запиту, секунди.
+        statement (str | None): Текст SQL-запиту з плейсхолдерами параметрів.
+    """
+    DB_QUERY_SECONDS.observe(duration)
+    stats = _request_stats.get()
+    if stats is not None:
+        stats.queries += 1
+        stats.db_seconds += duration
+        if stats.statements is not None and statement is not None:
+            stats.statements[statement] += 1
+
+
+def query_budget(max_queries: int | None, allow_repeated: bool = False):
+    """Створює залежність, якою маршрут заявляє очікувану кількість SQL-запитів.
+
+    Використання: `@router.get(..., dependencies=[Depends(query_budget(2))])`.
+
+    Args:
+        max_queries (int | None): Максимальна кількість SQL-запитів за один
+            HTTP-запит; None, якщо вона залежить від розміру даних.
+        allow_repeated (bool): Дозволити повторення однакових запитів, наприклад
+            для пакетного імпорту.
+
+    Returns:
+        Callable: Залежність FastAPI.
+    """
+
+    async def declare_query_budget():
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.budget = max_queries
+            stats.allow_repeated = allow_repeated
+
+    return declare_query_budget
+
+
+def query_budget_violations(stats: RequestStats, repeat_threshold: int) -> list[tuple[str, str]]:
+    """Шукає перевищення бюджету SQL-запитів і повторювані запити.
+
+    Args:
+        stats (RequestStats): Статистика HTTP-запиту.
+        repeat_threshold (int): Кількість виконань однакового запиту, що вважається N+1.
+
+    Returns:
+        list[tuple[str, str]]: Вид порушення ("budget" або "repeated") та опис.
+    """
+    violations = []
+    if stats.budget is not None and stats.queries > stats.budget:
+        violations.append(
+            ("budget", f"{stats.route}: виконано {stats.queries} SQL-запитів при бюджеті {stats.budget}")
+        )
+    if stats.statements and not stats.allow_repeated:
+        for statement, count in stats.statements.items():
+            if count >= repeat_threshold:
+                violations.append(
+                    ("repeated", f"{stats.route}: запит виконано {count} разів (N+1): {' '.join(statement.split())[:200]}")
+                )
+    return violations
+
+
+def check_query_budget(stats: RequestStats):
+    """Записує в лог або викидає помилку, якщо HTTP-запит порушив бюджет SQL-запитів.
+
+    Args:
+        stats (RequestStats): Статистика HTTP-запиту.
+
+    Raises:
+        QueryBudgetExceeded: Якщо `query_budget_mode` дорівнює "raise" і знайдено порушення.
+    """
+    violations = query_budget_violations(stats, settings.query_repeat_threshold)
+    for kind, _ in violations:
+        QUERY_BUDGET_VIOLATIONS.labels(route=stats.route, kind=kind).inc()
+    if not violations:
+        return
+    if settings.query_budget_mode == "raise":
+        raise QueryBudgetExceeded("; ".join(message for _, message in violations))
+    for _, message in violations:
+        logger.warning("Query budget violation: %s", message)
+
+
+def route_template(scope: Scope) -> str:
+    """Повертає шаблон маршруту, що обробить запит, наприклад `/contacts/{contact_id}`.
+
+    Мітка за шаблоном, а не за фактичним шляхом, не дає кількості часових
+    рядів рости з кожним новим ідентифікатором у URL.
+    """
+    app = scope.get("app")
+    partial = None
+    for route in getattr(getattr(app, "router", None), "routes", ()):
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return route.path
+        if match == Match.PARTIAL and partial is None:
+            partial = route.path
+    return partial or UNMATCHED_ROUTE
+
+
+class MetricsMiddleware:
+    """ASGI middleware, що вимірює час обробки, кількість запитів у роботі
+    та SQL-запити кожного HTTP-запиту за шаблоном маршруту.
+
+    Перевірка бюджету SQL-запитів виконується після відправки відповіді, тому
+    враховує і запити потокових відповідей; у режимі "raise" помилка
+    передається серверу (у тестах — тестовому клієнту).
+
+    Attributes:
+        app (ASGIApp): Наступний застосунок у ланцюжку.
+        excluded_paths (tuple[str, ...]): Шляхи, що не вимірюються.
+    """
+
+    def __init__(self, app: ASGIApp, excluded_paths: tuple[str, ...] = ("/metrics",)):
+        self.app = app
+        self.excluded_paths = excluded_paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or scope["path"] in self.excluded_paths:
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = route_template(scope)
+        stats = RequestStats(route=route, statements=None if settings.query_budget_mode == "off" else Counter())
+        token = _request_stats.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message: Message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method=method, route=route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+            if stats.statements is not None:
+                check_query_budget(stats)
+        finally:
+            HTTP_REQUEST_SECONDS.labels(method=method, route=route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method=method, route=route, status=str(status_code)).inc()
+            DB_QUERIES_PER_REQUEST.labels(route=route).observe(stats.queries)
+            DB_SECONDS_PER_REQUEST.labels(route=route).observe(stats.db_seconds)
+            in_progress.dec()
+            _request_stats.reset(token)
+
+
+class InstrumentedCacheBackend(Backend):
+    """Обгортка бекенда fastapi-cache, що рахує влучання та промахи кешу.
+
+    Attributes:
+        backend (Backend): Бекенд, що зберігає дані.
+        tier (str): Мітка сховища для метрик, наприклад "redis".
+        name (str): Назва кешу для метрик.
+    """
+
+    def __init__(self, backend: Backend, tier: str, name: str = "fastapi_cache"):
+        self.backend = backend
+        self.tier = tier
+        self.name = name
+
+    def _count(self, result: str):
+        CACHE_REQUESTS.labels(cache=self.name, tier=self.tier, result=result).inc()
+
+    async def get_with_ttl(self, key: str) -> Tuple[int, Optional[bytes]]:
+        try:
+            ttl, value = await self.backend.get_with_ttl(key)
+        except Exception:
+            self._count("error")
+            raise
+        self._count("miss" if value is None else "hit")
+        return ttl, value
+
+    async def get(self, key: str) -> Optional[bytes]:
+        try:
+            value = await self.backend.get(key)
+        except Exception:
+            self._count("error")
+            raise
+        self._count("miss" if value is None else "hit")
+        return value
+
+    async def set(self, key: str, value: bytes, expire: Optional[int] = None) -> None:
+        await self.backend.set(key, value, expire)
+
+    async def clear(self, namespace: Optional[str] = None, key: Optional[str] = None) -> int:
+        return await self.backend.clear(namespace, key)
+
+
+def multiprocess_enabled() -> bool:
+    """Перевіряє, чи метрики пишуться в каталог, спільний для воркерів."""
+    return bool(os.environ.get("PROMETHEUS_MULTIPROC_DIR"))
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Формує вміст відповіді `/metrics`.
+
+    Returns:
+        tuple[bytes, str]: Метрики в текстовому форматі Prometheus та їх MIME-тип.
+    """
+    if multiprocess_enabled():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead():
+    """Видаляє файли gauge-метрик поточного воркера при його завершенні."""
+    if multiprocess_enabled():
+        multiprocess.mark_process_dead(os.getpid())
@@ -0,0 +1,177 @@
+from prometheus_client import Counter, Gauge, Histogram
+
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total",
+    "HTTP requests by method, route template and status code",
+    ["method", "route", "status"],
+)
+HTTP_REQUEST_SECONDS = Histogram(
+    "http_request_seconds",
+    "Time spent handling an HTTP request, including streaming the response body",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method", "route"],
+    multiprocess_mode="livesum",
+)
+
+
+DB_QUERY_SECONDS = Histogram(
+    "db_query_seconds",
+    "Time spent executing one SQL statement",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request",
+    "SQL statements executed while handling one HTTP request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100),
+)
+DB_SECONDS_PER_REQUEST = Histogram(
+    "db_seconds_per_request",
+    "Total time spent in SQL statements while handling one HTTP request",
+    ["route"],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0),
+)
+QUERY_BUDGET_VIOLATIONS = Counter(
+    "query_budget_violations_total",
+    "Requests that exceeded the route's SQL query budget or repeated a statement (N+1)",
+    ["route", "kind"],
+)
+
+
+DB_POOL_SIZE = Gauge(
+    "db_pool_size", "Configured size of the database connection pool", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out", "Database connections currently checked out", multiprocess_mode="livesum"
+)
+DB_POOL_OVERFLOW = Gauge(
+    "db_pool_overflow", "Database connections opened above the pool size", multiprocess_mode="livesum"
+)
+DB_POOL_CHECKOUT_SECONDS = Histogram(
+    "db_pool_checkout_seconds",
+    "Time spent waiting for a database connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+DB_POOL_CHECKOUT_TIMEOUTS = Counter(
+    "db_pool_checkout_timeouts_total", "Pool checkouts that failed with a timeout"
+)
+
+
+PASSWORD_HASH_QUEUE_DEPTH = Gauge(
+    "password_hash_queue_depth",
+    "Password hashing operations waiting for a free worker",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_IN_PROGRESS = Gauge(
+    "password_hash_in_progress",
+    "Password hashing operations running in the worker pool",
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_SECONDS = Histogram(
+    "password_hash_seconds",
+    "Time spent hashing or verifying a password, including queueing",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+
+
+CACHE_REQUESTS = Counter(
+    "cache_requests_total",
+    "Cache lookups by cache name, tier and result",
+    ["cache", "tier", "result"],
+)
+CACHE_WRITE_FAILURES = Counter(
+    "cache_write_failures_total",
+    "Cache writes and invalidations that still failed after retries",
+    ["cache", "operation"],
+)
+
+
+EMAIL_QUEUE_DEPTH = Gauge(
+    "email_queue_depth",
+    "Email jobs in the queue by state",
+    ["state"],
+    multiprocess_mode="livemax",
+)
+EMAIL_JOBS = Counter(
+    "email_jobs_total",
+    "Email jobs by outcome: enqueued, sent, retried or dead",
+    ["result"],
+)
+EMAIL_JOB_LATENCY_SECONDS = Histogram(
+    "email_job_latency_seconds",
+    "Time from enqueueing an email job to its successful delivery",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 900.0),
+)
+EMAIL_BATCH_SECONDS = Histogram(
+    "email_batch_seconds",
+    "Time spent sending one batch of email jobs",
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+
+
+SMTP_CONNECTIONS_OPEN = Gauge(
+    "smtp_connections_open", "SMTP connections currently open in the pool", multiprocess_mode="livesum"
+)
+SMTP_CONNECTIONS_OPENED = Counter(
+    "smtp_connections_opened_total", "SMTP connections opened, including reconnects after failures"
+)
+
+
+RATE_LIMITED_REQUESTS = Counter(
+    "rate_limited_requests_total",
+    "Requests rejected by the rate limiter by route and the scope whose limit was exceeded",
+    ["route", "scope"],
+)
+RATE_LIMIT_FALLBACKS = Counter(
+    "rate_limit_fallbacks_total", "Rate limit checks counted in process memory because Redis was unavailable"
+)
+
+
+REVOCATIONS_UNPUBLISHED = Counter(
+    "auth_revocations_unpublished_total",
+    "Token revocations that could not be written to Redis and wait for replay",
+)
+
+
+def counter_value(counter: Counter) -> float:
+    """Повертає поточне значення лічильника без міток.
+
+    Args:
+        counter (Counter): Лічильник prometheus_client.
+
+    Returns:
+        float: Значення лічильника.
+    """
+    for metric in counter.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_total"):
+                return sample.value
+    return 0.0
+
+
+def histogram_snapshot(histogram: Histogram) -> dict:
+    """Повертає поточні значення гістограми у вигляді словника.
+
+    Args:
+        histogram (Histogram): Гістограма prometheus_client без міток.
+
+    Returns:
+        dict: Кількість спостережень, їх сума та кумулятивні лічильники за межами кошиків.
+    """
+    snapshot = {"count": 0, "sum": 0.0, "buckets": {}}
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith("_bucket"):
+                snapshot["buckets"][sample.labels["le"]] = sample.value
+            elif sample.name.endswith("_count"):
+                snapshot["count"] = sample.value
+            elif sample.name.endswith("_sum"):
+                snapshot["sum"] = sample.value
+    return snapshot
@@ -0,0 +1,69 @@
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
+
+from config.general import settings
+
+
+TEMPLATES_DIR = "src/templates"
+
+env = Environment(
+    loader=FileSystemLoader(TEMPLATES_DIR),
+    autoescape=select_autoescape(["html"]),
+    auto_reload=settings.templates_auto_reload,
+    bytecode_cache=(
+        FileSystemBytecodeCache(settings.templates_bytecode_cache_dir)
+        if settings.templates_bytecode_cache_dir
+        else None
+    ),
+    cache_size=-1,
+    enable_async=True,
+)
+"""Середовище Jinja2 для листів і HTML-форм.
+
+Без `auto_reload` шаблони не перевіряються на зміни на диску, а з
+`templates_bytecode_cache_dir` скомпільований код зберігається між запусками.
+"""
+
+_compiled: dict[str, Template] = {}
+
+
+def precompile_templates() -> int:
+    """Компілює всі шаблони з `TEMPLATES_DIR`, щоб запити не читали їх з диску.
+
+    Викликається при запуску додатку. Повторний виклик перекомпільовує шаблони.
+
+    Returns:
+        int: Кількість скомпільованих шаблонів.
+    """
+    for name in env.list_templates(extensions=["html"]):
+        _compiled[name] = env.get_template(name)
+    return len(_compiled)
+
+
+def get_template(name: str) -> Template:
+    """Повертає скомпільований шаблон, компілюючи його при першому зверненні.
+
+    Args:
+        name (str): Ім'я файлу шаблону.
+
+    Returns:
+        Template: Скомпільований шаблон.
+    """
+    if settings.templates_auto_reload:
+        return env.get_template(name)
+    template = _compiled.get(name)
+    if template is None:
+        template = _compiled[name] = env.get_template(name)
+    return template
+
+
+async def render_template(name: str, **context) -> str:
+    """Асинхронно рендерить шаблон.
+
+    Args:
+        name (str): Ім'я файлу шаблону.
+        **context: Змінні шаблону.
+
+    Returns:
+        str: Відрендерений HTML.
+    """
+    return await get_template(name).render_async(**context)
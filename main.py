@@ -1,15 +1,25 @@
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, Path
+from fastapi import FastAPI, Path, Response
+from fastapi.responses import ORJSONResponse
 from fastapi_cache import FastAPICache
 from fastapi_cache.backends.redis import RedisBackend
 from fastapi.security import OAuth2PasswordBearer
-import redis.asyncio as aioredis
+from fastapi.staticfiles import StaticFiles
 from starlette.middleware.cors import CORSMiddleware
 
 from src.contacts.routers import router as contacts_router
 from src.auth.routers import router as auth_routers
 from config.general import settings
+from config.db import pool_stats
+from config.instrumentation import InstrumentedCacheBackend, MetricsMiddleware, mark_process_dead, render_metrics
+from config.cache import get_redis, close_redis
+from config.templates import precompile_templates
+from src.auth.pass_utils import password_hasher
+from src.auth.mail_utils import smtp_pool
+from src.auth.avatars import avatar_processor
+from src.auth.revocation import revocation_list
+from src.auth.keys import key_ring
 
 
 @asynccontextmanager
@@ -23,19 +33,31 @@ async def lifespan(app: FastAPI):
         app (FastAPI): Екземпляр додатку FastAPI.
     
     Використовує:
-        RedisBackend для кешування в Redis.
+        RedisBackend для кешування в Redis, обгорнутий лічильниками влучань і промахів.
+        password_hasher, пул воркерів якого зупиняється при завершенні.
+        smtp_pool, SMTP-з'єднання якого закриваються при завершенні.
+        precompile_templates, що компілює шаблони листів і форм при запуску.
+        avatar_processor, пул процесів якого зупиняється при завершенні.
+        revocation_list, копія якого в пам'яті синхронізується з Redis під час роботи.
+        mark_process_dead, що прибирає файли метрик воркера в multiprocess-режимі.
     """
-    redis = aioredis.from_url(settings.redis_url, encoding="utf-8")
-    FastAPICache.init(RedisBackend(redis), prefix="fastapi-cache")
+    FastAPICache.init(InstrumentedCacheBackend(RedisBackend(get_redis()), tier="redis"), prefix="fastapi-cache")
+    precompile_templates()
+    revocation_list.start()
     yield
-    await redis.close()
+    await revocation_list.stop()
+    await close_redis()
+    await smtp_pool.close()
+    password_hasher.shutdown()
+    avatar_processor.shutdown()
+    mark_process_dead()
 
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
 """Екземпляр FastAPI додатку.
 
 Ініціалізує FastAPI додаток з підтримкою кешування через Redis і включає необхідні роутери
-для контактів та автентифікації.
+для контактів та автентифікації. JSON-відповіді за замовчуванням кодуються через orjson.
 """
 
 app.include_router(router=contacts_router, prefix="/contacts", tags=["contacts"])
@@ -50,6 +72,10 @@ app.include_router(router=auth_routers, prefix="/auth", tags=["auth"])
 Імпортується з `src.auth.routers` і доступний за шляхом `/auth`.
 """
 
+if settings.avatar_storage == "local":
+    app.mount(settings.avatar_base_url, StaticFiles(directory=settings.avatar_local_dir, check_dir=False), name="avatars")
+    """Роздача аватарів з локального сховища, якщо воно вибране в `avatar_storage`."""
+
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
 """OAuth2 схема безпеки для автентифікації.
 
@@ -69,6 +95,12 @@ app.add_middleware(
 забезпечує передачу cookies та інші заголовки.
 """
 
+app.add_middleware(MetricsMiddleware)
+"""Middleware, що вимірює час обробки, запити в роботі та SQL-запити кожного маршруту.
+
+Додається останнім, тому виконується першим і враховує час усіх інших middleware.
+"""
+
 @app.get("/ping")
 async def ping():
     """Тестовий маршрут для перевірки доступності сервера.
@@ -79,3 +111,45 @@ async def ping():
         JSON об'єкт з полем "message" = "pong".
     """
     return {"message": "pong"}
+
+
+@app.get("/.well-known/jwks.json")
+async def jwks():
+    """Публічні ключі для перевірки токенів доступу.
+
+    Інші сервіси можуть кешувати ці ключі й перевіряти токени локально,
+    не звертаючись до цього додатку. Ключ токена визначається полем `kid`
+    у його заголовку.
+
+    Відповідь:
+        JSON Web Key Set; для HS256 список ключів порожній.
+    """
+    return key_ring.jwks()
+
+
+@app.get("/health/db-pool")
+async def db_pool():
+    """Стан пулу з'єднань з базою даних.
+
+    Дозволяє підібрати розмір пулу з урахуванням кількості воркерів uvicorn
+    та `max_connections` у Postgres. Значення відносяться до поточного процесу.
+
+    Відповідь:
+        JSON об'єкт з розміром пулу, кількістю виданих з'єднань, переповненням
+        та гістограмою часу очікування з'єднання.
+    """
+    return pool_stats()
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Метрики додатку у форматі Prometheus.
+
+    Якщо задано `PROMETHEUS_MULTIPROC_DIR`, значення збираються з усіх
+    воркерів uvicorn, інакше — лише з поточного процесу.
+
+    Відповідь:
+        Текстовий формат експозиції Prometheus.
+    """
+    content, media_type = render_metrics()
+    return Response(content=content, media_type=media_type)
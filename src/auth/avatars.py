@@ -0,0 +1,259 @@
+import asyncio
+import io
+import os
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import AsyncIterator
+
+from cloudinary.uploader import upload
+from fastapi import HTTPException, Request, status
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.datastructures import UploadFile
+from starlette.formparsers import MultiPartException, MultiPartParser
+
+from config.general import settings
+
+
+ALLOWED_CONTENT_TYPES = ("image/jpeg", "image/png")
+ALLOWED_IMAGE_FORMATS = ("JPEG", "PNG")
+CONTENT_TYPES = {"webp": "image/webp", "jpeg": "image/jpeg"}
+
+# Запас на заголовки multipart поверх розміру самого файлу.
+MULTIPART_OVERHEAD = 16 * 1024
+
+
+class AvatarTooLargeError(ValueError):
+    """Файл аватара перевищує дозволений розмір."""
+
+
+class InvalidImageError(ValueError):
+    """Файл аватара не є зображенням JPEG або PNG."""
+
+
+async def limit_stream(stream: AsyncIterator[bytes], max_bytes: int) -> AsyncIterator[bytes]:
+    """Передає частини потоку далі, доки їх сумарний розмір не перевищить `max_bytes`.
+
+    Args:
+        stream (AsyncIterator[bytes]): Потік тіла запиту.
+        max_bytes (int): Максимальний розмір у байтах.
+
+    Yields:
+        bytes: Частини потоку.
+
+    Raises:
+        AvatarTooLargeError: Якщо потік довший за `max_bytes`.
+    """
+    received = 0
+    async for chunk in stream:
+        received += len(chunk)
+        if received > max_bytes:
+            raise AvatarTooLargeError(f"Файл більший за {max_bytes} байт")
+        yield chunk
+
+
+async def read_avatar_upload(request: Request) -> tuple[str | None, bytes]:
+    """Залежність, що читає файл аватара з multipart-запиту з обмеженням розміру.
+
+    Тіло запиту розбирається потоково, і читання переривається, щойно воно
+    перевищує `avatar_max_bytes`, тому великий файл не записується ні в пам'ять,
+    ні на диск повністю.
+
+    Args:
+        request (Request): Запит з полем `file`.
+
+    Returns:
+        tuple[str | None, bytes]: MIME-тип і вміст файлу.
+
+    Raises:
+        HTTPException: 413, якщо файл завеликий; 400, якщо файл відсутній або запит некоректний.
+    """
+    max_bytes = settings.avatar_max_bytes + MULTIPART_OVERHEAD
+    content_length = request.headers.get("content-length")
+    if content_length is not None and content_length.isdigit() and int(content_length) > max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Файл аватара завеликий")
+
+    parser = MultiPartParser(request.headers, limit_stream(request.stream(), max_bytes), max_files=1, max_fields=0)
+    try:
+        form = await parser.parse()
+    except AvatarTooLargeError:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Файл аватара завеликий")
+    except MultiPartException as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=e.message)
+
+    file = form.get("file")
+    if not isinstance(file, UploadFile):
+        await form.close()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Поле file обов'язкове")
+    try:
+        data = await file.read()
+    finally:
+        await form.close()
+    if len(data) > settings.avatar_max_bytes:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail="Файл аватара завеликий")
+    return file.content_type, data
+
+
+def make_thumbnail(data: bytes, size: int, image_format: str, quality: int, max_pixels: int) -> bytes:
+    """Обрізає зображення до квадрата, зменшує до `size` пікселів і перекодовує.
+
+    Виконується в окремому процесі. Розміри зображення перевіряються за
+    заголовком до декодування, тому невеликий файл з величезною роздільною
+    здатністю (decompression bomb) відхиляється без виділення пам'яті під пікселі.
+
+    Args:
+        data (bytes): Вміст JPEG або PNG файлу.
+        size (int): Сторона мініатюри в пікселях.
+        image_format (str): Формат результату: "webp" або "jpeg".
+        quality (int): Якість стиснення.
+        max_pixels (int): Максимальна кількість пікселів вихідного зображення.
+
+    Returns:
+        bytes: Вміст мініатюри.
+
+    Raises:
+        InvalidImageError: Якщо дані не є зображенням JPEG або PNG або зображення завелике.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format not in ALLOWED_IMAGE_FORMATS:
+                raise InvalidImageError(f"Непідтримуваний формат {image.format}")
+            width, height = image.size
+            if width * height > max_pixels:
+                raise InvalidImageError(f"Зображення {width}x{height} більше за {max_pixels} пікселів")
+            image = ImageOps.exif_transpose(image)
+            image = ImageOps.fit(image, (size, size), method=Image.Resampling.LANCZOS)
+            if image_format == "jpeg" or image.mode not in ("RGB", "RGBA"):
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, format=image_format.upper(), quality=quality, optimize=True)
+            return output.getvalue()
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as e:
+        raise InvalidImageError(str(e)) from e
+
+
+class AvatarProcessor:
+    """Обробка аватарів у пулі процесів, щоб Pillow не блокував цикл подій.
+
+    Attributes:
+        max_workers (int): Кількість процесів, 0 означає кількість ядер.
+        size (int): Сторона мініатюри в пікселях.
+        image_format (str): Формат мініатюри: "webp" або "jpeg".
+        quality (int): Якість стиснення.
+        max_pixels (int): Максимальна кількість пікселів завантаженого зображення.
+    """
+
+    def __init__(self, max_workers: int, size: int, image_format: str, quality: int, max_pixels: int):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.size = size
+        self.image_format = image_format
+        self.quality = quality
+        self.max_pixels = max_pixels
+        self._executor: ProcessPoolExecutor | None = None
+
+    @property
+    def content_type(self) -> str:
+        return CONTENT_TYPES[self.image_format]
+
+    async def process(self, data: bytes) -> bytes:
+        """Створює мініатюру аватара в пулі процесів.
+
+        Args:
+            data (bytes): Вміст завантаженого файлу.
+
+        Returns:
+            bytes: Вміст мініатюри.
+
+        Raises:
+            InvalidImageError: Якщо файл не є зображенням JPEG або PNG або зображення завелике.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, make_thumbnail, data, self.size, self.image_format, self.quality, self.max_pixels
+        )
+
+    def shutdown(self):
+        """Зупиняє пул процесів."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+class AvatarStorage(ABC):
+    """Базовий клас сховища аватарів."""
+
+    @abstractmethod
+    async def save(self, name: str, data: bytes, content_type: str) -> str:
+        """Зберігає аватар і повертає його публічний URL.
+
+        Args:
+            name (str): Ім'я файлу без розширення.
+            data (bytes): Вміст зображення.
+            content_type (str): MIME-тип зображення.
+
+        Returns:
+            str: URL збереженого аватара.
+        """
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """Сховище аватарів у Cloudinary. Завантаження виконується в окремому потоці.
+
+    Attributes:
+        folder (str): Каталог у Cloudinary.
+    """
+
+    def __init__(self, folder: str = "avatars"):
+        self.folder = folder
+
+    async def save(self, name: str, data: bytes, content_type: str) -> str:
+        result = await asyncio.to_thread(
+            upload, data, folder=self.folder, public_id=name, overwrite=True, resource_type="image"
+        )
+        url = result.get("secure_url")
+        if not url:
+            raise RuntimeError("Cloudinary did not return secure_url")
+        return url
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """Сховище аватарів на локальному диску для розробки та тестів.
+
+    Attributes:
+        directory (Path): Каталог для файлів.
+        base_url (str): URL, за яким каталог роздається додатком.
+    """
+
+    def __init__(self, directory: str, base_url: str):
+        self.directory = Path(directory)
+        self.base_url = base_url.rstrip("/")
+
+    async def save(self, name: str, data: bytes, content_type: str) -> str:
+        extension = content_type.split("/")[-1]
+        filename = f"{name}.{extension}"
+        await asyncio.to_thread(self._write, filename, data)
+        return f"{self.base_url}/{filename}"
+
+    def _write(self, filename: str, data: bytes):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.directory / f".{filename}.tmp"
+        tmp_path.write_bytes(data)
+        tmp_path.replace(self.directory / filename)
+
+
+def get_avatar_storage() -> AvatarStorage:
+    """Повертає сховище аватарів, вибране в налаштуваннях `avatar_storage`."""
+    if settings.avatar_storage == "local":
+        return LocalAvatarStorage(settings.avatar_local_dir, settings.avatar_base_url)
+    return CloudinaryAvatarStorage()
+
+
+avatar_processor = AvatarProcessor(
+    max_workers=settings.avatar_workers,
+    size=settings.avatar_size,
+    image_format=settings.avatar_format,
+    quality=settings.avatar_quality,
+    max_pixels=settings.avatar_max_pixels,
+)
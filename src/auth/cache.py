@@ -0,0 +1,114 @@
+import json
+import time
+from collections import OrderedDict
+
+from redis.exceptions import RedisError
+
+from config.cache import get_redis
+from config.general import settings
+from config.metrics import CACHE_REQUESTS
+
+
+class UserPrincipalCache:
+    """Дворівневий кеш даних автентифікованого користувача.
+
+    Перший рівень — невеликий LRU-кеш у пам'яті процесу з коротким TTL, другий —
+    спільний для всіх воркерів Redis. Недоступність Redis не ламає автентифікацію:
+    запит просто йде в базу даних.
+
+    Attributes:
+        maxsize (int): Максимальна кількість записів у пам'яті процесу.
+        local_ttl (float): Час життя запису в пам'яті процесу, секунди.
+        redis_ttl (int): Час життя запису в Redis, секунди.
+        prefix (str): Префікс ключів у Redis.
+    """
+
+    name = "user_principal"
+
+    def __init__(self, maxsize: int, local_ttl: float, redis_ttl: int, prefix: str = "user-principal"):
+        self.maxsize = maxsize
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.prefix = prefix
+        self._local: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+
+    def _key(self, username: str) -> str:
+        return f"{self.prefix}:{username}"
+
+    def _get_local(self, username: str) -> dict | None:
+        entry = self._local.get(username)
+        if entry is None:
+            return None
+        expires_at, principal = entry
+        if expires_at < time.monotonic():
+            del self._local[username]
+            return None
+        self._local.move_to_end(username)
+        return principal
+
+    def _set_local(self, username: str, principal: dict):
+        self._local[username] = (time.monotonic() + self.local_ttl, principal)
+        self._local.move_to_end(username)
+        while len(self._local) > self.maxsize:
+            self._local.popitem(last=False)
+
+    async def get(self, username: str) -> dict | None:
+        """Шукає користувача спочатку в пам'яті процесу, потім у Redis.
+
+        Args:
+            username (str): Ім'я користувача з токена.
+
+        Returns:
+            dict | None: Дані користувача або None, якщо їх немає в кеші.
+        """
+        principal = self._get_local(username)
+        if principal is not None:
+            CACHE_REQUESTS.labels(cache=self.name, tier="local", result="hit").inc()
+            return principal
+        CACHE_REQUESTS.labels(cache=self.name, tier="local", result="miss").inc()
+
+        try:
+            raw = await get_redis().get(self._key(username))
+        except RedisError:
+            raw = None
+        if raw is None:
+            CACHE_REQUESTS.labels(cache=self.name, tier="redis", result="miss").inc()
+            return None
+        CACHE_REQUESTS.labels(cache=self.name, tier="redis", result="hit").inc()
+        principal = json.loads(raw)
+        self._set_local(username, principal)
+        return principal
+
+    async def set(self, username: str, principal: dict):
+        """Зберігає дані користувача в обох рівнях кешу.
+
+        Args:
+            username (str): Ім'я користувача.
+            principal (dict): Дані користувача.
+        """
+        self._set_local(username, principal)
+        try:
+            await get_redis().set(self._key(username), json.dumps(principal), ex=self.redis_ttl)
+        except RedisError:
+            pass
+
+    async def invalidate(self, username: str):
+        """Видаляє користувача з кешу після зміни його даних.
+
+        Записи в пам'яті інших воркерів залишаються не довше за `local_ttl`.
+
+        Args:
+            username (str): Ім'я користувача.
+        """
+        self._local.pop(username, None)
+        try:
+            await get_redis().delete(self._key(username))
+        except RedisError:
+            pass
+
+
+user_cache = UserPrincipalCache(
+    maxsize=settings.user_cache_local_maxsize,
+    local_ttl=settings.user_cache_local_ttl,
+    redis_ttl=settings.user_cache_ttl,
+)
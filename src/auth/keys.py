@@ -0,0 +1,212 @@
+"""Ключі підпису JWT.
+
+Генерація нового ключа для ротації:
+    python -m src.auth.keys generate --dir keys --kid 2026-10
+"""
+import argparse
+import asyncio
+import time
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwk, jwt, JWTError
+from jose.backends.base import Key
+
+from config.general import settings
+
+
+ASYMMETRIC_ALGORITHMS = ("ES256",)
+
+
+class KeyRing:
+    """Набір ключів для підпису та перевірки токенів.
+
+    Для HS256 використовується `secret_key`. Для ES256 завантажуються всі
+    приватні ключі `<kid>.pem` з каталогу: новий токен підписується активним
+    ключем, а перевіряється ключем з `kid` у заголовку токена, тому під час
+    ротації старі токени залишаються дійсними, доки їх ключ лежить у каталозі.
+    Ключі розбираються один раз і зберігаються як готові об'єкти.
+
+    Attributes:
+        algorithm (str): Алгоритм підпису.
+        active_kid (str | None): Ідентифікатор ключа, яким підписуються нові токени.
+    """
+
+    def __init__(self, algorithm: str, secret_key: str, keys_dir: str | None = None, active_kid: str | None = None):
+        self.algorithm = algorithm
+        self._signing_keys: dict[str, Key] = {}
+        self._verification_keys: dict[str, Key] = {}
+        self._public_jwks: list[dict] = []
+        if algorithm not in ASYMMETRIC_ALGORITHMS:
+            self.active_kid = None
+            self._secret = jwk.construct(secret_key, algorithm)
+            return
+
+        if keys_dir is None:
+            raise ValueError(f"{algorithm} потребує каталогу ключів jwt_keys_dir")
+        for path in sorted(Path(keys_dir).glob("*.pem")):
+            self.add_key(path.stem, path.read_text())
+        if not self._signing_keys:
+            raise ValueError(f"У каталозі {keys_dir} немає ключів *.pem")
+        self.active_kid = active_kid or max(self._signing_keys)
+        if self.active_kid not in self._signing_keys:
+            raise ValueError(f"Ключ {self.active_kid} не знайдено в {keys_dir}")
+
+    def add_key(self, kid: str, private_pem: str):
+        """Додає приватний ключ до набору.
+
+        Args:
+            kid (str): Ідентифікатор ключа.
+            private_pem (str): Приватний ключ у форматі PEM.
+        """
+        private_key = jwk.construct(private_pem, self.algorithm)
+        public_key = private_key.public_key()
+        self._signing_keys[kid] = private_key
+        self._verification_keys[kid] = public_key
+        self._public_jwks = [
+            {**key.to_dict(), "kid": key_id, "use": "sig"} for key_id, key in self._verification_keys.items()
+        ]
+
+    def encode(self, claims: dict) -> str:
+        """Підписує токен активним ключем.
+
+        Args:
+            claims (dict): Поля токена.
+
+        Returns:
+            str: Підписаний токен.
+        """
+        if self.active_kid is None:
+            return jwt.encode(claims, self._secret, algorithm=self.algorithm)
+        return jwt.encode(
+            claims, self._signing_keys[self.active_kid], algorithm=self.algorithm, headers={"kid": self.active_kid}
+        )
+
+    def decode(self, token: str) -> dict:
+        """Перевіряє підпис і строк дії токена.
+
+        Args:
+            token (str): Токен.
+
+        Returns:
+            dict: Поля токена.
+
+        Raises:
+            JWTError: Якщо токен недійсний, завершився або підписаний невідомим ключем.
+        """
+        if self.active_kid is None:
+            return jwt.decode(token, self._secret, algorithms=[self.algorithm])
+        kid = jwt.get_unverified_header(token).get("kid")
+        key = self._verification_keys.get(kid)
+        if key is None:
+            raise JWTError("Unknown signing key")
+        return jwt.decode(token, key, algorithms=[self.algorithm])
+
+    def jwks(self) -> dict:
+        """Повертає публічні ключі у форматі JWKS.
+
+        Returns:
+            dict: Об'єкт `{"keys": [...]}`; для HS256 список порожній.
+        """
+        return {"keys": self._public_jwks}
+
+
+class JWKSKeyCache:
+    """Кеш публічних ключів з JWKS-ендпоінту для перевірки токенів в інших сервісах.
+
+    Ключі розбираються один раз і зберігаються в пам'яті процесу. Невідомий
+    `kid` означає ротацію ключів, тоді набір завантажується заново, але не
+    частіше за `min_refresh_interval`.
+
+    Attributes:
+        fetch (Callable[[], Awaitable[dict]]): Функція, що повертає вміст JWKS.
+        ttl (float): Час, після якого набір ключів оновлюється, секунди.
+        min_refresh_interval (float): Мінімальна пауза між завантаженнями, секунди.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[dict]], ttl: float = 3600, min_refresh_interval: float = 30):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.min_refresh_interval = min_refresh_interval
+        self._keys: dict[str, tuple[str, Key]] = {}
+        self._fetched_at = float("-inf")
+        self._lock = asyncio.Lock()
+
+    async def _refresh(self):
+        async with self._lock:
+            if time.monotonic() - self._fetched_at < self.min_refresh_interval:
+                return
+            document = await self.fetch()
+            self._keys = {
+                item["kid"]: (item["alg"], jwk.construct(item, item["alg"])) for item in document.get("keys", [])
+            }
+            self._fetched_at = time.monotonic()
+
+    async def get_key(self, kid: str) -> tuple[str, Key] | None:
+        """Повертає алгоритм і ключ за `kid`, за потреби оновлюючи набір.
+
+        Args:
+            kid (str): Ідентифікатор ключа.
+
+        Returns:
+            tuple[str, Key] | None: Алгоритм і ключ або None, якщо такого ключа немає.
+        """
+        if kid not in self._keys or time.monotonic() - self._fetched_at > self.ttl:
+            await self._refresh()
+        return self._keys.get(kid)
+
+    async def decode(self, token: str) -> dict:
+        """Перевіряє токен ключем з JWKS.
+
+        Args:
+            token (str): Токен.
+
+        Returns:
+            dict: Поля токена.
+
+        Raises:
+            JWTError: Якщо токен недійсний або підписаний невідомим ключем.
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        entry = await self.get_key(kid) if kid else None
+        if entry is None:
+            raise JWTError("Unknown signing key")
+        algorithm, key = entry
+        return jwt.decode(token, key, algorithms=[algorithm])
+
+
+def generate_private_key_pem() -> str:
+    """Генерує приватний ключ P-256 для ES256 у форматі PEM."""
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    return private_key.private_bytes(
+        serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8, serialization.NoEncryption()
+    ).decode()
+
+
+key_ring = KeyRing(
+    algorithm=settings.jwt_algorithm,
+    secret_key=settings.secret_key,
+    keys_dir=settings.jwt_keys_dir,
+    active_kid=settings.jwt_active_kid,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    generate = subparsers.add_parser("generate")
+    generate.add_argument("--dir", required=True)
+    generate.add_argument("--kid", required=True)
+    args = parser.parse_args()
+
+    path = Path(args.dir) / f"{args.kid}.pem"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(generate_private_key_pem())
+    path.chmod(0o600)
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
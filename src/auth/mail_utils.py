@@ -1,37 +1,238 @@
-from fastapi_mail import ConnectionConfig, MessageSchema, FastMail
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from email.message import EmailMessage
+from typing import AsyncIterator
+
+import aiosmtplib
 
 from config.general import settings
+from config.metrics import SMTP_CONNECTIONS_OPEN, SMTP_CONNECTIONS_OPENED
+
+
+VERIFICATION_SUBJECT = "Email Verification"
+RESET_PASSWORD_SUBJECT = "Reset Password"
+
+
+class SMTPPool:
+    """Пул постійних SMTP-з'єднань.
+
+    З'єднання відкриваються за потреби, але не більше `max_connections`
+    одночасно, і повертаються в пул після відправки. З'єднання, що простояло
+    довше за `health_check_interval`, перед використанням перевіряється командою
+    NOOP; з'єднання, яке не відповіло або зламалося під час відправки,
+    закривається й замінюється новим.
+
+    Attributes:
+        hostname (str): Адреса поштового сервера.
+        port (int): Порт поштового сервера.
+        username (str | None): Ім'я користувача для автентифікації.
+        password (str | None): Пароль для автентифікації.
+        max_connections (int): Максимальна кількість одночасних з'єднань.
+        health_check_interval (float): Час простою, після якого з'єднання перевіряється, секунди.
+        timeout (float): Тайм-аут мережевих операцій, секунди.
+    """
+
+    def __init__(
+        self,
+        hostname: str,
+        port: int,
+        username: str | None = None,
+        password: str | None = None,
+        max_connections: int = 4,
+        health_check_interval: float = 30,
+        timeout: float = 10,
+    ):
+        self.hostname = hostname
+        self.port = port
+        self.username = username
+        self.password = password
+        self.max_connections = max_connections
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self._idle: list[tuple[aiosmtplib.SMTP, float]] = []
+        self._semaphore = asyncio.Semaphore(max_connections)
+        self._open = 0
+
+    async def _connect(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.hostname,
+            port=self.port,
+            username=self.username,
+            password=self.password,
+            timeout=self.timeout,
+            use_tls=False,
+            start_tls=False,
+        )
+        await smtp.connect()
+        self._open += 1
+        SMTP_CONNECTIONS_OPEN.set(self._open)
+        SMTP_CONNECTIONS_OPENED.inc()
+        return smtp
+
+    async def _discard(self, smtp: aiosmtplib.SMTP):
+        self._open -= 1
+        SMTP_CONNECTIONS_OPEN.set(self._open)
+        try:
+            if smtp.is_connected:
+                await smtp.quit()
+        except (aiosmtplib.SMTPException, OSError):
+            smtp.close()
+
+    async def _is_healthy(self, smtp: aiosmtplib.SMTP, idle_since: float) -> bool:
+        if not smtp.is_connected:
+            return False
+        if time.monotonic() - idle_since < self.health_check_interval:
+            return True
+        try:
+            await smtp.noop()
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+        return True
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Видає з'єднання з пулу на час блоку `async with`.
+
+        Якщо блок завершився винятком, з'єднання може бути в невизначеному стані,
+        тому воно закривається, а не повертається в пул.
+
+        Yields:
+            aiosmtplib.SMTP: Підключене й автентифіковане з'єднання.
+
+        Raises:
+            aiosmtplib.SMTPException: Якщо не вдалося підключитися або автентифікуватися.
+            OSError: Якщо поштовий сервер недоступний.
+        """
+        async with self._semaphore:
+            smtp = None
+            while self._idle:
+                candidate, idle_since = self._idle.pop()
+                if await self._is_healthy(candidate, idle_since):
+                    smtp = candidate
+                    break
+                await self._discard(candidate)
+            if smtp is None:
+                smtp = await self._connect()
+            try:
+                yield smtp
+            except BaseException:
+                await self._discard(smtp)
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def _send_over_connection(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """Відправляє листи по черзі через одне з'єднання, перепідключаючись один раз після розриву."""
+        results: list[Exception | None] = []
+        reconnected = False
+        while len(results) < len(messages):
+            try:
+                async with self.connection() as smtp:
+                    for message in messages[len(results):]:
+                        try:
+                            await smtp.send_message(message)
+                        except aiosmtplib.SMTPServerDisconnected:
+                            raise
+                        except aiosmtplib.SMTPException as e:
+                            results.append(e)
+                        else:
+                            results.append(None)
+            except (aiosmtplib.SMTPException, OSError) as e:
+                if reconnected:
+                    results.extend([e] * (len(messages) - len(results)))
+                    break
+                reconnected = True
+        return results
 
+    async def send(self, messages: list[EmailMessage]) -> list[Exception | None]:
+        """Відправляє пакет листів, розподіляючи його між з'єднаннями пулу.
 
-mail_conf = ConnectionConfig(
-    MAIL_USERNAME=settings.mail_username,
-    MAIL_PASSWORD=settings.mail_password,
-    MAIL_FROM=settings.mail_from,
-    MAIL_PORT=settings.mail_port,
-    MAIL_SERVER=settings.mail_server,
-    MAIL_STARTTLS=False,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True
+        Пакет ділиться на частини, які паралельно відправляються через до
+        `max_connections` з'єднань. Помилка окремого листа не зупиняє відправку
+        решти; розірване з'єднання відкривається заново один раз.
+
+        Args:
+            messages (list[EmailMessage]): Листи для відправки.
+
+        Returns:
+            list[Exception | None]: Для кожного листа None або помилка відправки.
+        """
+        if not messages:
+            return []
+        lanes = min(self.max_connections, len(messages))
+        chunks = [messages[i::lanes] for i in range(lanes)]
+        chunk_results = await asyncio.gather(*(self._send_over_connection(chunk) for chunk in chunks))
+        results: list[Exception | None] = [None] * len(messages)
+        for lane, lane_results in enumerate(chunk_results):
+            results[lane::lanes] = lane_results
+        return results
+
+    async def send_message(self, message: EmailMessage):
+        """Відправляє один лист.
+
+        Args:
+            message (EmailMessage): Лист.
+
+        Raises:
+            aiosmtplib.SMTPException: Якщо лист не вдалося відправити.
+            OSError: Якщо поштовий сервер недоступний.
+        """
+        [error] = await self.send([message])
+        if error is not None:
+            raise error
+
+    async def close(self):
+        """Закриває всі вільні з'єднання пулу."""
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
+
+
+smtp_pool = SMTPPool(
+    hostname=settings.mail_server,
+    port=settings.mail_port,
+    username=settings.mail_username,
+    password=settings.mail_password,
+    max_connections=settings.mail_max_connections,
+    health_check_interval=settings.mail_health_check_interval,
+    timeout=settings.mail_timeout,
 )
 
 
+def build_message(recipient: str, subject: str, html_body: str) -> EmailMessage:
+    """Створює HTML-лист від адреси `mail_from`.
+
+    Args:
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        html_body (str): HTML-вміст листа.
+
+    Returns:
+        EmailMessage: Готовий до відправки лист.
+    """
+    message = EmailMessage()
+    message["From"] = settings.mail_from
+    message["To"] = recipient
+    message["Subject"] = subject
+    message.set_content(html_body, subtype="html")
+    return message
+
+
 async def send_verification_email(email: str, email_body: str):
-    message = MessageSchema(
-        subject="Email Verification",
-        recipients=[email],
-        body=email_body,
-        subtype="html"
-    )
-    fm = FastMail(mail_conf)
-    await fm.send_message(message=message)
+    await smtp_pool.send_message(build_message(email, VERIFICATION_SUBJECT, email_body))
 
 
 async def send_reset_password_email(email: str, email_body: str):
-    message = MessageSchema(
-        subject="Reset Password",
-        recipients=[email],
-        body=email_body,
-        subtype="html"
-    )
-    fm = FastMail(mail_conf)
-    await fm.send_message(message=message)
+    await smtp_pool.send_message(build_message(email, RESET_PASSWORD_SUBJECT, email_body))
+
+
+async def send_batch(messages: list[EmailMessage]) -> list[Exception | None]:
+    """Відправляє пакет листів через пул з'єднань `smtp_pool`.
+
+    Args:
+        messages (list[EmailMessage]): Листи для відправки.
+
+    Returns:
+        list[Exception | None]: Для кожного листа None або помилка відправки.
+    """
+    return await smtp_pool.send(messages)
@@ -26,6 +26,9 @@ class User(Base):
         hashed_password (str): Хешований пароль.
         role_id (int): Ідентифікатор ролі користувача.
         is_active (bool): Стан активності користувача.
+        avatar (str, optional): URL аватара користувача.
+        contacts_count (int): Кількість контактів користувача, підтримується при створенні та видаленні.
+        token_version (int): Версія токенів користувача; збільшення відкликає всі видані раніше токени.
     """
     __tablename__ = "users"
 
@@ -34,5 +37,9 @@ class User(Base):
     email: Mapped[str] = mapped_column(String, index=True, unique=True)
     hashed_password: Mapped[str] = mapped_column(String)
     is_active: Mapped[bool] = mapped_column(default=True)
-    contacts: Mapped[list["Contact"]] = relationship("Contact", back_populates="owner")
+    role_id: Mapped[int | None] = mapped_column(ForeignKey("roles.id"), nullable=True)
+    avatar: Mapped[str | None] = mapped_column(String, nullable=True)
+    contacts_count: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
+    contacts: Mapped[list["Contact"]] = relationship("Contact", back_populates="owner", lazy="raise_on_sql")
     
\ No newline at end of file
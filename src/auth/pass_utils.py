@@ -1,5 +1,13 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
 from passlib.context import CryptContext
 
+from config.general import settings
+from config.metrics import PASSWORD_HASH_QUEUE_DEPTH, PASSWORD_HASH_IN_PROGRESS, PASSWORD_HASH_SECONDS
+
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 def verify_password(plain_password, hashed_password):
@@ -7,4 +15,84 @@ def verify_password(plain_password, hashed_password):
 
 
 def get_password_hash(password):
-    return pwd_context.hash(password)
\ No newline at end of file
+    return pwd_context.hash(password)
+
+
+class PasswordHasher:
+    """Виконує bcrypt-хешування в пулі воркерів, не блокуючи цикл подій.
+
+    bcrypt звільняє GIL, тому пул потоків масштабується за ядрами; пул процесів
+    доступний для реалізацій, що GIL не звільняють. Кількість одночасних операцій
+    обмежена розміром пулу, а ті, що чекають, видно в метриці глибини черги.
+
+    Attributes:
+        max_workers (int): Кількість воркерів і максимум одночасних операцій.
+        executor_type (str): "thread" або "process".
+    """
+
+    def __init__(self, max_workers: int | None = None, executor_type: str = "thread"):
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.executor_type = executor_type
+        self._executor: Executor | None = None
+        self._semaphore = asyncio.Semaphore(self.max_workers)
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hasher"
+                )
+        return self._executor
+
+    async def _run(self, operation: str, func, *args):
+        start = time.perf_counter()
+        queued = True
+        PASSWORD_HASH_QUEUE_DEPTH.inc()
+        try:
+            async with self._semaphore:
+                PASSWORD_HASH_QUEUE_DEPTH.dec()
+                queued = False
+                PASSWORD_HASH_IN_PROGRESS.inc()
+                try:
+                    loop = asyncio.get_running_loop()
+                    return await loop.run_in_executor(self._get_executor(), func, *args)
+                finally:
+                    PASSWORD_HASH_IN_PROGRESS.dec()
+        finally:
+            if queued:
+                PASSWORD_HASH_QUEUE_DEPTH.dec()
+            PASSWORD_HASH_SECONDS.labels(operation=operation).observe(time.perf_counter() - start)
+
+    async def hash(self, password: str) -> str:
+        """Хешує пароль у пулі воркерів.
+
+        Args:
+            password (str): Пароль у відкритому вигляді.
+
+        Returns:
+            str: bcrypt-хеш пароля.
+        """
+        return await self._run("hash", get_password_hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Перевіряє пароль у пулі воркерів.
+
+        Args:
+            plain_password (str): Пароль у відкритому вигляді.
+            hashed_password (str): Збережений bcrypt-хеш.
+
+        Returns:
+            bool: True, якщо пароль збігається з хешем.
+        """
+        return await self._run("verify", verify_password, plain_password, hashed_password)
+
+    def shutdown(self):
+        """Зупиняє пул воркерів, дочекавшись поточних операцій."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(settings.password_hash_workers, settings.password_hash_executor)
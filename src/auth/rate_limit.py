@@ -0,0 +1,250 @@
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from typing import NamedTuple
+
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import OAuth2PasswordRequestForm
+from redis.exceptions import RedisError
+
+from config.cache import get_redis, lua_script
+from config.general import settings
+from config.metrics import RATE_LIMIT_FALLBACKS, RATE_LIMITED_REQUESTS
+
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class Rate(NamedTuple):
+    """Ліміт запитів у ковзному вікні.
+
+    Attributes:
+        limit (int): Кількість дозволених запитів у вікні.
+        window (int): Довжина вікна, секунди.
+    """
+
+    limit: int
+    window: int
+
+    @classmethod
+    def parse(cls, value: str) -> "Rate":
+        """Розбирає ліміт у форматі "5/minute".
+
+        Args:
+            value (str): Кількість запитів і період: second, minute, hour або day.
+
+        Returns:
+            Rate: Ліміт.
+
+        Raises:
+            ValueError: Якщо рядок має неправильний формат.
+        """
+        count, _, period = value.partition("/")
+        if not count.strip().isdigit() or int(count) < 1 or period.strip() not in PERIODS:
+            raise ValueError(f"Неправильний ліміт {value!r}, очікується формат '5/minute'")
+        return cls(int(count), PERIODS[period.strip()])
+
+
+class Limit(NamedTuple):
+    """Ліміт для одного ключа запиту.
+
+    Attributes:
+        scope (str): Ознака, за якою рахуються запити: "ip", "username" тощо.
+        value (str): Значення ознаки.
+        rate (Rate): Ліміт.
+    """
+
+    scope: str
+    value: str
+    rate: Rate
+
+
+# KEYS — вікна; ARGV[1] — поточний час у мс, ARGV[2] — ідентифікатор запиту,
+# далі пари (ліміт, довжина вікна в мс) для кожного ключа.
+# Повертає {0, 0}, якщо запит дозволено, або {мс до звільнення місця, номер ключа}.
+SLIDING_WINDOW_SCRIPT = lua_script("""
+local now = tonumber(ARGV[1])
+local retry_after, blocked = 0, 0
+for i, key in ipairs(KEYS) do
+    local limit = tonumber(ARGV[1 + i * 2])
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= limit then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local wait = tonumber(oldest[2]) + window - now
+        if wait > retry_after then
+            retry_after, blocked = wait, i
+        end
+    end
+end
+if blocked > 0 then
+    return {retry_after, blocked}
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, ARGV[2 + i * 2])
+end
+return {0, 0}
+""")
+
+
+class LocalSlidingWindow:
+    """Ковзне вікно в пам'яті процесу на випадок недоступності Redis.
+
+    Кожен воркер рахує запити окремо, тому фактичний ліміт для всього сервісу
+    множиться на кількість воркерів. Кількість ключів обмежена `maxsize`.
+
+    Attributes:
+        maxsize (int): Максимальна кількість ключів.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._windows: OrderedDict[str, deque[float]] = OrderedDict()
+
+    def _window(self, key: str, now: float, window: int) -> deque[float]:
+        hits = self._windows.get(key)
+        if hits is None:
+            hits = self._windows[key] = deque()
+        self._windows.move_to_end(key)
+        while hits and hits[0] <= now - window:
+            hits.popleft()
+        return hits
+
+    def hit(self, keys: list[str], rates: list[Rate]) -> tuple[float, int]:
+        """Рахує запит у всіх вікнах, якщо жодне з них не переповнене.
+
+        Args:
+            keys (list[str]): Ключі вікон.
+            rates (list[Rate]): Ліміти для кожного ключа.
+
+        Returns:
+            tuple[float, int]: Секунди до звільнення місця та номер переповненого
+                ключа, починаючи з 1, або (0, 0), якщо запит дозволено.
+        """
+        now = time.monotonic()
+        retry_after, blocked = 0.0, 0
+        windows = [self._window(key, now, rate.window) for key, rate in zip(keys, rates)]
+        for index, (hits, rate) in enumerate(zip(windows, rates), start=1):
+            if len(hits) >= rate.limit:
+                wait = hits[0] + rate.window - now
+                if wait > retry_after:
+                    retry_after, blocked = wait, index
+        if blocked:
+            return retry_after, blocked
+        for hits in windows:
+            hits.append(now)
+        while len(self._windows) > self.maxsize:
+            self._windows.popitem(last=False)
+        return 0.0, 0
+
+
+class RateLimiter:
+    """Обмеження частоти запитів ковзним вікном у Redis.
+
+    Запит перевіряється одразу за кількома ключами (IP, ім'я користувача) одним
+    Lua-скриптом, тому перевірка і запис атомарні для всіх воркерів. Запит, що
+    перевищив хоча б один ліміт, не рахується в жодному вікні. Якщо Redis
+    недоступний, ліміти рахуються в пам'яті процесу.
+
+    Attributes:
+        prefix (str): Префікс ключів у Redis.
+        local (LocalSlidingWindow): Резервні вікна в пам'яті процесу.
+    """
+
+    def __init__(self, prefix: str, local_maxsize: int = 10000):
+        self.prefix = prefix
+        self.local = LocalSlidingWindow(local_maxsize)
+
+    def _key(self, route: str, limit: Limit) -> str:
+        return f"{self.prefix}:{route}:{limit.scope}:{limit.value}"
+
+    async def hit(self, route: str, limits: list[Limit]) -> tuple[float, Limit | None]:
+        """Рахує запит до маршруту.
+
+        Args:
+            route (str): Назва маршруту.
+            limits (list[Limit]): Ліміти, які має пройти запит.
+
+        Returns:
+            tuple[float, Limit | None]: Секунди до звільнення місця та перевищений
+                ліміт або (0, None), якщо запит дозволено.
+        """
+        keys = [self._key(route, limit) for limit in limits]
+        rates = [limit.rate for limit in limits]
+        args = [int(time.time() * 1000), uuid.uuid4().hex]
+        for rate in rates:
+            args += [rate.limit, rate.window * 1000]
+        try:
+            retry_after_ms, blocked = await SLIDING_WINDOW_SCRIPT(keys=keys, args=args, client=get_redis())
+            retry_after = int(retry_after_ms) / 1000
+        except RedisError:
+            RATE_LIMIT_FALLBACKS.inc()
+            retry_after, blocked = self.local.hit(keys, rates)
+        if not blocked:
+            return 0.0, None
+        return retry_after, limits[int(blocked) - 1]
+
+    async def enforce(self, route: str, limits: list[Limit]):
+        """Пропускає запит або відхиляє його з кодом 429.
+
+        Args:
+            route (str): Назва маршруту.
+            limits (list[Limit]): Ліміти, які має пройти запит.
+
+        Raises:
+            HTTPException: 429 із заголовком Retry-After, якщо ліміт перевищено.
+        """
+        if not settings.rate_limit_enabled:
+            return
+        retry_after, limit = await self.hit(route, limits)
+        if limit is not None:
+            RATE_LIMITED_REQUESTS.labels(route=route, scope=limit.scope).inc()
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, try again later",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+            )
+
+
+def client_ip(request: Request) -> str:
+    """Повертає IP-адресу клієнта.
+
+    За проксі адреса береться з X-Forwarded-For лише тоді, коли uvicorn
+    запущено з `--proxy-headers` і `--forwarded-allow-ips`.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+rate_limiter = RateLimiter(prefix=settings.rate_limit_prefix)
+
+LOGIN_PER_IP = Rate.parse(settings.rate_limit_login_per_ip)
+LOGIN_PER_USERNAME = Rate.parse(settings.rate_limit_login_per_username)
+FORGOT_PASSWORD_PER_IP = Rate.parse(settings.rate_limit_forgot_password_per_ip)
+FORGOT_PASSWORD_PER_EMAIL = Rate.parse(settings.rate_limit_forgot_password_per_email)
+REGISTER_PER_IP = Rate.parse(settings.rate_limit_register_per_ip)
+
+
+async def limit_login(request: Request, form_data: OAuth2PasswordRequestForm = Depends()):
+    """Залежність маршруту входу: ліміти за IP та за іменем користувача.
+
+    Виконується до звернення до бази даних і перевірки пароля.
+    """
+    await rate_limiter.enforce("login", [
+        Limit("ip", client_ip(request), LOGIN_PER_IP),
+        Limit("username", form_data.username.strip().lower(), LOGIN_PER_USERNAME),
+    ])
+
+
+async def limit_forgot_password(request: Request, email: str):
+    """Залежність маршруту відновлення пароля: ліміти за IP та за email."""
+    await rate_limiter.enforce("forgot-password", [
+        Limit("ip", client_ip(request), FORGOT_PASSWORD_PER_IP),
+        Limit("email", email.strip().lower(), FORGOT_PASSWORD_PER_EMAIL),
+    ])
+
+
+async def limit_register(request: Request):
+    """Залежність маршруту реєстрації: ліміт за IP."""
+    await rate_limiter.enforce("register", [Limit("ip", client_ip(request), REGISTER_PER_IP)])
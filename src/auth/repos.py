@@ -1,8 +1,12 @@
-from src.auth.models import User
-from src.auth.schema import UserCreate
-from src.auth.pass_utils import get_password_hash
+from src.auth.models import Role, User
+from src.auth.schema import RoleEnum, UserCreate
+from src.auth.pass_utils import password_hasher
+from src.auth.cache import user_cache
+from src.auth.revocation import revocation_list
+from src.auth.sessions import session_store
 
-from sqlalchemy import select
+from redis.exceptions import RedisError
+from sqlalchemy import insert, select, update
 
 
 class UserRepository:
@@ -17,16 +21,15 @@ class UserRepository:
         self.session = session
 
     async def create_user(self, user_create: UserCreate):
-        hashed_password = get_password_hash(user_create.password)
-        new_user = User(
+        hashed_password = await password_hasher.hash(user_create.password)
+        stmt = insert(User).values(
             username=user_create.username,
             hashed_password=hashed_password,
             email=user_create.email,
             is_active=False
-        )
-        self.session.add(new_user)
+        ).returning(User)
+        new_user = await self.session.scalar(stmt)
         await self.session.commit()
-        await self.session.refresh(new_user)
         return new_user
     
     async def get_user_by_email(self, email):
@@ -39,23 +42,81 @@ class UserRepository:
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
     
+    async def get_role_names(self, user: User) -> list[str]:
+        """Повертає назви ролей користувача для токена доступу.
+
+        Args:
+            user (User): Користувач.
+
+        Returns:
+            list[str]: Назви ролей; користувач без ролі має роль "user".
+        """
+        if user.role_id is None:
+            return [RoleEnum.USER.value]
+        name = await self.session.scalar(select(Role.name).where(Role.id==user.role_id))
+        return [name] if name else [RoleEnum.USER.value]
+
     async def activate_user(self, user: User):
-        user.is_active = True
-        self.session.add(user)
-        await self.session.commit()
-        await self.session.refresh(user)
+        await self._update(user.id, is_active=True)
+        await user_cache.invalidate(user.username)
 
     async def update_password(self, user: User, new_password: str):
         """Оновлює пароль користувача.
 
-        Хешує новий пароль перед збереженням у базі даних.
+        Хешує новий пароль перед збереженням у базі даних і збільшує версію
+        токенів, тому всі видані раніше токени доступу стають недійсними, а
+        сесії токенів оновлення видаляються.
 
         Args:
             user (User): Користувач, для якого потрібно оновити пароль.
             new_password (str): Новий пароль користувача.
         """
-        new_hashed_password = get_password_hash(new_password)
-        user.hashed_password = new_hashed_password
-        self.session.add(user)
+        new_hashed_password = await password_hasher.hash(new_password)
+        await self._update(
+            user.id, hashed_password=new_hashed_password, token_version=User.token_version + 1
+        )
+        await user_cache.invalidate(user.username)
+        await revocation_list.revoke_user(user.id, user.token_version)
+        try:
+            await session_store.revoke_user(user.id)
+        except RedisError:
+            pass
+
+    async def update_avatar(self, user_id: int, avatar_url: str):
+        """Оновлює аватар користувача.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            avatar_url (str): URL нового аватара.
+
+        Returns:
+            User | None: Оновлений користувач або None, якщо користувача не знайдено.
+        """
+        user = await self._update(user_id, avatar=avatar_url)
+        if user is not None:
+            await user_cache.invalidate(user.username)
+        return user
+
+    async def _update(self, user_id: int, **values):
+        """Оновлює користувача одним запитом `UPDATE ... RETURNING` та фіксує транзакцію.
+
+        Об'єкт користувача, вже завантажений у сесію, отримує нові значення з
+        відповіді, тому повторне читання після фіксації не потрібне.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            **values: Нові значення полів.
+
+        Returns:
+            User | None: Оновлений користувач або None, якщо користувача не знайдено.
+        """
+        stmt = (
+            update(User)
+            .where(User.id==user_id)
+            .values(**values)
+            .returning(User)
+            .execution_options(populate_existing=True)
+        )
+        user = await self.session.scalar(stmt)
         await self.session.commit()
-        await self.session.refresh(user)
\ No newline at end of file
+        return user
@@ -0,0 +1,237 @@
+import asyncio
+import json
+import logging
+import time
+from collections import deque
+
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+
+from config.cache import get_redis, lua_script
+from config.general import settings
+from config.metrics import REVOCATIONS_UNPUBLISHED
+
+
+logger = logging.getLogger("src.auth.revocation")
+
+# KEYS[1] - хеш версій; ARGV: ідентифікатор користувача, мінімальна версія.
+# Версія лише зростає, тому повторна або запізніла подія її не зменшить.
+RAISE_VERSION_SCRIPT = lua_script("""
+local current = tonumber(redis.call('HGET', KEYS[1], ARGV[1]) or '0')
+if tonumber(ARGV[2]) > current then
+    redis.call('HSET', KEYS[1], ARGV[1], ARGV[2])
+end
+return 1
+""")
+
+
+class RevocationList:
+    """Список відкликаних токенів доступу, віддзеркалений у пам'яті процесу.
+
+    Джерело правди зберігається в Redis: впорядкована множина відкликаних `jti`
+    з часом їх завершення та хеш мінімальних дійсних версій токенів користувачів.
+    Кожен процес тримає копію в пам'яті й оновлює її через pub/sub, тому
+    перевірка токена не робить мережевих запитів.
+
+    Відкликання, яке не вдалося записати в Redis після `publish_attempts` спроб,
+    діє в поточному процесі, потрапляє в лог і метрику
+    `auth_revocations_unpublished_total` та чекає в черзі: фонова синхронізація
+    повторює його, щойно Redis стане доступним, і після цього перечитує повний
+    список, щоб інші процеси його отримали.
+
+    Attributes:
+        prefix (str): Префікс ключів у Redis.
+        channel (str): Канал pub/sub для розсилки відкликань.
+        resync_interval (float): Пауза перед повторним підключенням до Redis та
+            період повтору невідправлених відкликань, секунди.
+        publish_attempts (int): Кількість спроб запису відкликання в Redis.
+        retry_delay (float): Пауза між спробами в секундах.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        channel: str,
+        resync_interval: float = 5,
+        publish_attempts: int = 3,
+        retry_delay: float = 0.05,
+    ):
+        self.prefix = prefix
+        self.channel = channel
+        self.resync_interval = resync_interval
+        self.publish_attempts = publish_attempts
+        self.retry_delay = retry_delay
+        self._jtis: dict[str, float] = {}
+        self._min_versions: dict[int, int] = {}
+        self._pending: deque[dict] = deque()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def jti_key(self) -> str:
+        return f"{self.prefix}:jti"
+
+    @property
+    def versions_key(self) -> str:
+        return f"{self.prefix}:versions"
+
+    def is_revoked(self, claims: dict) -> bool:
+        """Перевіряє токен за копією списку в пам'яті.
+
+        Args:
+            claims (dict): Розкодовані поля токена.
+
+        Returns:
+            bool: True, якщо токен відкликано окремо або разом з усіма токенами користувача.
+        """
+        jti = claims.get("jti")
+        if jti is not None and jti in self._jtis:
+            return True
+        uid, version = claims.get("uid"), claims.get("ver")
+        if uid is not None and version is not None:
+            return version < self._min_versions.get(uid, 0)
+        return False
+
+    def _apply(self, event: dict):
+        if "jti" in event:
+            self._jtis[event["jti"]] = event["exp"]
+        if "uid" in event:
+            uid = int(event["uid"])
+            self._min_versions[uid] = max(self._min_versions.get(uid, 0), int(event["ver"]))
+
+    def _prune(self):
+        now = time.time()
+        for jti in [jti for jti, exp in self._jtis.items() if exp < now]:
+            del self._jtis[jti]
+
+    @property
+    def pending(self) -> int:
+        """Кількість відкликань, що ще не записані в Redis."""
+        return len(self._pending)
+
+    async def _send(self, event: dict):
+        async with get_redis().pipeline(transaction=True) as pipe:
+            await self._write(pipe, event)
+            pipe.publish(self.channel, json.dumps(event))
+            await pipe.execute()
+
+    async def _write(self, pipe: Pipeline, event: dict):
+        if "jti" in event:
+            pipe.zadd(self.jti_key, {event["jti"]: event["exp"]})
+        if "uid" in event:
+            await RAISE_VERSION_SCRIPT(keys=[self.versions_key], args=[str(event["uid"]), event["ver"]], client=pipe)
+
+    async def _publish(self, event: dict):
+        self._apply(event)
+        for attempt in range(1, self.publish_attempts + 1):
+            try:
+                await self._send(event)
+                return
+            except RedisError as e:
+                if attempt == self.publish_attempts:
+                    self._pending.append(event)
+                    REVOCATIONS_UNPUBLISHED.inc()
+                    logger.error(
+                        "Revocation %s was applied only in this process, other workers accept the token "
+                        "until it is replayed to Redis: %s",
+                        event, e,
+                    )
+                    return
+                await asyncio.sleep(self.retry_delay * attempt)
+
+    async def _replay(self):
+        """Записує в Redis відкликання, що чекають у черзі.
+
+        Raises:
+            RedisError: Якщо Redis недоступний; невідправлені події лишаються в черзі.
+        """
+        if not self._pending:
+            return
+        count = len(self._pending)
+        while self._pending:
+            await self._send(self._pending[0])
+            self._pending.popleft()
+        logger.info("Replayed %s revocations to Redis", count)
+
+    async def revoke_token(self, jti: str, exp: float):
+        """Відкликає один токен до моменту його завершення.
+
+        Args:
+            jti (str): Ідентифікатор токена.
+            exp (float): Час завершення токена (Unix time).
+        """
+        await self._publish({"jti": jti, "exp": exp})
+
+    async def revoke_user(self, user_id: int, min_version: int):
+        """Відкликає всі токени користувача з версією, меншою за `min_version`.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            min_version (int): Мінімальна дійсна версія токена.
+        """
+        await self._publish({"uid": user_id, "ver": min_version})
+
+    async def load(self):
+        """Завантажує повний список з Redis і видаляє з нього токени, що вже завершилися.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        redis = get_redis()
+        await redis.zremrangebyscore(self.jti_key, "-inf", time.time())
+        jtis = await redis.zrange(self.jti_key, 0, -1, withscores=True)
+        versions = await redis.hgetall(self.versions_key)
+        for jti, exp in jtis:
+            self._jtis[jti.decode() if isinstance(jti, bytes) else jti] = exp
+        for uid, version in versions.items():
+            self._apply({"uid": int(uid), "ver": int(version)})
+        self._prune()
+
+    async def _listen(self):
+        reported = False
+        while True:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            try:
+                await pubsub.subscribe(self.channel)
+                await self._replay()
+                # Підписка раніше за завантаження, щоб не пропустити події між ними.
+                await self.load()
+                if reported:
+                    logger.info("Revocation list synchronized with Redis again")
+                reported = False
+                while True:
+                    message = await pubsub.get_message(timeout=self.resync_interval)
+                    if message is not None:
+                        self._apply(json.loads(message["data"]))
+                        if len(self._jtis) % 1024 == 0:
+                            self._prune()
+                    # Відкликання, що не записалися за живого з'єднання, повторюються тут.
+                    await self._replay()
+            except (RedisError, OSError) as e:
+                if not reported:
+                    logger.error(
+                        "Revocation list is not synchronized with Redis, revocations from other workers "
+                        "are not applied until it reconnects: %s",
+                        e,
+                    )
+                reported = True
+                await asyncio.sleep(self.resync_interval)
+            finally:
+                await pubsub.aclose()
+
+    def start(self):
+        """Запускає фонову синхронізацію з Redis."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        """Зупиняє фонову синхронізацію."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+revocation_list = RevocationList(prefix=settings.auth_revocation_prefix, channel=settings.auth_revocation_channel)
@@ -1,23 +1,55 @@
-from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Form, UploadFile, File
+import uuid
+
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks, Form
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from fastapi.responses import HTMLResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from jinja2 import Environment, FileSystemLoader
-from cloudinary.uploader import upload
+from redis.exceptions import RedisError
 
 from config.db import get_db
-from src.auth.schema import UserResponse, UserCreate, Token
+from config.instrumentation import query_budget
+from config.templates import render_template
+from src.auth.schema import UserResponse, UserCreate, Token, RefreshRequest
 from src.auth.repos import UserRepository
-from src.auth.pass_utils import verify_password
-from src.auth.mail_utils import send_verification_email, send_reset_password_email
-from src.auth.utils import get_current_user, create_acces_token, create_refresh_token, create_verification_token, decode_verification_token
+from src.auth.pass_utils import password_hasher
+from src.auth.avatars import (
+    ALLOWED_CONTENT_TYPES, AvatarStorage, InvalidImageError, avatar_processor, get_avatar_storage, read_avatar_upload
+)
+from src.auth.mail_utils import (
+    send_verification_email, send_reset_password_email, VERIFICATION_SUBJECT, RESET_PASSWORD_SUBJECT
+)
+from src.auth.utils import (
+    get_current_user, get_token_claims, build_access_claims, create_token_pair, decode_refresh_token,
+    create_verification_token, decode_verification_token, REFRESH_TOKEN_TTL
+)
+from src.auth.rate_limit import limit_forgot_password, limit_login, limit_register
+from src.auth.sessions import RotationResult, session_store
+from src.auth.revocation import revocation_list
+from src.tasks.queue import enqueue_email
 
 
 router = APIRouter()
-env = Environment(loader=FileSystemLoader("src/templates"))
 
 
-@router.post("/register", response_model=UserResponse)
+async def _queue_email(background_tasks: BackgroundTasks, send, recipient: str, subject: str, body: str):
+    """Ставить лист у чергу воркера, а якщо Redis недоступний — відправляє його фоновою задачею.
+
+    Параметри:
+        background_tasks (BackgroundTasks): Фонові задачі запиту.
+        send: Функція відправки листа для резервного шляху.
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        body (str): HTML-вміст листа.
+    """
+    try:
+        await enqueue_email(recipient, subject, body)
+    except RedisError:
+        background_tasks.add_task(send, recipient, body)
+
+
+@router.post(
+    "/register", response_model=UserResponse, dependencies=[Depends(query_budget(2)), Depends(limit_register)]
+)
 async def register(
     user_create: UserCreate,
     background_tasks: BackgroundTasks,
@@ -26,15 +58,18 @@ async def register(
     """Реєстрація нового користувача.
 
     Цей маршрут створює нового користувача, перевіряючи, чи не існує вже користувач з таким email.
-    Після успішної реєстрації відправляється лист для підтвердження email.
+    Після успішної реєстрації лист для підтвердження email ставиться в чергу відправки.
 
     Параметри:
         user_create (UserCreate): Дані для створення нового користувача.
-        background_tasks (BackgroundTasks): Фонова задача для відправки email.
+        background_tasks (BackgroundTasks): Фонові задачі для відправки email, якщо черга недоступна.
         db (AsyncSession): Сесія для роботи з базою даних.
 
     Повертає:
         UserResponse: Дані про зареєстрованого користувача.
+
+    Викидає:
+        HTTPException: 429, якщо перевищено ліміт реєстрацій з IP-адреси.
     """
     user_repo = UserRepository(db)
     user = await user_repo.get_user_by_email(user_create.email)
@@ -48,13 +83,12 @@ async def register(
     verification_link = (
         f"http://localhost:8000/auth/verify-email?token={verification_token}"
     )
-    template = env.get_template("verification_email.html")
-    email_body = template.render(verification_link=verification_link)
-    background_tasks.add_task(send_verification_email, user.email, email_body)
+    email_body = await render_template("verification_email.html", verification_link=verification_link)
+    await _queue_email(background_tasks, send_verification_email, user.email, VERIFICATION_SUBJECT, email_body)
     return user
 
 
-@router.get("/verify-email")
+@router.get("/verify-email", dependencies=[Depends(query_budget(2))])
 async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     """Підтвердження email користувача за допомогою токена.
 
@@ -79,7 +113,7 @@ async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     return {"msg" : "Email verified successfully!"}
 
 
-@router.post("/forgot-password")
+@router.post("/forgot-password", dependencies=[Depends(query_budget(1)), Depends(limit_forgot_password)])
 async def forgot_password(email: str, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     """Запит на відновлення паролю через email.
 
@@ -87,11 +121,14 @@ async def forgot_password(email: str, background_tasks: BackgroundTasks, db: Asy
 
     Параметри:
         email (str): Email користувача для відновлення паролю.
-        background_tasks (BackgroundTasks): Фонова задача для відправки email.
+        background_tasks (BackgroundTasks): Фонові задачі для відправки email, якщо черга недоступна.
         db (AsyncSession): Сесія для роботи з базою даних.
 
     Повертає:
         dict: Повідомлення про успішну відправку email.
+
+    Викидає:
+        HTTPException: 429, якщо перевищено ліміт запитів з IP-адреси або для email.
     """
     user_repo = UserRepository(db)
     user = await user_repo.get_user_by_email(email=email)
@@ -102,14 +139,13 @@ async def forgot_password(email: str, background_tasks: BackgroundTasks, db: Asy
         )
     reset_token = create_verification_token(email)
     reset_link = f"http://localhost:8000/auth/reset-password-form?token={reset_token}"
-    template = env.get_template("reset_password_email.html")
-    email_body = template.render(reset_link=reset_link)
-    background_tasks.add_task(send_reset_password_email, user.email, email_body)
+    email_body = await render_template("reset_password_email.html", reset_link=reset_link)
+    await _queue_email(background_tasks, send_reset_password_email, user.email, RESET_PASSWORD_SUBJECT, email_body)
 
     return {"msg": "Password reset email sent"}
 
 
-@router.get("/reset-password-form", response_class=HTMLResponse)
+@router.get("/reset-password-form", response_class=HTMLResponse, dependencies=[Depends(query_budget(1))])
 async def get_reset_password_form(token: str, db: AsyncSession = Depends(get_db)):
     """Відкриває форму для введення нового паролю після перевірки токена.
 
@@ -135,12 +171,11 @@ async def get_reset_password_form(token: str, db: AsyncSession = Depends(get_db)
             detail="Invalid or expired token"
         )
     
-    template = env.get_template("reset_password_form.html")
-    form_html = template.render(token=token)
+    form_html = await render_template("reset_password_form.html", token=token)
     return HTMLResponse(content=form_html)
 
 
-@router.post("/reset-password")
+@router.post("/reset-password", dependencies=[Depends(query_budget(2))])
 async def reset_password(token: str = Form(...), new_password: str = Form(...), db: AsyncSession = Depends(get_db)):
     """Зміна паролю користувача після перевірки токена.
 
@@ -166,7 +201,7 @@ async def reset_password(token: str = Form(...), new_password: str = Form(...),
     return {"msg": "Password reset successful"}
 
 
-@router.post("/token", response_model=Token)
+@router.post("/token", response_model=Token, dependencies=[Depends(query_budget(2)), Depends(limit_login)])
 async def login_for_access_token(
     form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)
 ):
@@ -180,67 +215,170 @@ async def login_for_access_token(
 
     Повертає:
         Token: Токен доступу та токен оновлення для користувача.
+
+    Викидає:
+        HTTPException: 401, якщо логін або пароль неправильні;
+            429, якщо перевищено ліміт спроб входу з IP-адреси або під цим іменем.
     """
     user_repo = UserRepository(db)
     user = await user_repo.get_user_by_username(form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(form_data.password, user.hashed_password):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail='Incorrect username',
             headers={"WWW-Authenticate" : "Bearer"}
         )
-    access_token = create_acces_token(data={"sub" : user.username})
-    refresh_token = create_refresh_token(data={"sub" : user.username})
+    roles = await user_repo.get_role_names(user)
+    sid = uuid.uuid4().hex
+    access_token, refresh_token, refresh_jti = create_token_pair(build_access_claims(user, roles), sid)
+    try:
+        await session_store.create(user.id, sid, refresh_jti, REFRESH_TOKEN_TTL)
+    except RedisError:
+        pass
+    return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
+
+
+@router.post("/refresh", response_model=Token, dependencies=[Depends(query_budget(2))])
+async def refresh_access_token(body: RefreshRequest, db: AsyncSession = Depends(get_db)):
+    """Оновлення токенів без повторного введення пароля.
+
+    Видає нову пару токенів і робить пред'явлений токен оновлення недійсним.
+    Поля нового токена доступу (ролі, email, активність, аватар) беруться з
+    бази даних, тому зміни користувача потрапляють у токени під час оновлення.
+    Повторне пред'явлення вже використаного токена оновлення вважається
+    викраденням: сесія видаляється, і клієнт має увійти заново. Сесія не
+    продовжується далі за `auth_session_max_age` від входу.
+
+    Параметри:
+        body (RefreshRequest): Токен оновлення.
+        db (AsyncSession): Сесія для роботи з базою даних.
+
+    Викидає:
+        HTTPException: 401, якщо токен недійсний, сесію завершено, токен використано повторно,
+            користувача видалено або деактивовано чи його токени відкликано;
+            503, якщо сховище сесій недоступне.
+
+    Повертає:
+        Token: Новий токен доступу та новий токен оновлення.
+    """
+    payload = decode_refresh_token(body.refresh_token)
+    user_repo = UserRepository(db)
+    user = await user_repo.get_user_by_username(payload["sub"])
+    if user is None or user.id != payload["uid"] or not user.is_active or user.token_version != payload["ver"]:
+        try:
+            await session_store.revoke(payload["sid"])
+        except RedisError:
+            pass
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Session expired",
+            headers={"WWW-Authenticate" : "Bearer"}
+        )
+    roles = await user_repo.get_role_names(user)
+    access_token, refresh_token, refresh_jti = create_token_pair(build_access_claims(user, roles), payload["sid"])
+    try:
+        result = await session_store.rotate(payload["sid"], payload["jti"], refresh_jti, REFRESH_TOKEN_TTL)
+    except RedisError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Session store is unavailable"
+        )
+    if result is not RotationResult.ROTATED:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token reuse detected" if result is RotationResult.REUSED else "Session expired",
+            headers={"WWW-Authenticate" : "Bearer"}
+        )
     return Token(access_token=access_token, refresh_token=refresh_token, token_type="bearer")
 
 
-@router.post("/update-avatar", response_model=UserResponse)
+@router.post("/logout", dependencies=[Depends(query_budget(0))])
+async def logout(claims: dict = Depends(get_token_claims)):
+    """Відкликання поточного токена доступу.
+
+    Токен додається до списку відкликаних до моменту свого завершення, і всі
+    воркери перестають його приймати. Сесія токенів оновлення, з якої його
+    видано, видаляється.
+
+    Параметри:
+        claims (dict): Поля поточного токена доступу.
+
+    Повертає:
+        dict: Повідомлення про успішний вихід.
+    """
+    if "jti" in claims:
+        await revocation_list.revoke_token(claims["jti"], claims["exp"])
+    if "sid" in claims:
+        try:
+            await session_store.revoke(claims["sid"])
+        except RedisError:
+            pass
+    return {"msg": "Logged out"}
+
+
+@router.post(
+    "/update-avatar",
+    response_model=UserResponse,
+    dependencies=[Depends(query_budget(2))],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "multipart/form-data": {
+                    "schema": {
+                        "type": "object",
+                        "required": ["file"],
+                        "properties": {"file": {"type": "string", "format": "binary"}},
+                    }
+                }
+            },
+        }
+    },
+)
 async def update_avatar(
-    file: UploadFile = File(...),
     current_user: UserResponse = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    upload: tuple[str | None, bytes] = Depends(read_avatar_upload),
+    db: AsyncSession = Depends(get_db),
+    storage: AvatarStorage = Depends(get_avatar_storage),
 ):
     """Оновлення аватара користувача.
 
-    Цей маршрут дозволяє користувачеві завантажити новий аватар.
+    Файл читається потоково з обмеженням розміру, у пулі процесів обрізається
+    до квадратної мініатюри й перекодовується, і лише мініатюра завантажується
+    в сховище аватарів. Користувач перевіряється до читання тіла запиту, тому
+    файл від неавтентифікованого клієнта не читається.
 
     Параметри:
-        file (UploadFile): Файл аватара для завантаження.
         current_user (UserResponse): Текущий користувач.
+        upload (tuple[str | None, bytes]): MIME-тип і вміст файлу аватара з поля `file`.
         db (AsyncSession): Сесія для роботи з базою даних.
+        storage (AvatarStorage): Сховище аватарів.
 
     Повертає:
         UserResponse: Дані користувача з оновленим аватаром.
     """
-    if file.content_type not in ["image/jpeg", "image/png"]:
+    content_type, data = upload
+    if content_type not in ALLOWED_CONTENT_TYPES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid file type. Only JPEG and PNG are allowed."
         )
 
     try:
-        upload_result = upload(
-            file.file,
-            folder="avatars",
-            public_id=current_user.email.split("@")[0],
-            overwrite=True,
-            resource_type="image"
+        thumbnail = await avatar_processor.process(data)
+    except InvalidImageError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid image file."
         )
 
-        avatar_url = upload_result.get("secure_url")
-        if not avatar_url:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to upload image"
-            )
-
-        user_repo = UserRepository(db)
-        updated_user = await user_repo.update_avatar(current_user.id, avatar_url)
-
-        return updated_user
-
+    try:
+        avatar_url = await storage.save(f"user-{current_user.id}", thumbnail, avatar_processor.content_type)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Avatar update failed: {str(e)}"
         )
+
+    user_repo = UserRepository(db)
+    return await user_repo.update_avatar(current_user.id, avatar_url)
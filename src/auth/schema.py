@@ -13,6 +13,7 @@ class UserCreate(User):
 
 class UserResponse(User):
     id: int
+    avatar: str | None = None
 
     class Config:
         from_attributes = True
@@ -22,6 +23,23 @@ class TokenData(BaseModel):
     username: str | None = None
 
 
+class TokenClaims(BaseModel):
+    sub: str
+    uid: int
+    email: EmailStr
+    roles: list[str] = []
+    act: bool
+    ver: int
+    jti: str
+    exp: int
+    sid: str | None = None
+    avatar: str | None = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
 class Token(BaseModel):
     access_token: str
     refresh_token: str
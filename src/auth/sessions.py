@@ -0,0 +1,144 @@
+import time
+from enum import Enum
+
+from config.cache import get_redis, lua_script
+from config.general import settings
+
+
+class RotationResult(str, Enum):
+    ROTATED = "rotated"
+    UNKNOWN = "unknown"
+    REUSED = "reused"
+
+
+# KEYS[1] - сесія; ARGV: пред'явлений jti, новий jti, TTL у секундах,
+# поточний час і найбільший час життя сесії (Unix time, секунди).
+# Сесії без поля `exp` отримують його під час першого оновлення.
+ROTATE_SCRIPT = lua_script("""
+local session = redis.call('HMGET', KEYS[1], 'jti', 'exp')
+local current, expires_at = session[1], tonumber(session[2])
+if not current then
+    return 0
+end
+if current ~= ARGV[1] then
+    redis.call('DEL', KEYS[1])
+    return -1
+end
+local now = tonumber(ARGV[4])
+if not expires_at then
+    expires_at = now + tonumber(ARGV[5])
+end
+if expires_at <= now then
+    redis.call('DEL', KEYS[1])
+    return 0
+end
+redis.call('HSET', KEYS[1], 'jti', ARGV[2], 'exp', expires_at)
+redis.call('EXPIRE', KEYS[1], math.min(tonumber(ARGV[3]), expires_at - now))
+return 1
+""")
+
+
+class RefreshSessionStore:
+    """Сесії токенів оновлення в Redis.
+
+    Кожен вхід створює сесію з ідентифікатором `sid`, у якій зберігається `jti`
+    єдиного дійсного токена оновлення. Оновлення атомарно (Lua-скриптом)
+    замінює `jti` на новий. Пред'явлення вже використаного токена означає, що
+    його викрадено, тому сесія видаляється разом з усіма її токенами.
+
+    Оновлення продовжує сесію не далі за `max_age` від входу: після цього
+    користувач має увійти з паролем.
+
+    Attributes:
+        prefix (str): Префікс ключів у Redis.
+        max_age (int): Найбільший час життя сесії від входу, секунди.
+    """
+
+    def __init__(self, prefix: str, max_age: int):
+        self.prefix = prefix
+        self.max_age = max_age
+
+    def _session_key(self, sid: str) -> str:
+        return f"{self.prefix}:{sid}"
+
+    def _user_key(self, user_id: int) -> str:
+        return f"{self.prefix}:user:{user_id}"
+
+    async def create(self, user_id: int, sid: str, jti: str, ttl: int):
+        """Створює сесію для нового токена оновлення.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+            sid (str): Ідентифікатор сесії.
+            jti (str): Ідентифікатор токена оновлення.
+            ttl (int): Час життя сесії без оновлення, секунди.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        ttl = min(ttl, self.max_age)
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.hset(
+                self._session_key(sid),
+                mapping={"jti": jti, "uid": user_id, "exp": int(time.time()) + self.max_age},
+            )
+            pipe.expire(self._session_key(sid), ttl)
+            pipe.sadd(self._user_key(user_id), sid)
+            pipe.expire(self._user_key(user_id), self.max_age)
+            await pipe.execute()
+
+    async def rotate(self, sid: str, jti: str, new_jti: str, ttl: int) -> RotationResult:
+        """Замінює токен оновлення сесії на новий.
+
+        Сесія, що прожила `max_age` від входу, видаляється замість оновлення.
+
+        Args:
+            sid (str): Ідентифікатор сесії.
+            jti (str): Ідентифікатор пред'явленого токена.
+            new_jti (str): Ідентифікатор нового токена.
+            ttl (int): Новий час життя сесії без оновлення, секунди.
+
+        Returns:
+            RotationResult: Результат заміни.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        result = await ROTATE_SCRIPT(
+            keys=[self._session_key(sid)],
+            args=[jti, new_jti, ttl, int(time.time()), self.max_age],
+            client=get_redis(),
+        )
+        if result == 1:
+            return RotationResult.ROTATED
+        if result == -1:
+            return RotationResult.REUSED
+        return RotationResult.UNKNOWN
+
+    async def revoke(self, sid: str):
+        """Видаляє сесію.
+
+        Args:
+            sid (str): Ідентифікатор сесії.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        await get_redis().delete(self._session_key(sid))
+
+    async def revoke_user(self, user_id: int):
+        """Видаляє всі сесії користувача.
+
+        Args:
+            user_id (int): Ідентифікатор користувача.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        redis = get_redis()
+        sids = await redis.smembers(self._user_key(user_id))
+        keys = [self._session_key(sid.decode() if isinstance(sid, bytes) else sid) for sid in sids]
+        await redis.delete(self._user_key(user_id), *keys)
+
+
+session_store = RefreshSessionStore(prefix=settings.auth_session_prefix, max_age=settings.auth_session_max_age)
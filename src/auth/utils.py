@@ -1,19 +1,26 @@
+import uuid
 from datetime import datetime, timedelta, timezone
 
-from jose import jwt, JWTError
+from jose import JWTError
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.general import settings
 from config.db import get_db
-from src.auth.schema import TokenData, UserResponse
+from src.auth.schema import TokenClaims, TokenData, UserResponse
+from src.auth.models import User
 from src.auth.repos import UserRepository
+from src.auth.cache import user_cache
+from src.auth.revocation import revocation_list
+from src.auth.keys import key_ring
 
 
-ALGORITHM = "HS256"
 ACCES_TOKEN_EXPIRE_MINUTES = 30
 REFRESH_TOKEN_EXPIRE_DAYS = 7
+REFRESH_TOKEN_TTL = REFRESH_TOKEN_EXPIRE_DAYS * 24 * 60 * 60
+# Поля `build_access_claims` та `sid` з `create_token_pair`: за їх наявності
+# `get_current_user` будує користувача з токена без звернення до бази.
+ACCESS_CLAIMS = ("sub", "uid", "email", "roles", "act", "ver", "avatar", "sid")
 VERIFICATION_TOKEN_EXPIRE_HOURS = 24
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/token")
@@ -24,73 +31,190 @@ def create_verification_token(email: str) -> str:
         hours=VERIFICATION_TOKEN_EXPIRE_HOURS
     )
     to_encode = {"exp" : expire, "sub" : email}
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
 def decode_verification_token(token: str) -> TokenData | None:
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=ALGORITHM)
+        payload = key_ring.decode(token)
         email: str = payload.get("sub")
         if email is None:
             return None
         return email
-    except: JWTError
-    return None
+    except JWTError:
+        return None
 
 
 def create_acces_token(data: dict):
     to_encode = data.copy()
-    expire = datetime.now() + timedelta(minutes=ACCES_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp" : expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
+    expire = datetime.now(timezone.utc) + timedelta(minutes=ACCES_TOKEN_EXPIRE_MINUTES)
+    to_encode.update({"exp" : expire, "jti" : uuid.uuid4().hex})
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
+def build_access_claims(user: User, roles: list[str]) -> dict:
+    """Формує поля токена доступу, достатні для авторизації без звернення до бази.
+
+    Args:
+        user (User): Користувач.
+        roles (list[str]): Назви ролей користувача.
+
+    Returns:
+        dict: Поля `sub`, `uid`, `email`, `roles`, `act`, `ver` та `avatar`.
+    """
+    return {
+        "sub": user.username,
+        "uid": user.id,
+        "email": user.email,
+        "roles": roles,
+        "act": user.is_active,
+        "ver": user.token_version,
+        "avatar": user.avatar,
+    }
+
+
 def create_refresh_token(data: dict):
-    to_encode = data.copy()
-    expire = datetime.now() + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
-    to_encode.update({"exp" : expire})
-    encoded_jwt = jwt.encode(to_encode, settings.secret_key, algorithm=ALGORITHM)
+    to_encode = {"jti" : uuid.uuid4().hex, **data}
+    expire = datetime.now(timezone.utc) + timedelta(days=REFRESH_TOKEN_EXPIRE_DAYS)
+    to_encode.update({"exp" : expire, "typ" : "refresh"})
+    encoded_jwt = key_ring.encode(to_encode)
     return encoded_jwt
 
 
+def create_token_pair(claims: dict, sid: str) -> tuple[str, str, str]:
+    """Створює токен доступу та токен оновлення для сесії `sid`.
+
+    Args:
+        claims (dict): Поля користувача з `build_access_claims`.
+        sid (str): Ідентифікатор сесії токенів оновлення.
+
+    Returns:
+        tuple[str, str, str]: Токен доступу, токен оновлення та `jti` токена оновлення.
+    """
+    refresh_jti = uuid.uuid4().hex
+    access_token = create_acces_token({**claims, "sid": sid})
+    refresh_token = create_refresh_token({**claims, "sid": sid, "jti": refresh_jti})
+    return access_token, refresh_token, refresh_jti
+
+
+def decode_refresh_token(token: str) -> dict:
+    """Перевіряє токен оновлення.
+
+    Args:
+        token (str): Токен оновлення.
+
+    Returns:
+        dict: Поля токена.
+
+    Raises:
+        HTTPException: Якщо токен недійсний, не є токеном оновлення сесії або відкликаний.
+    """
+    try:
+        payload = key_ring.decode(token)
+    except JWTError:
+        raise _credentials_exception()
+    if (
+        payload.get("typ") != "refresh"
+        or any(claim not in payload for claim in (*ACCESS_CLAIMS, "jti"))
+        or revocation_list.is_revoked(payload)
+    ):
+        raise _credentials_exception()
+    return payload
+
+
 def decode_access_token(token: str) -> TokenData | None:
     try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=ALGORITHM)
+        payload = key_ring.decode(token)
         username: str = payload.get("sub")
         if username is None:
             return None
         return TokenData(username=username)
-    except: JWTError
-    return None
+    except JWTError:
+        return None
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Invalid token",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def _inactive_user_exception() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+
+
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
+    """Розкодовує токен доступу та перевіряє, що його не відкликано.
+
+    Перевірка відкликання виконується за копією списку в пам'яті процесу,
+    без мережевих запитів.
+
+    Args:
+        token (str): Токен доступу.
+
+    Returns:
+        dict: Поля токена.
+
+    Raises:
+        HTTPException: Якщо токен недійсний, завершився або відкликаний.
+    """
+    try:
+        payload = key_ring.decode(token)
+    except JWTError:
+        raise _credentials_exception()
+    if payload.get("sub") is None or payload.get("typ") == "refresh" or revocation_list.is_revoked(payload):
+        raise _credentials_exception()
+    return payload
 
 
 async def get_current_user(
-    token: str = Depends(oauth2_scheme), 
+    payload: dict = Depends(get_token_claims),
     db: AsyncSession = Depends(get_db)
 ) -> UserResponse:
-    try:
-        payload = jwt.decode(token, settings.secret_key, algorithms=[ALGORITHM])
-        email: str = payload.get("sub")
-        if email is None:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid token",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-    except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token",
-            headers={"WWW-Authenticate": "Bearer"},
+    """Повертає поточного користувача.
+
+    Якщо токен містить усі поля `ACCESS_CLAIMS`, користувач будується з самого
+    токена. Для токенів лише з `sub` і токенів, виданих до появи поля `avatar`,
+    дані користувача беруться з кешу або бази даних. Аватар у токені
+    оновлюється разом з токеном через `/auth/refresh`.
+
+    Args:
+        payload (dict): Поля токена доступу.
+        db (AsyncSession): Сесія для роботи з базою даних.
+
+    Returns:
+        UserResponse: Поточний користувач.
+
+    Raises:
+        HTTPException: 404, якщо користувача не знайдено; 403, якщо користувач неактивний.
+    """
+    if all(claim in payload for claim in ACCESS_CLAIMS):
+        try:
+            claims = TokenClaims.model_validate(payload)
+        except ValueError:
+            raise _credentials_exception()
+        if not claims.act:
+            raise _inactive_user_exception()
+        return UserResponse.model_construct(
+            id=claims.uid, username=claims.sub, email=claims.email, avatar=claims.avatar
         )
 
-    user_repo = UserRepository(db)
-    user = await user_repo.get_user_by_email(email=email)
-    if user is None:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
-    return user
\ No newline at end of file
+    username: str = payload["sub"]
+    principal = await user_cache.get(username)
+    if principal is None:
+        user_repo = UserRepository(db)
+        user = await user_repo.get_user_by_username(username=username)
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="User not found",
+            )
+        principal = {**UserResponse.model_validate(user).model_dump(), "is_active": user.is_active}
+        await user_cache.set(username, principal)
+    if not principal.get("is_active", True):
+        raise _inactive_user_exception()
+    return UserResponse.model_construct(**principal)
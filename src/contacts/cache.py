@@ -0,0 +1,175 @@
+import asyncio
+import logging
+from typing import Callable
+
+import orjson
+from redis.asyncio.client import Pipeline
+from redis.exceptions import RedisError
+
+from config.cache import get_redis, key_builder_repo, lua_script
+from config.general import settings
+from config.metrics import CACHE_REQUESTS, CACHE_WRITE_FAILURES
+from src.contacts.schema import ContactResponse
+
+
+logger = logging.getLogger("src.contacts.cache")
+
+# KEYS[1] - контакт, KEYS[2] - версія контакту; ARGV: версія, прочитана до
+# запиту в базу, значення, TTL у секундах.
+FILL_SCRIPT = lua_script("""
+local version = redis.call('GET', KEYS[2]) or ''
+if version ~= ARGV[1] then
+    return 0
+end
+if redis.call('SET', KEYS[1], ARGV[2], 'EX', tonumber(ARGV[3]), 'NX') then
+    return 1
+end
+return 0
+""")
+
+
+class ContactCache:
+    """Кеш окремих контактів у Redis.
+
+    Зберігає компактний JSON `ContactResponse` під ключем конкретного контакту
+    власника. Поруч зберігається лічильник версії контакту: оновлення й
+    видалення лише видаляють значення та збільшують версію однією транзакцією,
+    а в кеш контакт потрапляє тільки з бази після промаху і лише якщо версія
+    не змінилася з моменту промаху. Тому ні читання, що почалося до оновлення
+    чи видалення, ні оновлення, чиї інвалідації дійшли до Redis не в порядку
+    комітів, не можуть залишити в кеші застарілий контакт.
+
+    Невдалі видалення повторюються `write_attempts` разів, після чого помилка
+    записується в лог і метрику `cache_write_failures_total`: застарілий запис
+    у такому разі живе не довше за `ttl`.
+
+    Attributes:
+        ttl (int): Час життя запису в секундах.
+        namespace (str): Простір імен ключів.
+        write_attempts (int): Кількість спроб видалення.
+        retry_delay (float): Пауза між спробами в секундах.
+    """
+
+    name = "contact"
+
+    def __init__(self, ttl: int, namespace: str = "contact-repo", write_attempts: int = 3, retry_delay: float = 0.05):
+        self.ttl = ttl
+        self.namespace = namespace
+        self.write_attempts = write_attempts
+        self.retry_delay = retry_delay
+
+    def key(self, owner_id: int, contact_id: int) -> str:
+        """Будує ключ контакту через `key_builder_repo`.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контакту.
+            contact_id (int): Ідентифікатор контакту.
+
+        Returns:
+            str: Ключ у Redis.
+        """
+        return key_builder_repo(ContactCache.get, self.namespace, args=(self, owner_id, contact_id), kwargs={})
+
+    def version_key(self, owner_id: int, contact_id: int) -> str:
+        """Будує ключ лічильника версії контакту."""
+        return f"{self.key(owner_id, contact_id)}:version"
+
+    async def get(self, owner_id: int, contact_id: int) -> tuple[ContactResponse | None, bytes]:
+        """Повертає контакт з кешу та його поточну версію.
+
+        Версію потрібно передати у `fill` разом з контактом, прочитаним з бази
+        після промаху.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контакту.
+            contact_id (int): Ідентифікатор контакту.
+
+        Returns:
+            tuple[ContactResponse | None, bytes]: Контакт або None, якщо його немає
+            в кеші, та версія контакту (порожня, якщо контакт не змінювався).
+        """
+        try:
+            raw, version = await get_redis().mget(
+                self.key(owner_id, contact_id), self.version_key(owner_id, contact_id)
+            )
+        except RedisError:
+            raw, version = None, None
+        if raw is None:
+            CACHE_REQUESTS.labels(cache=self.name, tier="redis", result="miss").inc()
+            return None, version or b""
+        CACHE_REQUESTS.labels(cache=self.name, tier="redis", result="hit").inc()
+        return ContactResponse.model_validate(orjson.loads(raw)), version or b""
+
+    async def fill(self, owner_id: int, contact: ContactResponse, version: bytes):
+        """Зберігає прочитаний з бази контакт, якщо його не змінили після промаху.
+
+        Запис виконується лише за відсутності ключа і за незмінної версії, тому
+        читання, що почалося до оновлення або видалення, не перезапише свіже
+        значення і не поверне видалений контакт.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контакту.
+            contact (ContactResponse): Контакт.
+            version (bytes): Версія, повернута `get` до читання з бази.
+        """
+        keys = [self.key(owner_id, contact.id), self.version_key(owner_id, contact.id)]
+        try:
+            await FILL_SCRIPT(keys=keys, args=[version, orjson.dumps(contact.model_dump()), self.ttl], client=get_redis())
+        except RedisError:
+            pass
+
+    async def invalidate(self, owner_id: int, contact_id: int):
+        """Видаляє контакт з кешу.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контакту.
+            contact_id (int): Ідентифікатор контакту.
+        """
+        await self.invalidate_many(owner_id, [contact_id])
+
+    async def invalidate_many(self, owner_id: int, contact_ids: list[int]):
+        """Видаляє контакти з кешу і збільшує їхні версії однією транзакцією.
+
+        Викликається після коміту оновлення або видалення. Видалення не залежить
+        від порядку, тому інвалідації двох оновлень можуть дійти в будь-якому
+        порядку, а наступне читання заповнить кеш з бази.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            contact_ids (list[int]): Ідентифікатори контактів.
+        """
+        if not contact_ids:
+            return
+
+        def commands(pipe: Pipeline):
+            pipe.delete(*(self.key(owner_id, contact_id) for contact_id in contact_ids))
+            for contact_id in contact_ids:
+                self._bump_version(pipe, owner_id, contact_id)
+
+        await self._execute("invalidate", owner_id, contact_ids, commands)
+
+    def _bump_version(self, pipe: Pipeline, owner_id: int, contact_id: int):
+        # Версія живе не менше за значення, яке вона захищає.
+        pipe.incr(self.version_key(owner_id, contact_id))
+        pipe.expire(self.version_key(owner_id, contact_id), self.ttl)
+
+    async def _execute(self, operation: str, owner_id: int, contact_ids: list[int], commands: Callable[[Pipeline], None]):
+        """Виконує команди в транзакції Redis з повторами при помилці."""
+        for attempt in range(1, self.write_attempts + 1):
+            try:
+                async with get_redis().pipeline(transaction=True) as pipe:
+                    commands(pipe)
+                    await pipe.execute()
+                return
+            except RedisError as e:
+                if attempt == self.write_attempts:
+                    CACHE_WRITE_FAILURES.labels(cache=self.name, operation=operation).inc()
+                    logger.error(
+                        "Contact cache %s failed for owner %s, contacts %s; stale entries may live up to %ss: %s",
+                        operation, owner_id, contact_ids, self.ttl, e,
+                    )
+                    return
+                await asyncio.sleep(self.retry_delay * attempt)
+
+
+contact_cache = ContactCache(ttl=settings.contact_cache_ttl)
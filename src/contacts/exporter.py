@@ -0,0 +1,99 @@
+import csv
+import io
+from typing import AsyncIterator, Literal
+
+import orjson
+from sqlalchemy import Row
+
+
+ExportFormat = Literal["csv", "ndjson", "vcard"]
+
+EXPORT_FIELDS = ("id", "first_name", "last_name", "email", "phone_number", "birthday", "age", "additional_info")
+EXPORT_CHUNK_ROWS = 500
+
+MEDIA_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+    "vcard": "text/vcard; charset=utf-8",
+}
+FILE_EXTENSIONS = {"csv": "csv", "ndjson": "ndjson", "vcard": "vcf"}
+
+
+def _vcard_escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(",", "\\,")
+        .replace(";", "\\;")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def to_vcard(contact: Row) -> str:
+    """Перетворює контакт на запис vCard 3.0.
+
+    Args:
+        contact (Row): Рядок контакту з полями `EXPORT_FIELDS`.
+
+    Returns:
+        str: Запис vCard з рядками, що закінчуються CRLF.
+    """
+    first_name = _vcard_escape(contact.first_name)
+    last_name = _vcard_escape(contact.last_name)
+    lines = [
+        "BEGIN:VCARD",
+        "VERSION:3.0",
+        f"N:{last_name};{first_name};;;",
+        f"FN:{first_name} {last_name}",
+        f"EMAIL;TYPE=INTERNET:{_vcard_escape(contact.email)}",
+        f"TEL:{_vcard_escape(contact.phone_number)}",
+        f"BDAY:{contact.birthday.isoformat()}",
+    ]
+    if contact.additional_info:
+        lines.append(f"NOTE:{_vcard_escape(contact.additional_info)}")
+    lines.append("END:VCARD")
+    return "\r\n".join(lines) + "\r\n"
+
+
+def to_row(contact: Row) -> dict:
+    """Повертає поля контакту, що експортуються."""
+    return {field: getattr(contact, field) for field in EXPORT_FIELDS}
+
+
+async def export_chunks(contacts: AsyncIterator[Row], file_format: ExportFormat) -> AsyncIterator[bytes]:
+    """Серіалізує потік контактів у вказаний формат частинами.
+
+    Заголовок CSV віддається одразу, далі дані віддаються частинами по
+    `EXPORT_CHUNK_ROWS` контактів, тому в пам'яті не накопичується весь експорт.
+
+    Args:
+        contacts (AsyncIterator[Row]): Потік рядків контактів.
+        file_format (ExportFormat): Формат експорту.
+
+    Yields:
+        bytes: Частина файлу експорту.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if file_format == "csv" else None
+    if writer is not None:
+        writer.writerow(EXPORT_FIELDS)
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+
+    chunk: list[bytes] = []
+    async for contact in contacts:
+        if file_format == "csv":
+            writer.writerow(to_row(contact).values())
+            chunk.append(buffer.getvalue().encode())
+            buffer.seek(0)
+            buffer.truncate()
+        elif file_format == "ndjson":
+            chunk.append(orjson.dumps(to_row(contact)) + b"\n")
+        else:
+            chunk.append(to_vcard(contact).encode())
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield b"".join(chunk)
+            chunk.clear()
+    if chunk:
+        yield b"".join(chunk)
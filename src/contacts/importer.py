@@ -0,0 +1,148 @@
+import csv
+import io
+from itertools import islice
+from typing import BinaryIO, Iterable, Iterator, Literal
+
+import orjson
+from pydantic import ValidationError
+
+from src.contacts.schema import ContactCreate, ContactImportError, ContactImportReport
+
+
+ImportFormat = Literal["csv", "ndjson"]
+
+IMPORT_BATCH_SIZE = 500
+MAX_REPORTED_ERRORS = 1000
+
+RawRow = tuple[int, dict | None, str | None]
+
+
+def detect_format(filename: str | None, content_type: str | None) -> ImportFormat | None:
+    """Визначає формат файлу імпорту за розширенням або типом вмісту.
+
+    Args:
+        filename (str | None): Ім'я завантаженого файлу.
+        content_type (str | None): MIME-тип завантаженого файлу.
+
+    Returns:
+        ImportFormat | None: "csv", "ndjson" або None, якщо формат невідомий.
+    """
+    name = (filename or "").lower()
+    if name.endswith(".csv") or content_type == "text/csv":
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or content_type in ("application/x-ndjson", "application/jsonl"):
+        return "ndjson"
+    return None
+
+
+def iter_csv_rows(file: BinaryIO) -> Iterator[RawRow]:
+    """Читає CSV з рядком заголовка по одному запису.
+
+    Args:
+        file (BinaryIO): Файл у кодуванні UTF-8.
+
+    Yields:
+        tuple[int, dict | None, str | None]: Номер рядка даних, значення колонок або помилка розбору.
+    """
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding="utf-8-sig", newline=""))
+    row_number = 0
+    while True:
+        row_number += 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as e:
+            yield row_number, None, f"Помилка CSV: {e}"
+            continue
+        yield row_number, {key: value or None for key, value in row.items() if key is not None}, None
+
+
+def iter_ndjson_rows(file: BinaryIO) -> Iterator[RawRow]:
+    """Читає NDJSON: один JSON-об'єкт у кожному непорожньому рядку.
+
+    Args:
+        file (BinaryIO): Файл у кодуванні UTF-8.
+
+    Yields:
+        tuple[int, dict | None, str | None]: Номер рядка, об'єкт або помилка розбору.
+    """
+    for row_number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            value = orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield row_number, None, f"Невірний JSON: {e}"
+            continue
+        if not isinstance(value, dict):
+            yield row_number, None, "Рядок має містити JSON-об'єкт"
+            continue
+        yield row_number, value, None
+
+
+def parse_rows(rows: Iterable[RawRow]) -> Iterator[tuple[int, ContactCreate | None, list[str]]]:
+    """Перевіряє рядки файлу схемою `ContactCreate`.
+
+    Args:
+        rows (Iterable[RawRow]): Розібрані рядки файлу.
+
+    Yields:
+        tuple[int, ContactCreate | None, list[str]]: Номер рядка, контакт та помилки перевірки.
+    """
+    for row_number, raw, error in rows:
+        if error is not None:
+            yield row_number, None, [error]
+            continue
+        try:
+            yield row_number, ContactCreate.model_validate(raw), []
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()]
+            yield row_number, None, errors
+
+
+def add_error(report: ContactImportReport, row: int, errors: list[str]):
+    """Додає помилку рядка до звіту, обмежуючи розмір звіту `MAX_REPORTED_ERRORS`."""
+    report.failed += 1
+    if len(report.errors) < MAX_REPORTED_ERRORS:
+        report.errors.append(ContactImportError(row=row, errors=errors))
+    else:
+        report.errors_truncated = True
+
+
+async def import_contacts(
+    repo, owner_id: int, file: BinaryIO, file_format: ImportFormat, max_contacts: int
+) -> ContactImportReport:
+    """Імпортує контакти з файлу пакетами по `IMPORT_BATCH_SIZE` рядків.
+
+    Файл читається й перевіряється послідовно, тому в пам'яті одночасно
+    знаходиться лише один пакет незалежно від розміру файлу. Кожен пакет
+    вставляється та фіксується окремою транзакцією.
+
+    Args:
+        repo (ContactRepository): Репозиторій контактів.
+        owner_id (int): Ідентифікатор власника контактів.
+        file (BinaryIO): Завантажений файл.
+        file_format (ImportFormat): Формат файлу.
+        max_contacts (int): Максимальна кількість контактів у власника.
+
+    Returns:
+        ContactImportReport: Кількість імпортованих рядків та помилки по рядках.
+    """
+    raw_rows = iter_csv_rows(file) if file_format == "csv" else iter_ndjson_rows(file)
+    rows = parse_rows(raw_rows)
+    report = ContactImportReport()
+    while batch := list(islice(rows, IMPORT_BATCH_SIZE)):
+        valid = []
+        for row_number, contact, errors in batch:
+            if errors:
+                add_error(report, row_number, errors)
+            else:
+                valid.append((row_number, contact))
+        if not valid:
+            continue
+        inserted, failed = await repo.insert_contacts_batch(owner_id, valid, max_contacts)
+        report.imported += inserted
+        for row_number, error in failed:
+            add_error(report, row_number, [error])
+    return report
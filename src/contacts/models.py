@@ -1,9 +1,26 @@
-from sqlalchemy import String, Integer, ForeignKey, Date, Float
-from sqlalchemy.orm import Mapped, mapped_column, relationship
+from datetime import date
+
+from sqlalchemy import String, Integer, ForeignKey, Date, Float, Index
+from sqlalchemy.orm import Mapped, mapped_column, relationship, validates
 
 from config.db import Base
 
 
+def birthday_key(birthday: date) -> int:
+    """Перетворює дату народження на ключ `місяць * 100 + день`.
+
+    Ключ не залежить від року, тому дні народження в будь-якому вікні дат
+    шукаються діапазоном по індексу.
+
+    Args:
+        birthday (date): Дата народження.
+
+    Returns:
+        int: Ключ від 101 до 1231.
+    """
+    return birthday.month * 100 + birthday.day
+
+
 class Contact(Base):
     """Модель контактів для зберігання інформації про користувачів.
 
@@ -14,20 +31,32 @@ class Contact(Base):
         phone_number (str): Номер телефону контакту.
         email (str): Електронна адреса контакту.
         birthday (Date): Дата народження контакту.
+        birthday_key (int): Місяць і день народження у вигляді `місяць * 100 + день`.
         age (int): Вік контакту.
         additional_info (str, optional): Додаткова інформація про контакт.
         owner_id (int): Ідентифікатор власника контакту (користувача).
         owner (User): Об'єкт власника контакту (відношення до таблиці користувачів).
     """
     __tablename__ = 'contact'
-    
+    __table_args__ = (
+        Index("ix_contact_owner_last_name_id", "owner_id", "last_name", "id"),
+        Index("ix_contact_owner_email", "owner_id", "email"),
+        Index("ix_contact_owner_birthday_key", "owner_id", "birthday_key"),
+    )
+
     id: Mapped[int] = mapped_column(Integer, primary_key=True, unique=True)
     first_name: Mapped[str] = mapped_column(String, index=True)
     last_name: Mapped[int] = mapped_column(String, index=True)
     phone_number: Mapped[str] = mapped_column(String, index=True)
     email: Mapped[str] = mapped_column(String, index=True, unique=True)
     birthday: Mapped[Date] = mapped_column(Date)
+    birthday_key: Mapped[int] = mapped_column(Integer, index=True)
     age: Mapped[int] = mapped_column(Integer, index=True)
     additional_info: Mapped[str | None] = mapped_column(String, nullable=True)
     owner_id: Mapped[int] = mapped_column(Integer, ForeignKey("users.id"), nullable=True)
-    owner: Mapped["User"] = relationship("User", back_populates="contacts")
\ No newline at end of file
+    owner: Mapped["User"] = relationship("User", back_populates="contacts", lazy="raise_on_sql")
+
+    @validates("birthday")
+    def _sync_birthday_key(self, key, value):
+        self.birthday_key = birthday_key(value)
+        return value
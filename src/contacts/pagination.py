@@ -0,0 +1,97 @@
+import base64
+import json
+from typing import Any, Sequence
+
+from sqlalchemy import ColumnElement, Row, Select, tuple_
+
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+class InvalidCursorError(ValueError):
+    """Помилка, що виникає при передачі пошкодженого або чужого курсора."""
+
+
+def encode_cursor(*values: Any) -> str:
+    """Кодує значення ключа сортування останнього рядка сторінки в непрозорий курсор.
+
+    Args:
+        *values: Значення колонок ключа сортування (наприклад, прізвище та ID).
+
+    Returns:
+        str: Курсор у форматі base64url без вирівнювання.
+    """
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+
+def decode_cursor(cursor: str, types: Sequence[type]) -> list[Any]:
+    """Декодує курсор, отриманий від клієнта.
+
+    Args:
+        cursor (str): Курсор, виданий попередньою сторінкою.
+        types (Sequence[type]): Очікувані типи значень ключа сортування.
+
+    Raises:
+        InvalidCursorError: Якщо курсор неможливо розібрати.
+
+    Returns:
+        list: Значення ключа сортування.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(types):
+        raise InvalidCursorError("Invalid cursor")
+    for value, type_ in zip(values, types):
+        if type_ is float and isinstance(value, int):
+            continue
+        if not isinstance(value, type_) or isinstance(value, bool):
+            raise InvalidCursorError("Invalid cursor")
+    return values
+
+
+def paginate(stmt: Select, keys: Sequence[ColumnElement], cursor: str | None, limit: int) -> Select:
+    """Додає до запиту keyset-умову, сортування та ліміт сторінки.
+
+    Ключі сортування додаються в кінець вибірки як окремі колонки, щоб з
+    останнього рядка сторінки можна було побудувати курсор наступної.
+
+    Args:
+        stmt (Select): Запит, що вибирає колонки сторінки.
+        keys (Sequence[ColumnElement]): Унікальний ключ сортування за зростанням.
+        cursor (str | None): Курсор попередньої сторінки.
+        limit (int): Розмір сторінки.
+
+    Raises:
+        InvalidCursorError: Якщо курсор неможливо розібрати.
+
+    Returns:
+        Select: Запит, що повертає на один рядок більше за ліміт.
+    """
+    if cursor is not None:
+        values = decode_cursor(cursor, [key.type.python_type for key in keys])
+        stmt = stmt.where(tuple_(*keys) > tuple(values))
+    return stmt.add_columns(*keys).order_by(*keys).limit(limit + 1)
+
+
+def split_page(rows: Sequence[Row], limit: int, key_count: int) -> tuple[list[tuple], str | None]:
+    """Відокремлює сторінку результатів від курсора наступної сторінки.
+
+    Args:
+        rows (Sequence[Row]): Рядки запиту, побудованого через `paginate`.
+        limit (int): Розмір сторінки.
+        key_count (int): Кількість колонок ключа сортування в кінці рядка.
+
+    Returns:
+        tuple[list[tuple], str | None]: Колонки рядків сторінки без ключа сортування
+        та курсор або None, якщо сторінка остання.
+    """
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*rows[-1][-key_count:])
+    return [tuple(row[:-key_count]) for row in rows], next_cursor
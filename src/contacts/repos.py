@@ -1,17 +1,73 @@
 from datetime import date, timedelta
+from typing import AsyncIterator, Iterable
 
-from sqlalchemy import select
-from fastapi_cache.decorator import cache
+from sqlalchemy import Row, case, delete, insert, select, update
+from sqlalchemy.exc import IntegrityError
 
-from src.contacts.models import Contact
-from src.contacts.schema import ContactCreate
-from config.cache import key_builder_repo
+from src.auth.models import User
+from src.contacts.models import Contact, birthday_key
+from src.contacts.schema import ContactCreate, ContactResponse
+from src.contacts.pagination import paginate, split_page
+from src.contacts.search import search_condition, search_distance
+from src.contacts.cache import contact_cache
+
+
+CONTACT_EMAIL_UNIQUE_INDEX = "ix_contact_email"
+RESPONSE_FIELDS = tuple(ContactResponse.model_fields)
+RESPONSE_COLUMNS = tuple(getattr(Contact, field) for field in RESPONSE_FIELDS)
+
+
+def to_response(row, fields: tuple[str, ...] = RESPONSE_FIELDS) -> ContactResponse:
+    """Будує відповідь з колонок `fields` без повторної валідації.
+
+    Дані в базі вже пройшли валідацію схемою при записі, а перевірка кожного
+    поля (особливо EmailStr) для сторінки контактів коштує більше, ніж сам запит.
+    Поля, яких немає у `fields`, не вважаються заданими й пропускаються при
+    серіалізації з `exclude_unset`.
+    """
+    return ContactResponse.model_construct(**dict(zip(fields, row)))
+
+
+def is_duplicate_email(error: IntegrityError) -> bool:
+    """Перевіряє, чи помилка бази даних — порушення унікальності email контакту.
+
+    PostgreSQL повідомляє назву порушеного обмеження (asyncpg зберігає її в
+    помилці драйвера), SQLite — лише текст "UNIQUE constraint failed: contact.email".
+
+    Args:
+        error (IntegrityError): Помилка SQLAlchemy.
+
+    Returns:
+        bool: True, якщо порушено унікальний індекс email контакту.
+    """
+    orig = error.orig
+    for candidate in (orig, getattr(orig, "orig", None), getattr(orig, "__cause__", None)):
+        constraint = getattr(candidate, "constraint_name", None)
+        if constraint:
+            return constraint == CONTACT_EMAIL_UNIQUE_INDEX
+    return "UNIQUE constraint failed: contact.email" in str(orig)
+
+
+def response_fields(fields: Iterable[str] | None) -> tuple[str, ...]:
+    """Повертає поля відповіді для вибірки в порядку схеми.
+
+    Args:
+        fields (Iterable[str] | None): Запитані поля; None або порожній список — усі поля.
+
+    Returns:
+        tuple[str, ...]: Запитані поля та `id`, який потрібен клієнту для подальших запитів.
+    """
+    if not fields:
+        return RESPONSE_FIELDS
+    selected = {*fields, "id"}
+    return tuple(field for field in RESPONSE_FIELDS if field in selected)
 
 
 class ContactRepository:
     """Репозиторій для взаємодії з моделями контактів у базі даних.
 
     Використовується для створення, отримання, оновлення, видалення та пошуку контактів.
+    Усі методи працюють лише з контактами вказаного власника.
 
     Attributes:
         session (AsyncSession): Сесія для роботи з базою даних.
@@ -25,111 +81,346 @@ class ContactRepository:
         """
         self.session = session
 
-    @cache(expire=60, namespace="get_contact_repo", key_builder=key_builder_repo)
-    async def get_contact(self, contact_id: int) -> Contact:
+    async def get_contact(self, owner_id: int, contact_id: int) -> ContactResponse | None:
         """Отримує контакт за його ID з кешем.
 
-        Використовує кешування для збереження результатів запиту.
+        Спочатку шукає контакт у `contact_cache`, а прочитаний з бази даних контакт
+        зберігає в кеш, якщо його не оновили й не видалили після промаху.
 
         Args:
+            owner_id (int): Ідентифікатор власника контакту.
             contact_id (int): Ідентифікатор контакту.
 
         Returns:
-            Contact | None: Контакт або None, якщо не знайдено.
+            ContactResponse | None: Контакт або None, якщо не знайдено.
         """
-        query = select(Contact).where(Contact.id==contact_id)
-        result = await self.session.execute(query)
-        return result.scalar_one_or_none()
+        cached, version = await contact_cache.get(owner_id, contact_id)
+        if cached is not None:
+            return cached
+        query = select(*RESPONSE_COLUMNS).where(Contact.owner_id == owner_id, Contact.id == contact_id)
+        row = (await self.session.execute(query)).one_or_none()
+        if row is None:
+            return None
+        response = to_response(row)
+        await contact_cache.fill(owner_id, response, version)
+        return response
 
-    async def create_contact(self, contact: ContactCreate) -> Contact:
+    async def create_contact(self, owner_id: int, contact: ContactCreate, max_contacts: int) -> ContactResponse | None:
         """Створює новий контакт у базі даних.
 
+        Ліміт перевіряється й резервується одним оновленням лічильника контактів
+        власника, тому підрахунок рядків таблиці контактів не потрібен. Контакт
+        вставляється запитом `INSERT ... RETURNING`, повторне читання після
+        фіксації не потрібне.
+
         Args:
+            owner_id (int): Ідентифікатор власника контакту.
             contact (ContactCreate): Об'єкт з даними для створення контакту.
+            max_contacts (int): Максимальна кількість контактів у власника.
 
         Returns:
-            Contact: Створений контакт.
+            ContactResponse | None: Створений контакт або None, якщо ліміт контактів вичерпано.
         """
-        new_contact = Contact(**contact.model_dump())
-        self.session.add(new_contact)
+        reserved = await self.session.execute(
+            update(User)
+            .where(User.id == owner_id, User.contacts_count < max_contacts)
+            .values(contacts_count=User.contacts_count + 1)
+            .returning(User.id)
+        )
+        if reserved.scalar_one_or_none() is None:
+            await self.session.rollback()
+            return None
+        values = {**contact.model_dump(), "owner_id": owner_id, "birthday_key": birthday_key(contact.birthday)}
+        row = (await self.session.execute(insert(Contact).values(**values).returning(*RESPONSE_COLUMNS))).one()
         await self.session.commit()
-        await self.session.refresh(new_contact)
-        return new_contact
+        return to_response(row)
 
-    async def update_contact(self, contact_id: int, contact_data: dict) -> Contact:
-        """Оновлює дані контакту.
+    async def insert_contacts_batch(
+        self, owner_id: int, rows: list[tuple[int, ContactCreate]], max_contacts: int
+    ) -> tuple[int, list[tuple[int, str]]]:
+        """Вставляє пакет контактів одним багаторядковим INSERT в одній транзакції.
 
-        Використовує ID для пошуку контакту та оновлює надані дані.
+        Рядок власника блокується на час транзакції, щоб паралельні імпорти та
+        створення контактів не перевищили ліміт. Якщо пакет порушує унікальність
+        email, він повторюється по одному рядку в точках збереження, щоб визначити,
+        які саме рядки не вдалося вставити. Інші порушення цілісності (зовнішній
+        ключ, NOT NULL) не є помилками окремих рядків і викидаються далі.
 
         Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            rows (list[tuple[int, ContactCreate]]): Номери рядків файлу та контакти.
+            max_contacts (int): Максимальна кількість контактів у власника.
+
+        Returns:
+            tuple[int, list[tuple[int, str]]]: Кількість вставлених контактів та помилки по рядках.
+
+        Raises:
+            IntegrityError: Якщо вставка порушує інше обмеження, ніж унікальність email.
+        """
+        result = await self.session.execute(
+            select(User.contacts_count).where(User.id == owner_id).with_for_update()
+        )
+        available = max(max_contacts - (result.scalar_one_or_none() or 0), 0)
+        accepted, rejected = rows[:available], rows[available:]
+        failed = [
+            (row_number, f"Досягнуто ліміт контактів. Ви можете мати лише {max_contacts} контактів.")
+            for row_number, _ in rejected
+        ]
+        values = [
+            {**contact.model_dump(), "owner_id": owner_id, "birthday_key": birthday_key(contact.birthday)}
+            for _, contact in accepted
+        ]
+        inserted = 0
+        if values:
+            try:
+                async with self.session.begin_nested():
+                    await self.session.execute(insert(Contact), values)
+                inserted = len(values)
+            except IntegrityError as e:
+                if not is_duplicate_email(e):
+                    raise
+                for (row_number, _), row_values in zip(accepted, values):
+                    try:
+                        async with self.session.begin_nested():
+                            await self.session.execute(insert(Contact), [row_values])
+                        inserted += 1
+                    except IntegrityError as row_error:
+                        if not is_duplicate_email(row_error):
+                            raise
+                        failed.append((row_number, "Контакт з такою електронною адресою вже існує"))
+        if inserted:
+            await self.session.execute(
+                update(User).where(User.id == owner_id).values(contacts_count=User.contacts_count + inserted)
+            )
+        await self.session.commit()
+        return inserted, failed
+
+    async def update_contact(self, owner_id: int, contact_id: int, contact_data: dict) -> ContactResponse | None:
+        """Оновлює дані контакту одним запитом `UPDATE ... RETURNING`.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контакту.
             contact_id (int): Ідентифікатор контакту.
             contact_data (dict): Дані для оновлення контакту.
 
         Returns:
-            Contact | None: Оновлений контакт або None, якщо контакт не знайдено.
+            ContactResponse | None: Оновлений контакт або None, якщо контакт не знайдено.
         """
-        query = select(Contact).where(Contact.id == contact_id)
-        result = await self.session.execute(query)
-        contact = result.scalar_one_or_none()
-        if not contact:
-            return None
-        for key, value in contact_data.items():
-            setattr(contact, key, value)
+        if not contact_data:
+            return await self.get_contact(owner_id, contact_id)
+        updated = await self._update_returning(owner_id, [contact_id], contact_data)
         await self.session.commit()
-        await self.session.refresh(contact)
-        return contact
+        await contact_cache.invalidate_many(owner_id, [contact.id for contact in updated])
+        return updated[0] if updated else None
 
-    async def delete_contact(self, contact_id: int) -> bool:
-        """Видаляє контакт з бази даних.
+    async def delete_contact(self, owner_id: int, contact_id: int) -> bool:
+        """Видаляє контакт з бази даних одним запитом `DELETE ... RETURNING`.
 
         Args:
+            owner_id (int): Ідентифікатор власника контакту.
             contact_id (int): Ідентифікатор контакту для видалення.
 
         Returns:
             bool: True, якщо контакт успішно видалено, інакше False.
         """
-        query = select(Contact).where(Contact.id == contact_id)
-        result = await self.session.execute(query)
-        contact = result.scalar_one_or_none()
-        if not contact:
-            return False
-        await self.session.delete(contact)
+        deleted = await self._delete_returning(owner_id, [contact_id])
         await self.session.commit()
-        return True
+        await contact_cache.invalidate_many(owner_id, deleted)
+        return bool(deleted)
 
-    async def search_contacts(self, query: str) -> list[Contact]:
-        """Шукає контакти за заданим запитом.
+    async def bulk_update_contacts(self, owner_id: int, contact_ids: list[int], changes: dict) -> dict[int, bool]:
+        """Застосовує однакові зміни до кількох контактів однією транзакцією.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            contact_ids (list[int]): Ідентифікатори контактів.
+            changes (dict): Поля для оновлення.
+
+        Returns:
+            dict[int, bool]: Для кожного ID — чи було оновлено контакт.
+        """
+        contact_ids = list(dict.fromkeys(contact_ids))
+        updated = await self._update_returning(owner_id, contact_ids, changes)
+        await self.session.commit()
+        await contact_cache.invalidate_many(owner_id, [contact.id for contact in updated])
+        updated_ids = {contact.id for contact in updated}
+        return {contact_id: contact_id in updated_ids for contact_id in contact_ids}
 
-        Шукає контакти за іменем, прізвищем або електронною адресою.
+    async def bulk_delete_contacts(self, owner_id: int, contact_ids: list[int]) -> dict[int, bool]:
+        """Видаляє кілька контактів однією транзакцією.
 
         Args:
-            query (str): Пошуковий запит.
+            owner_id (int): Ідентифікатор власника контактів.
+            contact_ids (list[int]): Ідентифікатори контактів.
 
         Returns:
-            list[Contact]: Список контактів, що відповідають запиту.
+            dict[int, bool]: Для кожного ID — чи було видалено контакт.
         """
-        stmt = select(Contact).where(
-            (Contact.first_name.ilike(f"%{query}%")) |
-            (Contact.last_name.ilike(f"%{query}%")) |
-            (Contact.email.ilike(f"%{query}%"))
+        contact_ids = list(dict.fromkeys(contact_ids))
+        deleted = await self._delete_returning(owner_id, contact_ids)
+        await self.session.commit()
+        await contact_cache.invalidate_many(owner_id, deleted)
+        deleted_ids = set(deleted)
+        return {contact_id: contact_id in deleted_ids for contact_id in contact_ids}
+
+    async def _update_returning(self, owner_id: int, contact_ids: list[int], values: dict) -> list[ContactResponse]:
+        """Оновлює контакти власника та повертає їх нові значення без додаткового SELECT."""
+        values = dict(values)
+        if values.get("birthday") is not None:
+            values["birthday_key"] = birthday_key(values["birthday"])
+        stmt = (
+            update(Contact)
+            .where(Contact.owner_id == owner_id, Contact.id.in_(contact_ids))
+            .values(**values)
+            .returning(*RESPONSE_COLUMNS)
+            .execution_options(synchronize_session=False)
+        )
+        result = await self.session.execute(stmt)
+        return [to_response(row) for row in result]
+
+    async def _delete_returning(self, owner_id: int, contact_ids: list[int]) -> list[int]:
+        """Видаляє контакти власника, зменшує лічильник контактів і повертає ID видалених."""
+        stmt = (
+            delete(Contact)
+            .where(Contact.owner_id == owner_id, Contact.id.in_(contact_ids))
+            .returning(Contact.id)
+            .execution_options(synchronize_session=False)
         )
+        deleted = list((await self.session.execute(stmt)).scalars())
+        if deleted:
+            await self.session.execute(
+                update(User).where(User.id == owner_id).values(contacts_count=User.contacts_count - len(deleted))
+            )
+        return deleted
+
+    async def stream_contacts(self, owner_id: int, batch_size: int = 1000) -> AsyncIterator[Row]:
+        """Потоково читає всі контакти власника через серверний курсор.
+
+        Рядки вибираються з бази пакетами по `batch_size`, тому пам'ять не
+        залежить від кількості контактів. Вибираються лише колонки відповіді,
+        без створення ORM-об'єктів і їх обліку в сесії.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            batch_size (int): Кількість рядків, що вибираються з курсора за раз.
+
+        Yields:
+            Row: Рядки з полями `ContactResponse`, впорядковані за ID.
+        """
+        stmt = (
+            select(*RESPONSE_COLUMNS)
+            .where(Contact.owner_id == owner_id)
+            .order_by(Contact.id)
+            .execution_options(yield_per=batch_size)
+        )
+        result = await self.session.stream(stmt)
+        async for row in result:
+            yield row
+
+    async def _fetch_page(
+        self,
+        stmt,
+        cursor: str | None,
+        limit: int,
+        keys=(Contact.last_name, Contact.id),
+        fields: Iterable[str] | None = None,
+    ) -> tuple[list[ContactResponse], str | None]:
+        """Виконує запит сторінками, вибираючи лише колонки запитаних полів.
+
+        За замовчуванням контакти сортуються за прізвищем та ID.
+
+        Args:
+            stmt (Select): Запит з умовами вибірки контактів.
+            cursor (str | None): Курсор попередньої сторінки.
+            limit (int): Розмір сторінки.
+            keys (tuple): Унікальний ключ сортування.
+            fields (Iterable[str] | None): Поля відповіді; None — усі поля.
+
+        Returns:
+            tuple[list[ContactResponse], str | None]: Контакти сторінки та курсор наступної.
+        """
+        fields = response_fields(fields)
+        stmt = stmt.with_only_columns(*(getattr(Contact, field) for field in fields))
+        stmt = paginate(stmt, keys, cursor, limit)
         result = await self.session.execute(stmt)
-        return result.scalars().all()
+        rows, next_cursor = split_page(result.all(), limit, len(keys))
+        return [to_response(row, fields) for row in rows], next_cursor
 
-    async def get_upcoming_birthdays(self) -> list[Contact]:
-        """Отримує контакти з днями народження, які будуть у найближчий тиждень.
+    async def list_contacts(
+        self, owner_id: int, limit: int, cursor: str | None = None, fields: Iterable[str] | None = None
+    ) -> tuple[list[ContactResponse], str | None]:
+        """Повертає сторінку контактів, відсортованих за прізвищем.
 
-        Використовує поточну дату для пошуку контактів, що мають день народження
-        протягом наступних семи днів.
+        Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            limit (int): Розмір сторінки.
+            cursor (str | None): Курсор попередньої сторінки.
+            fields (Iterable[str] | None): Поля відповіді; None — усі поля.
 
         Returns:
-            list[Contact]: Список контактів, у яких день народження найближчим часом.
+            tuple[list[ContactResponse], str | None]: Контакти сторінки та курсор наступної.
+        """
+        stmt = select(Contact).where(Contact.owner_id == owner_id)
+        return await self._fetch_page(stmt, cursor, limit, fields=fields)
+
+    async def search_contacts(
+        self, owner_id: int, query: str, limit: int, cursor: str | None = None, fields: Iterable[str] | None = None
+    ) -> tuple[list[ContactResponse], str | None]:
+        """Шукає контакти за заданим запитом.
+
+        Шукає підрядок в імені, прізвищі або електронній адресі за допомогою
+        триграмного індексу та впорядковує результати за схожістю із запитом.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            query (str): Пошуковий запит.
+            limit (int): Розмір сторінки.
+            cursor (str | None): Курсор попередньої сторінки.
+            fields (Iterable[str] | None): Поля відповіді; None — усі поля.
+
+        Returns:
+            tuple[list[ContactResponse], str | None]: Контакти, що відповідають запиту, та курсор наступної сторінки.
+        """
+        stmt = select(Contact).where(Contact.owner_id == owner_id, search_condition(query))
+        return await self._fetch_page(stmt, cursor, limit, keys=(search_distance(query), Contact.id), fields=fields)
+
+    async def get_upcoming_birthdays(
+        self,
+        owner_id: int,
+        limit: int,
+        cursor: str | None = None,
+        days: int = 7,
+        fields: Iterable[str] | None = None,
+    ) -> tuple[list[ContactResponse], str | None]:
+        """Отримує контакти з днями народження від сьогодні до `today + days` включно.
+
+        Порівнює індексований ключ `місяць * 100 + день`, тому рік народження не
+        має значення, а вікно, що переходить з грудня на січень, розбивається на
+        два діапазони. Контакти впорядковані за тим, як скоро в них день народження.
+
+        Args:
+            owner_id (int): Ідентифікатор власника контактів.
+            limit (int): Розмір сторінки.
+            cursor (str | None): Курсор попередньої сторінки.
+            days (int): Кількість днів після сьогоднішнього, на які дивимося вперед;
+                0 — лише сьогодні, 7 — сьогодні та наступні сім днів.
+            fields (Iterable[str] | None): Поля відповіді; None — усі поля.
+
+        Returns:
+            tuple[list[ContactResponse], str | None]: Контакти з днем народження найближчим часом
+            та курсор наступної сторінки.
         """
         today = date.today()
-        next_week = today + timedelta(days=7)
-        stmt = select(Contact).where(
-            (Contact.birthday >= today) &
-            (Contact.birthday <= next_week)
+        start_key = birthday_key(today)
+        end_key = birthday_key(today + timedelta(days=days))
+        stmt = select(Contact).where(Contact.owner_id == owner_id)
+        if days < 365:
+            if start_key <= end_key:
+                stmt = stmt.where(Contact.birthday_key.between(start_key, end_key))
+            else:
+                stmt = stmt.where((Contact.birthday_key >= start_key) | (Contact.birthday_key <= end_key))
+        upcoming_order = case(
+            (Contact.birthday_key >= start_key, Contact.birthday_key),
+            else_=Contact.birthday_key + 1300,
         )
-        result = await self.session.execute(stmt)
-        return result.scalars().all()
+        return await self._fetch_page(stmt, cursor, limit, keys=(upcoming_order, Contact.id), fields=fields)
@@ -1,17 +1,79 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Query, UploadFile, status
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from config.db import get_db
+from config.db import DatabaseSessionManager, get_db, get_session_factory
+from config.general import settings
+from config.instrumentation import query_budget
 from src.contacts.repos import ContactRepository
-from src.contacts.schema import ContactResponse, ContactCreate, ContactUpdate
+from src.contacts.schema import (
+    ContactResponse, ContactCreate, ContactUpdate, ContactPage, ContactField, ContactImportReport,
+    ContactBulkUpdate, ContactBulkDelete, ContactBulkItem, ContactBulkResult,
+)
+from src.contacts.importer import ImportFormat, detect_format, import_contacts as import_contacts_file
+from src.contacts.exporter import ExportFormat, MEDIA_TYPES, FILE_EXTENSIONS, export_chunks
+from src.contacts.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, InvalidCursorError
+from src.auth.schema import UserResponse
 from src.auth.utils import get_current_user
 
 router = APIRouter()
-MAX_CONTACTS_PER_USER = 100
+MAX_CONTACTS_PER_USER = settings.max_contacts_per_user
 
 
-@router.post("/", response_model=ContactResponse)
-async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_db), current_user: dict = Depends(get_current_user)):
+async def _page(fetch) -> ContactPage:
+    """Виконує вибірку сторінки та перетворює помилку курсора на відповідь 400.
+
+    Репозиторій повертає вже побудовані `ContactResponse`, тому сторінка
+    збирається без повторної валідації елементів.
+    """
+    try:
+        items, next_cursor = await fetch
+    except InvalidCursorError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Невірний курсор сторінки")
+    return ContactPage.model_construct(items=items, next_cursor=next_cursor)
+
+
+@router.get(
+    "/",
+    response_model=ContactPage,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(query_budget(2))],
+)
+async def list_contacts(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: list[ContactField] | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """
+    Отримати сторінку контактів поточного користувача.
+
+    Контакти відсортовані за прізвищем. Для отримання наступної сторінки
+    потрібно передати `next_cursor` з попередньої відповіді. Параметр `fields`
+    (можна повторювати) обмежує поля контактів у відповіді й колонки, що
+    читаються з бази даних.
+
+    Аргументи:
+        limit (int): Кількість контактів на сторінці.
+        cursor (str | None): Курсор наступної сторінки.
+        fields (list[ContactField] | None): Поля контактів у відповіді, `id` повертається
+            завжди; якщо не вказано — усі поля.
+        db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Викидає:
+        HTTPException: Якщо курсор пошкоджений.
+
+    Повертає:
+        ContactPage: Контакти сторінки та курсор наступної.
+    """
+    contact_repo = ContactRepository(db)
+    return await _page(contact_repo.list_contacts(current_user.id, limit=limit, cursor=cursor, fields=fields))
+
+
+@router.post("/", response_model=ContactResponse, dependencies=[Depends(query_budget(3))])
+async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_db), current_user: UserResponse = Depends(get_current_user)):
     """
     Створити новий контакт для поточного користувача.
 
@@ -22,7 +84,7 @@ async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_
     Аргументи:
         contact (ContactCreate): Дані для створення контакту.
         db (AsyncSession): Залежність для сесії бази даних.
-        current_user (dict): Поточний аутентифікований користувач.
+        current_user (UserResponse): Поточний аутентифікований користувач.
 
     Викидає:
         HTTPException: Якщо користувач досяг ліміту контактів.
@@ -31,22 +93,167 @@ async def create_contact(contact: ContactCreate, db: AsyncSession = Depends(get_
         ContactResponse: Створений контакт.
     """
     contact_repo = ContactRepository(db)
-    user_contacts_count = await db.execute(
-        "SELECT COUNT(*) FROM contacts WHERE user_id = :user_id",
-        {"user_id": current_user["id"]}
-    )
-    count = user_contacts_count.scalar()
-    
-    if count >= MAX_CONTACTS_PER_USER:
+    new_contact = await contact_repo.create_contact(current_user.id, contact, max_contacts=MAX_CONTACTS_PER_USER)
+    if new_contact is None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Досягнуто ліміт контактів. Ви можете мати лише {MAX_CONTACTS_PER_USER} контактів."
         )
-    return await contact_repo.create_contact(contact)
+    return new_contact
+
+
+@router.post(
+    "/import/",
+    response_model=ContactImportReport,
+    dependencies=[Depends(query_budget(None, allow_repeated=True))],
+)
+async def import_contacts(
+    file: UploadFile = File(...),
+    file_format: ImportFormat | None = Query(None, alias="format"),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """
+    Масовий імпорт контактів з CSV або NDJSON файлу.
+
+    Файл читається потоково й вставляється пакетами, тому використання пам'яті
+    не залежить від розміру файлу. Кожен пакет фіксується окремо: рядки, що не
+    пройшли перевірку, перевищили ліміт контактів або дублюють email, потрапляють
+    у звіт і не зупиняють імпорт решти файлу.
+
+    Аргументи:
+        file (UploadFile): CSV з рядком заголовка або NDJSON файл у кодуванні UTF-8.
+        file_format (ImportFormat | None): Формат файлу, якщо його не видно з імені файлу.
+        db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Викидає:
+        HTTPException: Якщо формат файлу невідомий або файл не в UTF-8.
+
+    Повертає:
+        ContactImportReport: Кількість імпортованих контактів та помилки по рядках.
+    """
+    file_format = file_format or detect_format(file.filename, file.content_type)
+    if file_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Невідомий формат файлу. Підтримуються CSV та NDJSON."
+        )
+    contact_repo = ContactRepository(db)
+    try:
+        return await import_contacts_file(
+            contact_repo, current_user.id, file.file, file_format, max_contacts=MAX_CONTACTS_PER_USER
+        )
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Файл має бути в кодуванні UTF-8. Пакети до місця помилки вже імпортовано."
+        )
 
 
-@router.get("/{contact_id}", response_model=ContactResponse)
-async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+@router.get("/export/", dependencies=[Depends(query_budget(2))])
+async def export_contacts(
+    file_format: ExportFormat = Query("csv", alias="format"),
+    session_factory=Depends(get_session_factory),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """
+    Експорт усіх контактів поточного користувача у CSV, NDJSON або vCard.
+
+    Контакти читаються серверним курсором і віддаються частинами (chunked),
+    тому експорт будь-якого розміру виконується в сталій пам'яті, а перші байти
+    клієнт отримує одразу.
+
+    Аргументи:
+        file_format (ExportFormat): Формат експорту.
+        session_factory: Фабрика сесій для сесії, що живе весь час передачі відповіді.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Повертає:
+        StreamingResponse: Файл експорту.
+    """
+    owner_id = current_user.id
+
+    async def body():
+        async with DatabaseSessionManager(session_factory) as session:
+            contact_repo = ContactRepository(session)
+            async for chunk in export_chunks(contact_repo.stream_contacts(owner_id), file_format):
+                yield chunk
+
+    return StreamingResponse(
+        body(),
+        media_type=MEDIA_TYPES[file_format],
+        headers={"Content-Disposition": f'attachment; filename="contacts.{FILE_EXTENSIONS[file_format]}"'},
+    )
+
+
+@router.patch("/bulk/", response_model=ContactBulkResult, dependencies=[Depends(query_budget(2))])
+async def bulk_update_contacts(
+    body: ContactBulkUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """
+    Застосувати однакові зміни до кількох контактів.
+
+    Усі контакти оновлюються одним запитом в одній транзакції. Email не можна
+    змінювати масово, оскільки він унікальний для кожного контакту.
+
+    Аргументи:
+        body (ContactBulkUpdate): ID контактів та поля для оновлення.
+        db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Викидає:
+        HTTPException: Якщо не передано жодного поля для оновлення.
+
+    Повертає:
+        ContactBulkResult: Результат для кожного ID: "updated" або "not_found".
+    """
+    changes = body.changes.model_dump(exclude_unset=True)
+    if not changes:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Не передано жодного поля для оновлення")
+    contact_repo = ContactRepository(db)
+    results = await contact_repo.bulk_update_contacts(current_user.id, body.ids, changes)
+    return ContactBulkResult(results=[
+        ContactBulkItem(id=contact_id, status="updated" if updated else "not_found")
+        for contact_id, updated in results.items()
+    ])
+
+
+@router.post("/bulk/delete/", response_model=ContactBulkResult, dependencies=[Depends(query_budget(3))])
+async def bulk_delete_contacts(
+    body: ContactBulkDelete,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """
+    Видалити кілька контактів.
+
+    Усі контакти видаляються одним запитом в одній транзакції.
+
+    Аргументи:
+        body (ContactBulkDelete): ID контактів для видалення.
+        db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Повертає:
+        ContactBulkResult: Результат для кожного ID: "deleted" або "not_found".
+    """
+    contact_repo = ContactRepository(db)
+    results = await contact_repo.bulk_delete_contacts(current_user.id, body.ids)
+    return ContactBulkResult(results=[
+        ContactBulkItem(id=contact_id, status="deleted" if deleted else "not_found")
+        for contact_id, deleted in results.items()
+    ])
+
+
+@router.get("/{contact_id}", response_model=ContactResponse, dependencies=[Depends(query_budget(2))])
+async def get_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
     """
     Отримати контакт за його ID.
 
@@ -56,6 +263,7 @@ async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     Аргументи:
         contact_id (int): ID контакту для отримання.
         db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
 
     Викидає:
         HTTPException: Якщо контакт не знайдено.
@@ -64,14 +272,19 @@ async def get_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
         ContactResponse: Деталі запитуваного контакту.
     """
     contact_repo = ContactRepository(db)
-    contact = await contact_repo.get_contact(contact_id=contact_id)
+    contact = await contact_repo.get_contact(current_user.id, contact_id)
     if not contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="КОНТАКТ НЕ ЗНАЙДЕНО")
     return contact
 
 
-@router.put("/{contact_id}", response_model=ContactResponse)
-async def update_contact(contact_id: int, contact: ContactUpdate, db: AsyncSession = Depends(get_db)):
+@router.put("/{contact_id}", response_model=ContactResponse, dependencies=[Depends(query_budget(2))])
+async def update_contact(
+    contact_id: int,
+    contact: ContactUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
     """
     Оновити існуючий контакт.
 
@@ -82,6 +295,7 @@ async def update_contact(contact_id: int, contact: ContactUpdate, db: AsyncSessi
         contact_id (int): ID контакту для оновлення.
         contact (ContactUpdate): Дані для оновлення контакту.
         db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
 
     Викидає:
         HTTPException: Якщо контакт не знайдено.
@@ -90,14 +304,18 @@ async def update_contact(contact_id: int, contact: ContactUpdate, db: AsyncSessi
         ContactResponse: Оновлений контакт.
     """
     contact_repo = ContactRepository(db)
-    updated_contact = await contact_repo.update_contact(contact_id, contact.dict(exclude_unset=True))
+    updated_contact = await contact_repo.update_contact(current_user.id, contact_id, contact.model_dump(exclude_unset=True))
     if not updated_contact:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="КОНТАКТ НЕ ЗНАЙДЕНО")
     return updated_contact
 
 
-@router.delete("/{contact_id}")
-async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
+@router.delete("/{contact_id}", dependencies=[Depends(query_budget(3))])
+async def delete_contact(
+    contact_id: int,
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
     """
     Видалити контакт за його ID.
 
@@ -107,6 +325,7 @@ async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
     Аргументи:
         contact_id (int): ID контакту для видалення.
         db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
 
     Викидає:
         HTTPException: Якщо контакт не знайдено.
@@ -115,43 +334,89 @@ async def delete_contact(contact_id: int, db: AsyncSession = Depends(get_db)):
         dict: Підтвердження успішного видалення.
     """
     contact_repo = ContactRepository(db)
-    deleted = await contact_repo.delete_contact(contact_id)
+    deleted = await contact_repo.delete_contact(current_user.id, contact_id)
     if not deleted:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="КОНТАКТ НЕ ЗНАЙДЕНО")
     return {"detail": "Контакт видалено успішно!"}
 
 
-@router.get("/search/", response_model=list[ContactResponse])
-async def search_contacts(query: str, db: AsyncSession = Depends(get_db)):
+@router.get(
+    "/search/",
+    response_model=ContactPage,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(query_budget(2))],
+)
+async def search_contacts(
+    query: str = Query(..., min_length=1),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: list[ContactField] | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
     """
     Пошук контактів за запитом.
 
     Цей ендпоінт дозволяє користувачам шукати контакти за рядком запиту.
-    Повертається список контактів, які відповідають критеріям пошуку.
+    Повертається сторінка контактів, які відповідають критеріям пошуку.
 
     Аргументи:
         query (str): Рядок запиту для пошуку.
+        limit (int): Кількість контактів на сторінці.
+        cursor (str | None): Курсор наступної сторінки.
+        fields (list[ContactField] | None): Поля контактів у відповіді, `id` повертається
+            завжди; якщо не вказано — усі поля.
         db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Викидає:
+        HTTPException: Якщо курсор пошкоджений.
 
     Повертає:
-        list[ContactResponse]: Список контактів, що відповідають запиту.
+        ContactPage: Контакти, що відповідають запиту, та курсор наступної сторінки.
     """
     contact_repo = ContactRepository(db)
-    return await contact_repo.search_contacts(query)
+    return await _page(
+        contact_repo.search_contacts(current_user.id, query, limit=limit, cursor=cursor, fields=fields)
+    )
 
 
-@router.get("/birthdays/", response_model=list[ContactResponse])
-async def upcoming_birthdays(db: AsyncSession = Depends(get_db)):
+@router.get(
+    "/birthdays/",
+    response_model=ContactPage,
+    response_model_exclude_unset=True,
+    dependencies=[Depends(query_budget(2))],
+)
+async def upcoming_birthdays(
+    days: int = Query(7, ge=0, le=365),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: str | None = None,
+    fields: list[ContactField] | None = Query(None),
+    db: AsyncSession = Depends(get_db),
+    current_user: UserResponse = Depends(get_current_user),
+):
     """
     Отримати контакти з найближчими днями народження.
 
-    Цей ендпоінт повертає список контактів, у яких найближчим часом день народження.
+    Цей ендпоінт повертає сторінку контактів, у яких день народження від
+    сьогодні до `сьогодні + days` включно, з урахуванням переходу через Новий рік.
 
     Аргументи:
+        days (int): Горизонт пошуку в днях після сьогоднішнього; 0 — лише сьогодні.
+        limit (int): Кількість контактів на сторінці.
+        cursor (str | None): Курсор наступної сторінки.
+        fields (list[ContactField] | None): Поля контактів у відповіді, `id` повертається
+            завжди; якщо не вказано — усі поля.
         db (AsyncSession): Залежність для сесії бази даних.
+        current_user (UserResponse): Поточний аутентифікований користувач.
+
+    Викидає:
+        HTTPException: Якщо курсор пошкоджений.
 
     Повертає:
-        list[ContactResponse]: Список контактів з найближчими днями народження.
+        ContactPage: Контакти з найближчими днями народження та курсор наступної сторінки.
     """
     contact_repo = ContactRepository(db)
-    return await contact_repo.get_upcoming_birthdays()
+    return await _page(
+        contact_repo.get_upcoming_birthdays(current_user.id, limit=limit, cursor=cursor, days=days, fields=fields)
+    )
@@ -1,6 +1,7 @@
 from datetime import date
+from typing import Literal
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, field_validator
 
 
 class Contact(BaseModel):
@@ -20,9 +21,67 @@ class ContactResponse(Contact):
         from_attributes = True
 
 
+ContactField = Literal[
+    "id", "first_name", "last_name", "email", "phone_number", "birthday", "age", "additional_info"
+]
+
+
 class ContactCreate(Contact):
     pass
 
 
 class ContactUpdate(Contact):
-    pass
\ No newline at end of file
+    pass
+
+class ContactPage(BaseModel):
+    items: list[ContactResponse]
+    next_cursor: str | None = None
+
+
+class ContactImportError(BaseModel):
+    row: int
+    errors: list[str]
+
+
+class ContactImportReport(BaseModel):
+    imported: int = 0
+    failed: int = 0
+    errors: list[ContactImportError] = []
+    errors_truncated: bool = False
+
+
+MAX_BULK_IDS = 1000
+
+
+class ContactBulkChanges(BaseModel):
+    first_name: str | None = None
+    last_name: str | None = None
+    phone_number: str | None = None
+    birthday: date | None = None
+    age: int | None = None
+    additional_info: str | None = None
+
+    @field_validator("first_name", "last_name", "phone_number", "birthday", "age")
+    @classmethod
+    def _not_null(cls, value):
+        if value is None:
+            raise ValueError("Поле не може бути null")
+        return value
+
+
+class ContactBulkUpdate(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+    changes: ContactBulkChanges
+
+
+class ContactBulkDelete(BaseModel):
+    ids: list[int] = Field(..., min_length=1, max_length=MAX_BULK_IDS)
+
+
+class ContactBulkItem(BaseModel):
+    id: int
+    status: Literal["updated", "deleted", "not_found"]
+
+
+class ContactBulkResult(BaseModel):
+    results: list[ContactBulkItem]
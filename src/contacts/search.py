@@ -0,0 +1,93 @@
+import re
+
+from sqlalchemy import ColumnElement, Engine, Float, event, func, literal, literal_column
+
+from src.contacts.models import Contact
+
+
+SEARCH_DOCUMENT = func.lower(
+    Contact.first_name.op("||")(literal_column("' '"))
+    .op("||")(Contact.last_name)
+    .op("||")(literal_column("' '"))
+    .op("||")(Contact.email)
+)
+"""Вираз пошукового документа контакту.
+
+Вираз має точно збігатися з виразом GIN-індексу `ix_contact_search_trgm` у міграції,
+інакше Postgres не зможе використати індекс.
+"""
+
+_WORD_RE = re.compile(r"[^\W_]+")
+
+
+def trigrams(text: str) -> set[str]:
+    """Розбиває текст на триграми так само, як це робить розширення pg_trgm.
+
+    Args:
+        text (str): Вхідний текст.
+
+    Returns:
+        set[str]: Множина триграм.
+    """
+    result = set()
+    for word in _WORD_RE.findall(text.lower()):
+        padded = f"  {word} "
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return result
+
+
+def trigram_similarity(left: str | None, right: str | None) -> float | None:
+    """Обчислює схожість двох рядків за триграмами, як функція `similarity` з pg_trgm.
+
+    Args:
+        left (str | None): Перший рядок.
+        right (str | None): Другий рядок.
+
+    Returns:
+        float | None: Схожість від 0 до 1 або None, якщо один з рядків NULL.
+    """
+    if left is None or right is None:
+        return None
+    left_trigrams, right_trigrams = trigrams(left), trigrams(right)
+    if not left_trigrams or not right_trigrams:
+        return 0.0
+    return len(left_trigrams & right_trigrams) / len(left_trigrams | right_trigrams)
+
+
+def search_condition(query: str) -> ColumnElement[bool]:
+    """Умова пошуку підрядка в пошуковому документі контакту.
+
+    У Postgres умова обслуговується триграмним GIN-індексом.
+
+    Args:
+        query (str): Пошуковий запит.
+
+    Returns:
+        ColumnElement[bool]: Умова для WHERE.
+    """
+    return SEARCH_DOCUMENT.contains(query.lower(), autoescape=True)
+
+
+def search_distance(query: str) -> ColumnElement[float]:
+    """Відстань між запитом і контактом для ранжування результатів.
+
+    Менша відстань означає кращий збіг, тому вираз можна використовувати
+    як ключ сортування за зростанням разом з keyset-пагінацією.
+
+    Args:
+        query (str): Пошуковий запит.
+
+    Returns:
+        ColumnElement[float]: Вираз `1 - similarity(document, query)`.
+    """
+    return literal(1.0, Float) - func.similarity(SEARCH_DOCUMENT, query.lower(), type_=Float)
+
+
+@event.listens_for(Engine, "connect")
+def _register_sqlite_functions(dbapi_connection, connection_record):
+    """Реєструє Python-реалізацію `similarity` для SQLite-з'єднань.
+
+    Postgres надає функцію через pg_trgm, тому для інших драйверів нічого не робиться.
+    """
+    if hasattr(dbapi_connection, "create_function"):
+        dbapi_connection.create_function("similarity", 2, trigram_similarity, deterministic=True)
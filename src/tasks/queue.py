@@ -0,0 +1,293 @@
+import random
+import time
+import uuid
+
+import orjson
+from pydantic import BaseModel, Field
+
+from config.cache import get_redis
+from config.general import settings
+from config.metrics import EMAIL_JOBS, EMAIL_QUEUE_DEPTH
+
+
+class EmailJob(BaseModel):
+    """Завдання на відправку одного листа.
+
+    Attributes:
+        id (str): Унікальний ідентифікатор завдання.
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        body (str): HTML-вміст листа.
+        attempts (int): Кількість невдалих спроб відправки.
+        enqueued_at (float): Час постановки в чергу (Unix time).
+        last_error (str | None): Остання помилка відправки.
+    """
+    id: str = Field(default_factory=lambda: uuid.uuid4().hex)
+    recipient: str
+    subject: str
+    body: str
+    attempts: int = 0
+    enqueued_at: float = Field(default_factory=time.time)
+    last_error: str | None = None
+
+
+class EmailQueue:
+    """Надійна черга листів у Redis.
+
+    Нові завдання потрапляють у список `ready`. Воркер атомарно переносить їх у
+    власний список `processing` (LMOVE) і видаляє звідти лише після відправки.
+    Живий воркер періодично оновлює свій ключ пульсу з TTL `heartbeat_ttl`;
+    якщо процес зупинився посеред роботи (збій, OOM), ключ зникає, і будь-який
+    інший воркер повертає його завдання в `ready` (`reclaim_expired`), тому
+    завдання не губляться. Завдання для повторної спроби чекають у
+    впорядкованій множині `delayed` до свого часу, а після `max_attempts`
+    невдач переносяться в список `dead`.
+
+    Attributes:
+        name (str): Префікс ключів черги.
+        max_attempts (int): Кількість спроб відправки листа.
+        retry_base_delay (float): Затримка перед першою повторною спробою, секунди.
+        retry_max_delay (float): Максимальна затримка між спробами, секунди.
+        heartbeat_ttl (float): Час без пульсу, після якого воркер вважається зупиненим, секунди.
+        worker_id (str): Ідентифікатор воркера, що працює з цим екземпляром черги.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_attempts: int,
+        retry_base_delay: float,
+        retry_max_delay: float,
+        heartbeat_ttl: float = 60,
+        worker_id: str | None = None,
+    ):
+        self.name = name
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        self.heartbeat_ttl = heartbeat_ttl
+        self.worker_id = worker_id or uuid.uuid4().hex
+        self._registered = False
+
+    @property
+    def ready_key(self) -> str:
+        return f"{self.name}:ready"
+
+    @property
+    def processing_key(self) -> str:
+        return self._processing_key(self.worker_id)
+
+    @property
+    def workers_key(self) -> str:
+        return f"{self.name}:workers"
+
+    def _processing_key(self, worker_id: str) -> str:
+        return f"{self.name}:processing:{worker_id}"
+
+    def _heartbeat_key(self, worker_id: str) -> str:
+        return f"{self.name}:heartbeat:{worker_id}"
+
+    @property
+    def delayed_key(self) -> str:
+        return f"{self.name}:delayed"
+
+    @property
+    def dead_key(self) -> str:
+        return f"{self.name}:dead"
+
+    async def enqueue(self, job: EmailJob):
+        """Ставить завдання в чергу.
+
+        Args:
+            job (EmailJob): Завдання.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        await get_redis().lpush(self.ready_key, orjson.dumps(job.model_dump()))
+        EMAIL_JOBS.labels(result="enqueued").inc()
+
+    async def reserve(self, batch_size: int, timeout: float) -> list[tuple[bytes, EmailJob]]:
+        """Забирає до `batch_size` завдань у обробку.
+
+        Чекає на перше завдання не довше за `timeout` секунд, решту забирає
+        без очікування.
+
+        Args:
+            batch_size (int): Максимальна кількість завдань.
+            timeout (float): Час очікування першого завдання, секунди.
+
+        Returns:
+            list[tuple[bytes, EmailJob]]: Сирі записи черги та розібрані завдання.
+        """
+        if not self._registered:
+            # Воркер має бути в реєстрі раніше, ніж візьме перше завдання.
+            await self.heartbeat()
+        redis = get_redis()
+        raw = await redis.blmove(self.ready_key, self.processing_key, timeout, "RIGHT", "LEFT")
+        if raw is None:
+            return []
+        reserved = [raw]
+        while len(reserved) < batch_size:
+            raw = await redis.lmove(self.ready_key, self.processing_key, "RIGHT", "LEFT")
+            if raw is None:
+                break
+            reserved.append(raw)
+        return [(raw, EmailJob.model_validate(orjson.loads(raw))) for raw in reserved]
+
+    async def ack(self, raw: bytes):
+        """Видаляє успішно виконане завдання з обробки."""
+        await get_redis().lrem(self.processing_key, 1, raw)
+        EMAIL_JOBS.labels(result="sent").inc()
+
+    def retry_delay(self, attempts: int) -> float:
+        """Повертає експоненційну затримку з випадковим розкидом для номера спроби.
+
+        Args:
+            attempts (int): Кількість уже невдалих спроб.
+
+        Returns:
+            float: Затримка в секундах.
+        """
+        delay = min(self.retry_base_delay * 2 ** (attempts - 1), self.retry_max_delay)
+        return delay * random.uniform(0.5, 1.0)
+
+    async def fail(self, raw: bytes, job: EmailJob, error: str):
+        """Планує повторну спробу або переносить завдання до невдалих.
+
+        Args:
+            raw (bytes): Сирий запис черги, що зараз в обробці.
+            job (EmailJob): Завдання.
+            error (str): Опис помилки відправки.
+        """
+        job = job.model_copy(update={"attempts": job.attempts + 1, "last_error": error})
+        payload = orjson.dumps(job.model_dump())
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            if job.attempts >= self.max_attempts:
+                pipe.lpush(self.dead_key, payload)
+            else:
+                pipe.zadd(self.delayed_key, {payload: time.time() + self.retry_delay(job.attempts)})
+            await pipe.execute()
+        EMAIL_JOBS.labels(result="dead" if job.attempts >= self.max_attempts else "retried").inc()
+
+    async def promote_due(self) -> int:
+        """Повертає в чергу завдання, час повторної спроби яких настав.
+
+        Returns:
+            int: Кількість повернених завдань.
+        """
+        redis = get_redis()
+        due = await redis.zrangebyscore(self.delayed_key, "-inf", time.time())
+        promoted = 0
+        for payload in due:
+            # ZREM повертає 1 лише одному з воркерів, тому завдання не дублюється.
+            if await redis.zrem(self.delayed_key, payload):
+                await redis.lpush(self.ready_key, payload)
+                promoted += 1
+        return promoted
+
+    async def heartbeat(self):
+        """Реєструє воркера та продовжує його пульс на `heartbeat_ttl` секунд.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.sadd(self.workers_key, self.worker_id)
+            pipe.set(self._heartbeat_key(self.worker_id), 1, px=int(self.heartbeat_ttl * 1000))
+            await pipe.execute()
+        self._registered = True
+
+    async def _requeue(self, processing_key: str) -> int:
+        redis = get_redis()
+        requeued = 0
+        # LMOVE переносить кожне завдання атомарно, тому воркери, що одночасно
+        # повертають той самий список, не дублюють завдання.
+        while await redis.lmove(processing_key, self.ready_key, "RIGHT", "RIGHT") is not None:
+            requeued += 1
+        return requeued
+
+    async def reclaim_expired(self) -> int:
+        """Повертає в чергу завдання воркерів, пульс яких зник.
+
+        Також повертає завдання зі спільного списку `processing` попередньої
+        версії черги, до якого вже ніхто не пише.
+
+        Returns:
+            int: Кількість повернених завдань.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        redis = get_redis()
+        requeued = await self._requeue(f"{self.name}:processing")
+        for member in await redis.smembers(self.workers_key):
+            worker_id = member.decode() if isinstance(member, bytes) else member
+            if worker_id == self.worker_id or await redis.exists(self._heartbeat_key(worker_id)):
+                continue
+            requeued += await self._requeue(self._processing_key(worker_id))
+            await redis.srem(self.workers_key, worker_id)
+        return requeued
+
+    async def retire(self) -> int:
+        """Знімає воркера з реєстру під час штатної зупинки.
+
+        Незавершені завдання воркера повертаються в чергу.
+
+        Returns:
+            int: Кількість повернених завдань.
+
+        Raises:
+            RedisError: Якщо Redis недоступний.
+        """
+        requeued = await self._requeue(self.processing_key)
+        async with get_redis().pipeline(transaction=True) as pipe:
+            pipe.srem(self.workers_key, self.worker_id)
+            pipe.delete(self._heartbeat_key(self.worker_id))
+            await pipe.execute()
+        self._registered = False
+        return requeued
+
+    async def update_depth_metrics(self) -> dict[str, int]:
+        """Оновлює метрику глибини черги за станами.
+
+        Returns:
+            dict[str, int]: Кількість завдань у кожному стані.
+        """
+        redis = get_redis()
+        workers = await redis.smembers(self.workers_key)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.llen(self.ready_key)
+            pipe.zcard(self.delayed_key)
+            pipe.llen(self.dead_key)
+            for member in workers:
+                pipe.llen(self._processing_key(member.decode() if isinstance(member, bytes) else member))
+            ready, delayed, dead, *processing = await pipe.execute()
+        depth = {"ready": ready, "processing": sum(processing), "delayed": delayed, "dead": dead}
+        for state, count in depth.items():
+            EMAIL_QUEUE_DEPTH.labels(state=state).set(count)
+        return depth
+
+
+email_queue = EmailQueue(
+    name=settings.email_queue_name,
+    max_attempts=settings.email_queue_max_attempts,
+    retry_base_delay=settings.email_queue_retry_base_delay,
+    retry_max_delay=settings.email_queue_retry_max_delay,
+    heartbeat_ttl=settings.email_queue_heartbeat_ttl,
+)
+
+
+async def enqueue_email(recipient: str, subject: str, body: str):
+    """Ставить лист у чергу відправки.
+
+    Args:
+        recipient (str): Адреса отримувача.
+        subject (str): Тема листа.
+        body (str): HTML-вміст листа.
+
+    Raises:
+        RedisError: Якщо Redis недоступний.
+    """
+    await email_queue.enqueue(EmailJob(recipient=recipient, subject=subject, body=body))
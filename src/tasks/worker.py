@@ -0,0 +1,134 @@
+"""Воркер черги листів.
+
+Запуск:
+    python -m src.tasks.worker --metrics-port 9101
+"""
+import argparse
+import asyncio
+import logging
+import signal
+import time
+
+from prometheus_client import start_http_server
+from redis.exceptions import RedisError
+
+from config.cache import close_redis
+from config.general import settings
+from config.metrics import EMAIL_BATCH_SECONDS, EMAIL_JOB_LATENCY_SECONDS
+from src.auth.mail_utils import build_message, send_batch, smtp_pool
+from src.tasks.queue import EmailJob, EmailQueue, email_queue
+
+
+logger = logging.getLogger("src.tasks.worker")
+
+
+async def process_batch(queue: EmailQueue, reserved: list[tuple[bytes, EmailJob]], sender=send_batch):
+    """Відправляє пакет завдань і підтверджує або планує повтор кожного з них.
+
+    Args:
+        queue (EmailQueue): Черга, з якої взято завдання.
+        reserved (list[tuple[bytes, EmailJob]]): Завдання в обробці.
+        sender: Функція, що відправляє список листів і повертає помилку або None для кожного.
+    """
+    messages = [build_message(job.recipient, job.subject, job.body) for _, job in reserved]
+    start = time.perf_counter()
+    try:
+        results = await sender(messages)
+    except Exception as e:
+        results = [e] * len(reserved)
+    EMAIL_BATCH_SECONDS.observe(time.perf_counter() - start)
+
+    for (raw, job), error in zip(reserved, results):
+        if error is None:
+            await queue.ack(raw)
+            EMAIL_JOB_LATENCY_SECONDS.observe(max(time.time() - job.enqueued_at, 0))
+        else:
+            logger.warning("Email job %s to %s failed: %s", job.id, job.recipient, error)
+            await queue.fail(raw, job, repr(error))
+
+
+async def keep_alive(queue: EmailQueue, stop: asyncio.Event):
+    """Оновлює пульс воркера й повертає в чергу завдання зупинених воркерів.
+
+    Працює окремою задачею, тому пульс не зникає, поки воркер відправляє
+    довгий пакет листів.
+
+    Args:
+        queue (EmailQueue): Черга листів.
+        stop (asyncio.Event): Подія зупинки воркера.
+    """
+    while not stop.is_set():
+        try:
+            await queue.heartbeat()
+            reclaimed = await queue.reclaim_expired()
+            if reclaimed:
+                logger.warning("Requeued %d jobs left in processing by stopped workers", reclaimed)
+        except RedisError as e:
+            logger.error("Redis is unavailable, heartbeat not sent: %s", e)
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=queue.heartbeat_ttl / 3)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run_worker(queue: EmailQueue, batch_size: int, poll_timeout: float, stop: asyncio.Event):
+    """Обробляє чергу, доки не встановлено `stop`.
+
+    Args:
+        queue (EmailQueue): Черга листів.
+        batch_size (int): Максимальна кількість листів у пакеті.
+        poll_timeout (float): Час очікування нових завдань, секунди.
+        stop (asyncio.Event): Подія зупинки воркера.
+    """
+    heartbeat = asyncio.create_task(keep_alive(queue, stop))
+    try:
+        while not stop.is_set():
+            try:
+                await queue.promote_due()
+                await queue.update_depth_metrics()
+                reserved = await queue.reserve(batch_size, timeout=poll_timeout)
+                if reserved:
+                    await process_batch(queue, reserved)
+            except RedisError as e:
+                logger.error("Redis is unavailable: %s", e)
+                await asyncio.sleep(poll_timeout)
+    finally:
+        heartbeat.cancel()
+        try:
+            await heartbeat
+        except asyncio.CancelledError:
+            pass
+        try:
+            await queue.retire()
+        except RedisError as e:
+            logger.error(
+                "Worker %s was not deregistered, its jobs return after the heartbeat expires: %s", queue.worker_id, e
+            )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=settings.email_queue_batch_size)
+    parser.add_argument("--poll-timeout", type=float, default=1.0)
+    parser.add_argument("--metrics-port", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.metrics_port is not None:
+        start_http_server(args.metrics_port)
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    logger.info("Email worker %s started, queue %s", email_queue.worker_id, email_queue.name)
+    try:
+        await run_worker(email_queue, args.batch_size, args.poll_timeout, stop)
+    finally:
+        await smtp_pool.close()
+        await close_redis()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -3,12 +3,14 @@ import pytest
 import pytest_asyncio
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
 
 from main import app
 from src.auth.models import Role, User
 from src.auth.schema import RoleEnum
 from config.general import settings
-from config.db import Base, get_db
+from config.db import Base, get_db, get_session_factory, instrument_queries
 from src.auth.pass_utils import get_password_hash
 from src.auth.utils import create_acces_token, create_refresh_token
 from src.contacts.models import Contact
@@ -16,8 +18,9 @@ from src.contacts.models import Contact
 DATABASE_URL = settings.database_test_url
 
 engine = create_async_engine(DATABASE_URL, echo=True)
+instrument_queries(engine.sync_engine)
 AsyncSessionLocal = sessionmaker(
-    autocommit=False, autoflush=False, bind=engine, class_=AsyncSession
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine, class_=AsyncSession
 )
 
 
@@ -28,6 +31,18 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def strict_query_budget(monkeypatch):
+    monkeypatch.setattr(settings, "query_budget_mode", "raise")
+
+
+@pytest.fixture(autouse=True)
+def in_memory_cache():
+    FastAPICache.init(InMemoryBackend(), prefix="fastapi-cache")
+    yield
+    FastAPICache.reset()
+
+
 @pytest_asyncio.fixture(scope="function")
 async def setup_database():
     async with engine.begin() as conn:
@@ -39,7 +54,7 @@ async def setup_database():
 
 
 @pytest_asyncio.fixture(scope="function")
-async def db_session(setup_database=setup_database):
+async def db_session(setup_database):
     async with AsyncSessionLocal() as session:
         yield session
 
@@ -47,9 +62,9 @@ async def db_session(setup_database=setup_database):
 @pytest_asyncio.fixture(scope="function")
 def override_get_db(db_session):
     async def _get_db():
-        async with db_session() as session:
-            yield session
+        yield db_session
     app.dependency_overrides[get_db] = _get_db 
+    app.dependency_overrides[get_session_factory] = lambda: AsyncSessionLocal
     yield
     app.dependency_overrides.clear()
 
@@ -78,8 +93,8 @@ async def test_user(db_session, faker, user_role, user_password):
         email=faker.email(),
         username=faker.name(),
         hashed_password=hashed_password,
-        role_id=user_role.id,
         is_active=True,
+        role_id=user_role.id,
     )
     db_session.add(user)
     await db_session.commit()
@@ -106,6 +121,7 @@ async def test_user_contact(db_session, test_user, faker) -> Contact:
         owner_id=test_user.id,
         phone_number=faker.phone_number(),
         birthday=faker.date_of_birth(),
+        age=faker.random_int(min=1, max=99),
         additional_info=faker.text(),
     )
     db_session.add(contact)
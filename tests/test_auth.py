@@ -1,16 +1,38 @@
+import asyncio
+import io
+import time
 from unittest.mock import patch
 
+import aiosmtplib
+import fakeredis
 import pytest
-from fastapi import BackgroundTasks
+from fastapi import BackgroundTasks, HTTPException
 from httpx import AsyncClient, ASGITransport
+from redis.exceptions import RedisError
+
+from PIL import Image
 
 from main import app
+from config.general import settings
+from config.templates import precompile_templates, render_template
+from src.auth.avatars import (
+    InvalidImageError, LocalAvatarStorage, get_avatar_storage, make_thumbnail, read_avatar_upload
+)
+from src.auth.cache import UserPrincipalCache
+from src.auth.keys import JWKSKeyCache, KeyRing, generate_private_key_pem, key_ring
+from src.auth.rate_limit import Limit, Rate, RateLimiter
+from src.auth.revocation import RevocationList
+from src.auth.mail_utils import SMTPPool, build_message
 from src.auth.models import Role
+from src.auth.repos import UserRepository
+from src.auth.schema import UserCreate
+from src.auth.utils import ACCESS_CLAIMS, build_access_claims, get_current_user
+from tests.conftest import auth_header
 
 
 @pytest.mark.asyncio
 async def test_register_user(user_role: Role, override_get_db, faker):
-    with patch.object(BackgroundTasks, "add_task"):
+    with patch("src.auth.routers.enqueue_email") as enqueue_email, patch.object(BackgroundTasks, "add_task"):
          async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
             payload = {
                 "email": faker.email(),
@@ -25,4 +47,314 @@ async def test_register_user(user_role: Role, override_get_db, faker):
             assert response.status_code == 200
             data = response.json()
 
-            assert data["email"] == payload["email"]
\ No newline at end of file
+            assert data["email"] == payload["email"]
+            enqueue_email.assert_awaited_once()
+            assert enqueue_email.await_args.args[0] == payload["email"]
+
+@pytest.mark.asyncio
+async def test_user_principal_cache_local_tier_expires_and_evicts():
+    cache = UserPrincipalCache(maxsize=2, local_ttl=60, redis_ttl=60, prefix="test-user-principal")
+    with patch("src.auth.cache.get_redis", side_effect=RedisError):
+        await cache.set("alice", {"id": 1})
+        await cache.set("bob", {"id": 2})
+        await cache.set("carol", {"id": 3})
+
+        assert await cache.get("alice") is None
+        assert await cache.get("carol") == {"id": 3}
+
+        await cache.invalidate("carol")
+        assert await cache.get("carol") is None
+
+        cache.local_ttl = -1
+        await cache.set("dave", {"id": 4})
+        assert await cache.get("dave") is None
+
+
+@pytest.mark.asyncio
+async def test_user_repository_writes_return_fresh_state(db_session, faker):
+    user_repo = UserRepository(db_session)
+    with patch("src.auth.cache.get_redis", side_effect=RedisError):
+        user = await user_repo.create_user(
+            UserCreate(username=faker.user_name(), email=faker.email(), password=faker.password())
+        )
+        assert user.id is not None
+        assert user.is_active is False
+        assert user.contacts_count == 0
+
+        await user_repo.activate_user(user)
+        assert user.is_active is True
+
+        updated = await user_repo.update_avatar(user.id, "https://example.com/avatar.png")
+        assert updated is user
+        assert user.avatar == "https://example.com/avatar.png"
+        assert await user_repo.update_avatar(user.id + 1000, "https://example.com/other.png") is None
+
+
+class FakeSMTP:
+    instances = []
+
+    def __init__(self, **kwargs):
+        self.is_connected = False
+        self.sent = []
+        self.fail_after = None
+        FakeSMTP.instances.append(self)
+
+    async def connect(self):
+        await asyncio.sleep(0)
+        self.is_connected = True
+
+    async def send_message(self, message):
+        await asyncio.sleep(0)
+        if self.fail_after is not None and len(self.sent) >= self.fail_after:
+            self.is_connected = False
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+        self.sent.append(message["To"])
+
+    async def noop(self):
+        if not self.is_connected:
+            raise aiosmtplib.SMTPServerDisconnected("connection lost")
+
+    async def quit(self):
+        self.is_connected = False
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.mark.asyncio
+async def test_smtp_pool_reuses_connections_and_reconnects():
+    FakeSMTP.instances = []
+    pool = SMTPPool("localhost", 1025, max_connections=2, health_check_interval=0)
+    messages = [build_message(f"user{i}@example.com", "Subject", "<p>Hi</p>") for i in range(6)]
+    with patch("src.auth.mail_utils.aiosmtplib.SMTP", FakeSMTP):
+        assert await pool.send(messages) == [None] * 6
+        assert len(FakeSMTP.instances) == 2
+        assert sorted(sum((smtp.sent for smtp in FakeSMTP.instances), [])) == sorted(m["To"] for m in messages)
+
+        await pool.send(messages[:2])
+        assert len(FakeSMTP.instances) == 2
+
+        FakeSMTP.instances[0].fail_after = len(FakeSMTP.instances[0].sent) + 1
+        FakeSMTP.instances[1].fail_after = len(FakeSMTP.instances[1].sent) + 1
+        assert await pool.send(messages) == [None] * 6
+        assert len(FakeSMTP.instances) == 4
+
+        await pool.close()
+        assert not any(smtp.is_connected for smtp in FakeSMTP.instances)
+
+
+@pytest.mark.asyncio
+async def test_templates_are_precompiled_and_escaped():
+    assert precompile_templates() == 3
+    with patch("config.templates.env.get_template", side_effect=AssertionError("template loaded on hot path")):
+        html = await render_template("reset_password_form.html", token='"><script>')
+        assert "http://x" in await render_template("verification_email.html", verification_link="http://x")
+    assert "&#34;&gt;&lt;script&gt;" in html
+
+
+def test_make_thumbnail_rejects_images_over_pixel_limit():
+    image = io.BytesIO()
+    Image.new("1", (4000, 4000)).save(image, format="PNG")
+
+    with pytest.raises(InvalidImageError):
+        make_thumbnail(image.getvalue(), 256, "webp", 85, max_pixels=4000 * 4000 - 1)
+    assert make_thumbnail(image.getvalue(), 256, "webp", 85, max_pixels=4000 * 4000)
+
+
+@pytest.mark.asyncio
+async def test_update_avatar_stores_thumbnail(test_user, override_get_db, tmp_path):
+    image = io.BytesIO()
+    Image.new("RGB", (800, 600), "red").save(image, format="PNG")
+    app.dependency_overrides[get_avatar_storage] = lambda: LocalAvatarStorage(tmp_path, "/media/avatars")
+    try:
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            headers = await auth_header(test_user)
+            response = await ac.post(
+                "/auth/update-avatar", files={"file": ("me.png", image.getvalue(), "image/png")}, headers=headers
+            )
+            assert response.status_code == 200
+            assert response.json()["avatar"] == f"/media/avatars/user-{test_user.id}.webp"
+            with Image.open(tmp_path / f"user-{test_user.id}.webp") as thumbnail:
+                assert thumbnail.size == (256, 256)
+
+            with patch("src.auth.avatars.settings.avatar_max_bytes", 1024):
+                too_large = await ac.post(
+                    "/auth/update-avatar", files={"file": ("me.png", b"0" * 64 * 1024, "image/png")}, headers=headers
+                )
+            assert too_large.status_code == 413
+
+            not_an_image = await ac.post(
+                "/auth/update-avatar", files={"file": ("me.png", b"not an image", "image/png")}, headers=headers
+            )
+            assert not_an_image.status_code == 400
+
+            app.dependency_overrides[read_avatar_upload] = lambda: pytest.fail("upload read before authentication")
+            anonymous = await ac.post("/auth/update-avatar", files={"file": ("me.png", image.getvalue(), "image/png")})
+            assert anonymous.status_code == 401
+    finally:
+        app.dependency_overrides.pop(get_avatar_storage, None)
+        app.dependency_overrides.pop(read_avatar_upload, None)
+
+
+@pytest.mark.asyncio
+async def test_login_issues_self_contained_revocable_token(test_user, user_password, override_get_db):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post("/auth/token", data={"username": test_user.username, "password": user_password})
+        assert response.status_code == 200
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        with patch.object(UserRepository, "get_user_by_username", side_effect=AssertionError("database lookup")):
+            contacts = await ac.get("/contacts/", headers=headers)
+        assert contacts.status_code == 200
+
+        assert (await ac.post("/auth/logout", headers=headers)).status_code == 200
+        assert (await ac.get("/contacts/", headers=headers)).status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_claims_path_rejects_inactive_users_and_carries_avatar(test_user):
+    claims = {
+        **build_access_claims(test_user, ["user"]), "avatar": "/media/avatars/me.webp",
+        "sid": "s", "jti": "j", "exp": 2 ** 31,
+    }
+    assert set(ACCESS_CLAIMS) == {*build_access_claims(test_user, ["user"]), "sid"}
+    user = await get_current_user(claims, db=None)
+    assert (user.id, user.avatar) == (test_user.id, "/media/avatars/me.webp")
+
+    with pytest.raises(HTTPException) as error:
+        await get_current_user({**claims, "act": False}, db=None)
+    assert error.value.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_tokens_and_detects_reuse(test_user, user_password, override_get_db):
+    redis = fakeredis.aioredis.FakeRedis()
+    with patch("src.auth.sessions.get_redis", return_value=redis):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            login = await ac.post("/auth/token", data={"username": test_user.username, "password": user_password})
+            first = login.json()
+
+            wrong_type = await ac.post("/auth/refresh", json={"refresh_token": first["access_token"]})
+            assert wrong_type.status_code == 401
+
+            rotated = await ac.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+            assert rotated.status_code == 200
+            second = rotated.json()
+            assert second["refresh_token"] != first["refresh_token"]
+            contacts = await ac.get("/contacts/", headers={"Authorization": f"Bearer {second['access_token']}"})
+            assert contacts.status_code == 200
+
+            reused = await ac.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+            assert reused.status_code == 401
+            assert reused.json()["detail"] == "Refresh token reuse detected"
+            after_reuse = await ac.post("/auth/refresh", json={"refresh_token": second["refresh_token"]})
+            assert after_reuse.status_code == 401
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_refresh_reloads_user_and_stops_at_session_max_age(test_user, user_password, db_session, override_get_db):
+    redis = fakeredis.aioredis.FakeRedis()
+    credentials = {"username": test_user.username, "password": user_password}
+    with patch("src.auth.sessions.get_redis", return_value=redis):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            first = (await ac.post("/auth/token", data=credentials)).json()
+            test_user.email = "renamed@example.com"
+            await db_session.commit()
+            rotated = await ac.post("/auth/refresh", json={"refresh_token": first["refresh_token"]})
+            assert rotated.status_code == 200
+            assert key_ring.decode(rotated.json()["access_token"])["email"] == "renamed@example.com"
+
+            later = time.time() + settings.auth_session_max_age
+            with patch("src.auth.sessions.time.time", return_value=later):
+                expired = await ac.post("/auth/refresh", json={"refresh_token": rotated.json()["refresh_token"]})
+            assert expired.status_code == 401
+            assert expired.json()["detail"] == "Session expired"
+
+            second = (await ac.post("/auth/token", data=credentials)).json()
+            test_user.is_active = False
+            await db_session.commit()
+            inactive = await ac.post("/auth/refresh", json={"refresh_token": second["refresh_token"]})
+            assert inactive.status_code == 401
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_login_is_rate_limited_per_username_before_database(test_user, override_get_db):
+    redis = fakeredis.aioredis.FakeRedis()
+    credentials = {"username": test_user.username, "password": "wrong"}
+    with patch("src.auth.rate_limit.get_redis", return_value=redis):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            for _ in range(5):
+                assert (await ac.post("/auth/token", data=credentials)).status_code == 401
+
+            with patch.object(UserRepository, "get_user_by_username", side_effect=AssertionError("database lookup")):
+                response = await ac.post("/auth/token", data=credentials)
+            assert response.status_code == 429
+            assert 1 <= int(response.headers["Retry-After"]) <= 60
+
+            other = await ac.post("/auth/token", data={"username": "someone-else", "password": "wrong"})
+            assert other.status_code == 401
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_rate_limiter_falls_back_to_process_memory():
+    limiter = RateLimiter(prefix="test-rate-limit")
+    limits = [Limit("ip", "10.0.0.1", Rate.parse("2/minute")), Limit("username", "bob", Rate.parse("1/hour"))]
+    with patch("src.auth.rate_limit.get_redis", side_effect=RedisError):
+        assert await limiter.hit("login", limits) == (0.0, None)
+        retry_after, limit = await limiter.hit("login", limits)
+    assert limit.scope == "username"
+    assert 3590 < retry_after <= 3600
+    with pytest.raises(ValueError):
+        Rate.parse("5/fortnight")
+
+
+@pytest.mark.asyncio
+async def test_revocation_list_rejects_older_token_versions():
+    revocations = RevocationList(prefix="test-revoked", channel="test-revocations", retry_delay=0)
+    with patch("src.auth.revocation.get_redis", side_effect=RedisError):
+        await revocations.revoke_user(7, 2)
+    assert revocations.is_revoked({"uid": 7, "ver": 1, "jti": "a"})
+    assert not revocations.is_revoked({"uid": 7, "ver": 2, "jti": "b"})
+    assert not revocations.is_revoked({"uid": 8, "ver": 0, "jti": "c"})
+
+    revocations._apply({"uid": 7, "ver": 1})
+    assert revocations.is_revoked({"uid": 7, "ver": 1})
+    assert revocations.pending == 1
+
+    redis = fakeredis.aioredis.FakeRedis()
+    await redis.hset(revocations.versions_key, "7", 5)
+    with patch("src.auth.revocation.get_redis", return_value=redis):
+        await revocations._replay()
+        other = RevocationList(prefix="test-revoked", channel="test-revocations")
+        await other.load()
+    assert revocations.pending == 0
+    assert other.is_revoked({"uid": 7, "ver": 4})
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_es256_key_rotation_and_jwks_cache(tmp_path):
+    (tmp_path / "2026-01.pem").write_text(generate_private_key_pem())
+    old_ring = KeyRing("ES256", "unused", keys_dir=str(tmp_path))
+    old_token = old_ring.encode({"sub": "alice"})
+
+    (tmp_path / "2026-02.pem").write_text(generate_private_key_pem())
+    ring = KeyRing("ES256", "unused", keys_dir=str(tmp_path))
+    assert ring.active_kid == "2026-02"
+    new_token = ring.encode({"sub": "bob"})
+    assert ring.decode(old_token)["sub"] == "alice"
+    assert [key["kid"] for key in ring.jwks()["keys"]] == ["2026-01", "2026-02"]
+    assert all("d" not in key for key in ring.jwks()["keys"])
+
+    documents = [old_ring.jwks(), ring.jwks()]
+
+    async def fetch():
+        return documents.pop(0)
+
+    verifier = JWKSKeyCache(fetch, min_refresh_interval=0)
+    assert (await verifier.decode(old_token))["sub"] == "alice"
+    assert (await verifier.decode(new_token))["sub"] == "bob"
+    assert documents == []
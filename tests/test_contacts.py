@@ -0,0 +1,450 @@
+from datetime import date
+from unittest.mock import patch
+
+import fakeredis
+import orjson
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+
+from main import app
+from src.auth.models import User
+from src.contacts.cache import contact_cache
+from src.contacts.models import Contact
+from src.contacts.repos import ContactRepository, is_duplicate_email
+from src.contacts.routers import MAX_CONTACTS_PER_USER
+from src.contacts.schema import ContactCreate, ContactResponse
+from src.contacts.search import trigram_similarity
+
+
+from tests.conftest import auth_header
+
+
+@pytest_asyncio.fixture(scope="function")
+async def owner(test_user):
+    return test_user.id, await auth_header(test_user)
+
+
+async def create_contacts(db_session, faker, count: int, owner_id: int) -> list[tuple[str, int]]:
+    contacts = [
+        Contact(
+            first_name=faker.first_name(),
+            last_name=faker.last_name(),
+            email=f"{i}.{faker.email()}",
+            phone_number=faker.phone_number(),
+            birthday=faker.date_of_birth(),
+            age=faker.random_int(min=1, max=99),
+            owner_id=owner_id,
+        )
+        for i in range(count)
+    ]
+    db_session.add_all(contacts)
+    await db_session.flush()
+    keys = [(contact.last_name, contact.id) for contact in contacts]
+    await db_session.commit()
+    return keys
+
+
+@pytest.mark.asyncio
+async def test_list_contacts_pages_with_cursor(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    keys = await create_contacts(db_session, faker, 5, owner_id)
+    expected = [contact_id for _, contact_id in sorted(keys)]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        seen = []
+        cursor = None
+        while True:
+            params = {"limit": 2}
+            if cursor:
+                params["cursor"] = cursor
+            response = await ac.get("/contacts/", params=params, headers=headers)
+            assert response.status_code == 200
+            data = response.json()
+            assert len(data["items"]) <= 2
+            seen.extend(item["id"] for item in data["items"])
+            cursor = data["next_cursor"]
+            if cursor is None:
+                break
+
+    assert seen == expected
+
+
+@pytest.mark.asyncio
+async def test_list_contacts_rejects_invalid_cursor(override_get_db, owner):
+    _, headers = owner
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/contacts/", params={"cursor": "not-a-cursor"}, headers=headers)
+        assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_list_contacts_returns_only_requested_fields(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    keys = await create_contacts(db_session, faker, 3, owner_id)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get(
+            "/contacts/", params={"fields": ["email", "last_name"], "limit": 2}, headers=headers
+        )
+        assert response.status_code == 200
+        page = response.json()
+        response = await ac.get(
+            "/contacts/", params={"fields": "email", "cursor": page["next_cursor"]}, headers=headers
+        )
+        assert response.status_code == 200
+        rest = response.json()
+        response = await ac.get("/contacts/", params={"fields": "hashed_password"}, headers=headers)
+        assert response.status_code == 422
+
+    assert [set(item) for item in page["items"]] == [{"id", "last_name", "email"}] * 2
+    assert [set(item) for item in rest["items"]] == [{"id", "email"}]
+    assert [item["id"] for item in page["items"] + rest["items"]] == [contact_id for _, contact_id in sorted(keys)]
+
+
+def test_trigram_similarity_matches_pg_trgm():
+    assert trigram_similarity("word", "two words") == pytest.approx(0.363636, abs=1e-6)
+    assert trigram_similarity("Smith", "smith") == 1.0
+    assert trigram_similarity("abc", None) is None
+
+
+@pytest.mark.asyncio
+async def test_search_contacts_ranks_best_match_first(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    for first_name, email in (("Johnny", "johnny@example.com"), ("John", "j@example.com"), ("Mary", "m@example.com")):
+        db_session.add(Contact(
+            first_name=first_name,
+            last_name="Doe",
+            email=email,
+            phone_number=faker.phone_number(),
+            birthday=faker.date_of_birth(),
+            age=30,
+            owner_id=owner_id,
+        ))
+    await db_session.commit()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.get("/contacts/search/", params={"query": "JOHN", "limit": 1}, headers=headers)
+        assert response.status_code == 200
+        first_page = response.json()
+        response = await ac.get(
+            "/contacts/search/",
+            params={"query": "JOHN", "limit": 1, "cursor": first_page["next_cursor"]},
+            headers=headers,
+        )
+        second_page = response.json()
+
+    assert first_page["items"][0]["first_name"] == "John"
+    assert second_page["items"][0]["first_name"] == "Johnny"
+    assert second_page["next_cursor"] is None
+
+
+class FrozenDate(date):
+    @classmethod
+    def today(cls):
+        return cls(2025, 12, 29)
+
+
+@pytest.mark.asyncio
+async def test_upcoming_birthdays_wrap_into_next_year(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    for name, birthday in (
+        ("Late", date(1990, 1, 3)),
+        ("Early", date(1985, 12, 30)),
+        ("Past", date(2000, 12, 1)),
+        ("Far", date(1970, 1, 20)),
+    ):
+        db_session.add(Contact(
+            first_name=name,
+            last_name=name,
+            email=f"{name.lower()}@example.com",
+            phone_number=faker.phone_number(),
+            birthday=birthday,
+            age=30,
+            owner_id=owner_id,
+        ))
+    await db_session.commit()
+
+    with patch("src.contacts.repos.date", FrozenDate):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            response = await ac.get("/contacts/birthdays/", params={"days": 7}, headers=headers)
+
+    assert response.status_code == 200
+    assert [item["first_name"] for item in response.json()["items"]] == ["Early", "Late"]
+
+
+@pytest.mark.asyncio
+async def test_upcoming_birthdays_window_ends_exactly_days_ahead(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    for name, birthday in (
+        ("Today", date(1990, 12, 29)),
+        ("Edge", date(1991, 1, 1)),
+        ("After", date(1992, 1, 2)),
+    ):
+        db_session.add(Contact(
+            first_name=name,
+            last_name=name,
+            email=f"{name.lower()}@example.com",
+            phone_number=faker.phone_number(),
+            birthday=birthday,
+            age=30,
+            owner_id=owner_id,
+        ))
+    await db_session.commit()
+
+    with patch("src.contacts.repos.date", FrozenDate):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            window = await ac.get("/contacts/birthdays/", params={"days": 3}, headers=headers)
+            today_only = await ac.get("/contacts/birthdays/", params={"days": 0}, headers=headers)
+
+    assert [item["first_name"] for item in window.json()["items"]] == ["Today", "Edge"]
+    assert [item["first_name"] for item in today_only.json()["items"]] == ["Today"]
+
+
+@pytest.mark.asyncio
+async def test_contacts_are_scoped_to_owner(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    stranger = User(username="stranger", email="stranger@example.com", hashed_password="x", is_active=True)
+    db_session.add(stranger)
+    await db_session.flush()
+    [(_, foreign_id)] = await create_contacts(db_session, faker, 1, stranger.id)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        listed = await ac.get("/contacts/", headers=headers)
+        fetched = await ac.get(f"/contacts/{foreign_id}", headers=headers)
+        deleted = await ac.delete(f"/contacts/{foreign_id}", headers=headers)
+
+    assert listed.json()["items"] == []
+    assert fetched.status_code == 404
+    assert deleted.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_contact_enforces_limit_with_counter(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    payload = {
+        "first_name": "Ann",
+        "last_name": "Lee",
+        "email": "ann@example.com",
+        "phone_number": "123",
+        "birthday": "1990-05-05",
+        "age": 34,
+    }
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        created = await ac.post("/contacts/", json=payload, headers=headers)
+        assert created.status_code == 200
+        await db_session.execute(
+            update(User).where(User.id == owner_id).values(contacts_count=MAX_CONTACTS_PER_USER)
+        )
+        await db_session.commit()
+        rejected = await ac.post("/contacts/", json={**payload, "email": "ann2@example.com"}, headers=headers)
+
+    assert rejected.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_contact_cache_is_invalidated_on_update_and_delete(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    [(_, contact_id)] = await create_contacts(db_session, faker, 1, owner_id)
+    redis = fakeredis.aioredis.FakeRedis()
+    key = contact_cache.key(owner_id, contact_id)
+
+    with patch("src.contacts.cache.get_redis", return_value=redis):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            fetched = await ac.get(f"/contacts/{contact_id}", headers=headers)
+            assert await redis.exists(key)
+
+            payload = {**fetched.json(), "first_name": "Updated"}
+            await ac.put(f"/contacts/{contact_id}", json=payload, headers=headers)
+            assert not await redis.exists(key)
+            refilled = await ac.get(f"/contacts/{contact_id}", headers=headers)
+            assert refilled.json()["first_name"] == "Updated"
+            assert b"Updated" in await redis.get(key)
+
+            await ac.delete(f"/contacts/{contact_id}", headers=headers)
+            assert not await redis.exists(key)
+            missing = await ac.get(f"/contacts/{contact_id}", headers=headers)
+            assert missing.status_code == 404
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_contact_cache_read_started_before_delete_does_not_refill():
+    owner_id = 1
+    contact = ContactResponse(
+        id=1, first_name="Ann", last_name="Lee", email="ann@example.com",
+        phone_number="123", birthday=date(1990, 5, 5), age=34,
+    )
+    redis = fakeredis.aioredis.FakeRedis()
+
+    with patch("src.contacts.cache.get_redis", return_value=redis):
+        cached, version = await contact_cache.get(owner_id, contact.id)
+        assert cached is None
+        await contact_cache.invalidate(owner_id, contact.id)
+        await contact_cache.fill(owner_id, contact, version)
+        assert not await redis.exists(contact_cache.key(owner_id, contact.id))
+
+        _, version = await contact_cache.get(owner_id, contact.id)
+        await contact_cache.fill(owner_id, contact, version)
+        cached, _ = await contact_cache.get(owner_id, contact.id)
+        assert cached == contact
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_contact_cache_updates_arriving_out_of_order_leave_latest_contact(db_session, owner, faker):
+    owner_id, _ = owner
+    [(_, contact_id), (_, other_id)] = await create_contacts(db_session, faker, 2, owner_id)
+    repo = ContactRepository(db_session)
+    redis = fakeredis.aioredis.FakeRedis()
+
+    with patch("src.contacts.cache.get_redis", return_value=redis):
+        await repo.get_contact(owner_id, contact_id)
+        invalidations = []
+        with patch.object(contact_cache, "invalidate_many", side_effect=lambda *args: invalidations.append(args)):
+            await repo.update_contact(owner_id, contact_id, {"first_name": "First"})
+            # Читання між двома комітами встигає лише отримати версію.
+            _, version = await contact_cache.get(owner_id, contact_id)
+            stale = await repo.get_contact(owner_id, contact_id)
+            await repo.update_contact(owner_id, contact_id, {"first_name": "Second"})
+            await repo.bulk_update_contacts(owner_id, [contact_id, other_id], {"last_name": "Bulk"})
+
+        # Інвалідації доходять до Redis у зворотному до комітів порядку.
+        for args in reversed(invalidations):
+            await contact_cache.invalidate_many(*args)
+        await contact_cache.fill(owner_id, stale, version)
+
+        cached = await repo.get_contact(owner_id, contact_id)
+        assert (cached.first_name, cached.last_name) == ("Second", "Bulk")
+        assert (await contact_cache.get(owner_id, contact_id))[0] == cached
+        assert (await repo.get_contact(owner_id, other_id)).last_name == "Bulk"
+    await redis.aclose()
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_reports_row_errors(db_session, override_get_db, owner):
+    owner_id, headers = owner
+    csv_body = (
+        "first_name,last_name,email,phone_number,birthday,age,additional_info\n"
+        "Ann,Lee,ann@example.com,123,1990-05-05,34,\n"
+        "Bob,Ray,not-an-email,456,1991-06-06,33,\n"
+        "Cid,Moe,ann@example.com,789,1992-07-07,32,duplicate email\n"
+        "Dan,Fox,dan@example.com,000,1993-08-08,31,\"multi\nline\"\n"
+    )
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post(
+            "/contacts/import/", files={"file": ("contacts.csv", csv_body, "text/csv")}, headers=headers
+        )
+        listed = await ac.get("/contacts/", headers=headers)
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 2
+    assert [error["row"] for error in report["errors"]] == [2, 3]
+    assert {item["email"] for item in listed.json()["items"]} == {"ann@example.com", "dan@example.com"}
+    owner_row = await db_session.get(User, owner_id, populate_existing=True)
+    assert owner_row.contacts_count == 2
+
+
+@pytest.mark.asyncio
+async def test_import_batch_raises_integrity_errors_other_than_duplicate_email(db_session, owner):
+    owner_id, _ = owner
+    contact = ContactCreate.model_construct(
+        first_name=None, last_name="Lee", email="ann@example.com",
+        phone_number="123", birthday=date(1990, 5, 5), age=34, additional_info=None,
+    )
+
+    with pytest.raises(IntegrityError) as error:
+        await ContactRepository(db_session).insert_contacts_batch(owner_id, [(1, contact)], max_contacts=10)
+    assert not is_duplicate_email(error.value)
+
+
+@pytest.mark.asyncio
+async def test_import_contacts_ndjson_respects_limit(db_session, override_get_db, owner):
+    owner_id, headers = owner
+    await db_session.execute(
+        update(User).where(User.id == owner_id).values(contacts_count=MAX_CONTACTS_PER_USER - 1)
+    )
+    await db_session.commit()
+    lines = [
+        orjson.dumps({
+            "first_name": "N", "last_name": str(i), "email": f"n{i}@example.com",
+            "phone_number": "1", "birthday": "2000-01-01", "age": 24,
+        }).decode()
+        for i in range(3)
+    ]
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.post(
+            "/contacts/import/",
+            params={"format": "ndjson"},
+            files={"file": ("contacts.txt", "\n".join(lines + ["{broken"]))},
+            headers=headers,
+        )
+
+    report = response.json()
+    assert report["imported"] == 1
+    assert report["failed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_export_contacts_streams_every_format(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    keys = await create_contacts(db_session, faker, 3, owner_id)
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        csv_export = await ac.get("/contacts/export/", params={"format": "csv"}, headers=headers)
+        ndjson_export = await ac.get("/contacts/export/", params={"format": "ndjson"}, headers=headers)
+        vcard_export = await ac.get("/contacts/export/", params={"format": "vcard"}, headers=headers)
+
+    assert csv_export.headers["content-type"].startswith("text/csv")
+    assert len(csv_export.text.strip().splitlines()) == 4
+    assert [orjson.loads(line)["id"] for line in ndjson_export.text.splitlines()] == sorted(i for _, i in keys)
+    assert vcard_export.text.count("BEGIN:VCARD") == 3
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_and_delete_report_per_item(db_session, override_get_db, owner, faker):
+    owner_id, headers = owner
+    created = await create_contacts(db_session, faker, 3, owner_id)
+    ids = [contact_id for _, contact_id in created]
+    missing_id = max(ids) + 100
+    await db_session.execute(update(User).where(User.id == owner_id).values(contacts_count=3))
+    await db_session.commit()
+
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        response = await ac.patch(
+            "/contacts/bulk/",
+            json={"ids": [ids[0], ids[1], missing_id], "changes": {"birthday": "2000-12-31", "additional_info": "bulk"}},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert response.json()["results"] == [
+            {"id": ids[0], "status": "updated"},
+            {"id": ids[1], "status": "updated"},
+            {"id": missing_id, "status": "not_found"},
+        ]
+        updated = (await ac.get(f"/contacts/{ids[0]}", headers=headers)).json()
+        assert updated["birthday"] == "2000-12-31"
+        assert updated["additional_info"] == "bulk"
+
+        rejected = await ac.patch(
+            "/contacts/bulk/", json={"ids": [ids[0]], "changes": {"first_name": None}}, headers=headers
+        )
+        assert rejected.status_code == 422
+
+        response = await ac.post(
+            "/contacts/bulk/delete/", json={"ids": [ids[0], ids[2], missing_id]}, headers=headers
+        )
+        assert [item["status"] for item in response.json()["results"]] == ["deleted", "deleted", "not_found"]
+        assert (await ac.get(f"/contacts/{ids[0]}", headers=headers)).status_code == 404
+
+    key = (await db_session.execute(select(Contact.birthday_key).where(Contact.id == ids[1]))).scalar_one()
+    assert key == 1231
+    count = (await db_session.execute(select(User.contacts_count).where(User.id == owner_id))).scalar_one()
+    assert count == 1
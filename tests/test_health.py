@@ -1,7 +1,12 @@
+from collections import Counter
+
 import pytest
 from httpx import AsyncClient, ASGITransport
 
 from main import app
+from config.general import settings
+from config.instrumentation import QueryBudgetExceeded, RequestStats, query_budget_violations
+from tests.conftest import auth_header
 
 
 @pytest.mark.asyncio
@@ -9,4 +14,42 @@ async def test_ping():
     async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         response = await ac.get("/ping")
         assert response.status_code == 200
-        assert response.json() == {"message": "pong"}
\ No newline at end of file
+        assert response.json() == {"message": "pong"}
+
+@pytest.mark.asyncio
+async def test_metrics_record_route_latency_and_queries(test_user, override_get_db):
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        headers = await auth_header(test_user)
+        assert (await ac.get("/contacts/12345", headers=headers)).status_code == 404
+        response = await ac.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'http_requests_total{method="GET",route="/contacts/{contact_id}",status="404"}' in body
+    assert 'http_request_seconds_count{method="GET",route="/contacts/{contact_id}"}' in body
+    assert 'db_queries_per_request_count{route="/contacts/{contact_id}"}' in body
+    assert 'route="/metrics"' not in body
+
+    samples = {
+        line.split(" ")[0]: float(line.split(" ")[1]) for line in body.splitlines() if not line.startswith("#")
+    }
+    assert samples['db_queries_per_request_sum{route="/contacts/{contact_id}"}'] >= 1
+
+
+def test_query_budget_violations_report_budget_and_repeats():
+    stats = RequestStats(route="/contacts/", queries=4, statements=Counter({"SELECT a": 3, "SELECT b": 1}), budget=2)
+    assert [kind for kind, _ in query_budget_violations(stats, repeat_threshold=3)] == ["budget", "repeated"]
+
+    stats.allow_repeated = True
+    stats.budget = None
+    assert query_budget_violations(stats, repeat_threshold=3) == []
+
+
+@pytest.mark.asyncio
+async def test_query_budget_fails_requests_in_raise_mode(test_user, override_get_db, monkeypatch):
+    monkeypatch.setattr(settings, "query_repeat_threshold", 1)
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+        headers = await auth_header(test_user)
+        with pytest.raises(QueryBudgetExceeded, match="N\\+1"):
+            await ac.get("/contacts/12345", headers=headers)
@@ -0,0 +1,86 @@
+import asyncio
+from unittest.mock import patch
+
+import fakeredis
+import pytest
+
+from src.tasks.queue import EmailJob, EmailQueue
+from src.tasks.worker import process_batch
+
+
+class RecordingQueue(EmailQueue):
+    def __init__(self):
+        super().__init__("test-email-queue", max_attempts=3, retry_base_delay=2, retry_max_delay=10)
+        self.acked = []
+        self.failed = []
+
+    async def ack(self, raw):
+        self.acked.append(raw)
+
+    async def fail(self, raw, job, error):
+        self.failed.append((raw, job.id, error))
+
+
+@pytest.mark.asyncio
+async def test_process_batch_acks_sent_and_fails_rejected_jobs():
+    queue = RecordingQueue()
+    jobs = [EmailJob(recipient=f"user{i}@example.com", subject="Subject", body="<p>Hi</p>") for i in range(3)]
+    reserved = [(job.id.encode(), job) for job in jobs]
+    sent = []
+
+    async def sender(messages):
+        sent.extend(message["To"] for message in messages)
+        return [None, RuntimeError("mailbox unavailable"), None]
+
+    await process_batch(queue, reserved, sender=sender)
+
+    assert sent == [job.recipient for job in jobs]
+    assert queue.acked == [jobs[0].id.encode(), jobs[2].id.encode()]
+    assert [(raw, job_id) for raw, job_id, _ in queue.failed] == [(jobs[1].id.encode(), jobs[1].id)]
+
+
+@pytest.mark.asyncio
+async def test_process_batch_retries_whole_batch_when_smtp_is_down():
+    queue = RecordingQueue()
+    jobs = [EmailJob(recipient=f"user{i}@example.com", subject="Subject", body="<p>Hi</p>") for i in range(2)]
+
+    async def sender(messages):
+        raise ConnectionRefusedError("smtp down")
+
+    await process_batch(queue, [(job.id.encode(), job) for job in jobs], sender=sender)
+
+    assert queue.acked == []
+    assert len(queue.failed) == 2
+
+
+def test_retry_delay_grows_exponentially_up_to_the_cap():
+    queue = RecordingQueue()
+    delays = [queue.retry_delay(attempt) for attempt in range(1, 6)]
+    assert 1 <= delays[0] <= 2
+    assert 2 <= delays[1] <= 4
+    assert all(5 <= delay <= 10 for delay in delays[3:])
+
+
+@pytest.mark.asyncio
+async def test_jobs_of_a_worker_that_died_are_reclaimed_by_another_worker():
+    redis = fakeredis.aioredis.FakeRedis()
+    job = EmailJob(recipient="user@example.com", subject="Subject", body="<p>Hi</p>")
+    with patch("src.tasks.queue.get_redis", return_value=redis):
+        crashed = EmailQueue("test-email-queue", 3, 2, 10, heartbeat_ttl=0.05)
+        survivor = EmailQueue("test-email-queue", 3, 2, 10, heartbeat_ttl=60)
+        await crashed.enqueue(job)
+        assert [reserved.id for _, reserved in await crashed.reserve(10, timeout=0.1)] == [job.id]
+        # Воркер зупинився, не підтвердивши завдання і не знявшись з реєстру.
+
+        await survivor.heartbeat()
+        assert await survivor.reclaim_expired() == 0
+        await asyncio.sleep(0.1)
+        assert await survivor.reclaim_expired() == 1
+
+        [(raw, reclaimed)] = await survivor.reserve(10, timeout=0.1)
+        assert reclaimed.id == job.id
+        assert (await survivor.update_depth_metrics())["processing"] == 1
+        await survivor.ack(raw)
+        assert await survivor.retire() == 0
+        assert await redis.smembers(survivor.workers_key) == set()
+    await redis.aclose()